@@ -1,104 +1,20 @@
 #!/usr/bin/env python3
 """
 交互式 MCAP 关节数据查看器
+
+使用方法：python interactive_viewer.py [mcap文件] [--start 秒] [--end 秒] [--at 秒] [--max N]
+
+选择通道后可以向前 / 向后翻页或跳到任意时刻，每一页只解压覆盖该时间窗口的 chunk。
 """
 
 import sys
 from pathlib import Path
 from mcap.reader import make_reader
-import struct
 
-
-def parse_cdr_joint_state(data):
-    """解析 CDR 编码的 JointState 消息"""
-    try:
-        offset = 0
-        offset += 4  # CDR header
-        
-        # Header
-        if len(data) < offset + 8:
-            return None
-        sec = struct.unpack_from('<i', data, offset)[0]
-        offset += 4
-        nanosec = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        timestamp = sec + nanosec / 1e9
-        
-        # Skip frame_id
-        if len(data) < offset + 4:
-            return None
-        string_len = struct.unpack_from('<I', data, offset)[0]
-        offset += 4 + string_len
-        if offset % 4 != 0:
-            offset += 4 - (offset % 4)
-        
-        # Parse names
-        if len(data) < offset + 4:
-            return None
-        name_count = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        
-        names = []
-        for _ in range(name_count):
-            if len(data) < offset + 4:
-                break
-            name_len = struct.unpack_from('<I', data, offset)[0]
-            offset += 4
-            if len(data) < offset + name_len:
-                break
-            name = data[offset:offset + name_len].decode('utf-8').rstrip('\x00')
-            names.append(name)
-            offset += name_len
-            if offset % 4 != 0:
-                offset += 4 - (offset % 4)
-        
-        # Parse positions
-        if len(data) < offset + 4:
-            return {"timestamp": timestamp, "names": names, "positions": [], "velocities": [], "efforts": []}
-        pos_count = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        
-        positions = []
-        for _ in range(pos_count):
-            if len(data) < offset + 8:
-                break
-            pos = struct.unpack_from('<d', data, offset)[0]
-            positions.append(pos)
-            offset += 8
-        
-        # Parse velocities
-        velocities = []
-        if len(data) >= offset + 4:
-            vel_count = struct.unpack_from('<I', data, offset)[0]
-            offset += 4
-            for _ in range(vel_count):
-                if len(data) < offset + 8:
-                    break
-                vel = struct.unpack_from('<d', data, offset)[0]
-                velocities.append(vel)
-                offset += 8
-        
-        # Parse efforts
-        efforts = []
-        if len(data) >= offset + 4:
-            eff_count = struct.unpack_from('<I', data, offset)[0]
-            offset += 4
-            for _ in range(eff_count):
-                if len(data) < offset + 8:
-                    break
-                eff = struct.unpack_from('<d', data, offset)[0]
-                efforts.append(eff)
-                offset += 8
-        
-        return {
-            "timestamp": timestamp,
-            "names": names,
-            "positions": positions,
-            "velocities": velocities,
-            "efforts": efforts
-        }
-    except:
-        return None
+# JointState 解码使用 QA_Mcap_Checker 中共享的 CDR 解码器
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "QA_Mcap_Checker"))
+from mcap_checker.cdr import decode_joint_state
+from view_joint_data import find_message_at, get_time_origin, parse_time_arg, read_topic_window, to_log_time
 
 
 def get_topics(mcap_path):
@@ -116,77 +32,177 @@ def get_topics(mcap_path):
     return sorted(topics)
 
 
-def view_joint_data(mcap_path, topic, num_messages=5):
-    """查看关节数据"""
+def read_page_after(reader, topic, cursor, end_ns, limit):
+    """
+    下一页：cursor 为 (log_time, k)，跳过该时刻已显示的前 k 条消息
+
+    同一 log_time 的消息按文件位置排序，翻页时不会跳过或重复。
+
+    Returns:
+        tuple: (消息列表, 第一条消息在其 log_time 内的序号)
+    """
+    log_time, shown = cursor
+    window = read_topic_window(reader, topic, log_time, end_ns, limit=limit + shown)[shown:]
+    first_index = shown if window and window[0][1].log_time == log_time else 0
+    return window, first_index
+
+
+def read_page_before(reader, topic, cursor, start_ns, limit):
+    """
+    上一页：cursor 为 (log_time, k)，取该时刻前 k 条消息及更早消息中的最后 limit 条
+
+    Returns:
+        tuple: (消息列表, 第一条消息在其 log_time 内的序号)
+    """
+    log_time, before = cursor
+    same = read_topic_window(reader, topic, log_time, log_time + 1, limit=before)[-limit:] if before else []
+    if len(same) == limit:
+        return same, before - limit
+    earlier = read_topic_window(reader, topic, start_ns, log_time, limit=limit - len(same), reverse=True)
+    if not earlier:
+        return same, 0
+    # 本页第一个 log_time 的消息是该时刻的最后几条
+    first_time = earlier[0][1].log_time
+    total = len(read_topic_window(reader, topic, first_time, first_time + 1))
+    return earlier + same, total - sum(1 for _, message in earlier if message.log_time == first_time)
+
+
+def view_joint_data(mcap_path, topic, num_messages=5, start=None, end=None, at=None,
+                    after=None, before=None):
+    """
+    查看关节数据（一页）
+    
+    Args:
+        start / end / at: 时间窗口（相对文件开始的秒数），at 为该时刻之前的最后一条消息
+        after: 下一页：上一次返回的结束位置 (log_time, 该时刻已显示的消息数)
+        before: 上一页：上一次返回的开始位置 (log_time, 该时刻之前的消息数)
+    
+    Returns:
+        tuple: 本页的开始 / 结束位置（作为 before / after 传入即可翻页），
+               没有消息时返回 None
+    """
     print(f"\n{'='*100}")
     print(f"📊 通道: {topic}")
     print(f"{'='*100}\n")
     
     message_count = 0
-    first_time = None
     
     with open(mcap_path, "rb") as f:
         reader = make_reader(f)
+        origin = get_time_origin(reader)
+        start_ns = to_log_time(origin, start)
+        end_ns = to_log_time(origin, end)
+        if at is not None:
+            start_ns = find_message_at(reader, topic, to_log_time(origin, at))
         
-        for schema, channel, message in reader.iter_messages():
-            if channel.topic != topic:
-                continue
-            
+        first_index = 0
+        if after is not None:
+            window, first_index = read_page_after(reader, topic, after, end_ns, num_messages)
+        elif before is not None:
+            window, first_index = read_page_before(reader, topic, before, start_ns, num_messages)
+        elif at is not None and start_ns is None:
+            window = []
+        else:
+            window = read_topic_window(reader, topic, start_ns, end_ns, limit=num_messages)
+        first_time = origin if origin is not None else (window[0][1].log_time if window else None)
+        
+        for channel, message in window:
             message_count += 1
             
-            if first_time is None:
-                first_time = message.log_time
-            
             relative_time = (message.log_time - first_time) / 1e9
             
-            joint_state = parse_cdr_joint_state(message.data)
+            joint_state = decode_joint_state(message.data)
             
             if joint_state and message_count == 1:
                 # 只在第一条消息显示关节名称
-                print(f"🔧 关节列表: {', '.join(joint_state['names'])}")
-                print(f"🔢 关节数量: {len(joint_state['names'])}")
+                print(f"🔧 关节列表: {', '.join(joint_state['name'])}")
+                print(f"🔢 关节数量: {len(joint_state['name'])}")
                 print()
             
             if joint_state:
                 print(f"⏱️  消息 #{message_count} | 时间: {relative_time:.3f}s")
                 print(f"   位置 (rad/°): ", end="")
-                for i, pos in enumerate(joint_state['positions']):
+                for i, pos in enumerate(joint_state['position']):
                     print(f"[{i}]{pos:7.3f}({pos*180/3.14159:6.1f}°) ", end="")
                 print()
                 
-                if joint_state['velocities']:
+                if joint_state['velocity']:
                     print(f"   速度 (rad/s): ", end="")
-                    for i, vel in enumerate(joint_state['velocities']):
+                    for i, vel in enumerate(joint_state['velocity']):
                         print(f"[{i}]{vel:7.3f} ", end="")
                     print()
                 
-                if joint_state['efforts']:
+                if joint_state['effort']:
                     print(f"   力矩 (Nm):    ", end="")
-                    for i, eff in enumerate(joint_state['efforts']):
+                    for i, eff in enumerate(joint_state['effort']):
                         print(f"[{i}]{eff:7.3f} ", end="")
                     print()
                 
                 print()
-            
-            if message_count >= num_messages:
-                break
     
     if message_count == 0:
         print(f"❌ 未找到数据")
-    else:
-        print(f"✅ 显示了 {message_count} 条消息")
+        return None
+    print(f"✅ 显示了 {message_count} 条消息")
+    
+    # 最后一条消息在其 log_time 内的序号
+    last_index = first_index
+    for (_, previous), (_, message) in zip(window, window[1:]):
+        last_index = last_index + 1 if message.log_time == previous.log_time else 0
+    return (window[0][1].log_time, first_index), (window[-1][1].log_time, last_index + 1)
+
+
+def browse_topic(mcap_path, topic, num_messages, start=None, end=None, at=None):
+    """
+    分页浏览一个通道
+    
+    Returns:
+        bool: 用户选择退出程序时为 False
+    """
+    page = view_joint_data(mcap_path, topic, num_messages, start, end, at)
+    while True:
+        action = input("\n[n] 下一页  [p] 上一页  [t] 跳到时间  [回车] 返回通道列表  [q] 退出: ").strip().lower()
+        if action == 'q':
+            return False
+        if not action:
+            return True
+        
+        if action == 't':
+            try:
+                target = parse_time_arg(input("时间（秒，或 分:秒）: ").strip())
+            except ValueError:
+                print("❌ 请输入有效的时间")
+                continue
+            page = view_joint_data(mcap_path, topic, num_messages, end=end, at=target) or page
+        elif action in ('n', 'p') and page is None:
+            print("❌ 当前没有数据，请用 t 跳到其他时间")
+        elif action == 'n':
+            page = view_joint_data(mcap_path, topic, num_messages, end=end, after=page[1]) or page
+        elif action == 'p':
+            page = view_joint_data(mcap_path, topic, num_messages, start=start, end=end, before=page[0]) or page
+        else:
+            print("❌ 无效的选择")
 
 
-def interactive_menu():
-    """交互式菜单"""
+def interactive_menu(mcap_path=None, start=None, end=None, at=None, num_messages=None):
+    """
+    交互式菜单
+    
+    Args:
+        mcap_path: 直接打开的文件（默认在数据目录中选择）
+        start / end / at: 选择通道后从该时间窗口开始显示（相对文件开始的秒数）
+        num_messages: 每页消息数（默认询问）
+    """
     # 查找 MCAP 文件
     data_dir = Path("../QA_Feature_CaseDesign/3_Mcap Data/output-20260129")
     
-    if not data_dir.exists():
+    if mcap_path:
+        mcap_files = [Path(mcap_path)] if Path(mcap_path).exists() else []
+    elif not data_dir.exists():
         print("❌ 数据目录不存在")
         return
-    
-    mcap_files = sorted(data_dir.glob("*.mcap"))
+    else:
+        mcap_files = sorted(data_dir.glob("*.mcap"))
     
     if not mcap_files:
         print("❌ 未找到 MCAP 文件")
@@ -203,7 +219,7 @@ def interactive_menu():
         print(f"  {i}. {f.name} ({size:.2f} MB)")
     
     try:
-        choice = input(f"\n选择文件 (1-{len(mcap_files)}) [默认: 1]: ").strip()
+        choice = input(f"\n选择文件 (1-{len(mcap_files)}) [默认: 1]: ").strip() if len(mcap_files) > 1 else ""
         file_idx = int(choice) - 1 if choice else 0
         
         if file_idx < 0 or file_idx >= len(mcap_files):
@@ -243,16 +259,15 @@ def interactive_menu():
                 
                 topic = topics[topic_idx]
                 
-                # 询问显示数量
-                num_str = input("显示多少条消息? [默认: 5]: ").strip()
-                num_messages = int(num_str) if num_str else 5
-                
-                # 显示数据
-                view_joint_data(str(mcap_file), topic, num_messages)
+                # 询问每页显示数量
+                if num_messages is None:
+                    num_str = input("每页显示多少条消息? [默认: 5]: ").strip()
+                    page_size = int(num_str) if num_str else 5
+                else:
+                    page_size = num_messages
                 
-                # 继续查看其他通道
-                continue_choice = input("\n是否继续查看其他通道? (y/n) [默认: y]: ").strip().lower()
-                if continue_choice == 'n':
+                # 显示数据并翻页
+                if not browse_topic(str(mcap_file), topic, page_size, start, end, at):
                     print("\n👋 退出程序")
                     break
             
@@ -266,9 +281,23 @@ def interactive_menu():
         print(f"\n❌ 错误: {e}")
 
 
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='交互式 MCAP 关节数据查看器')
+    parser.add_argument('mcap_file', nargs='?', help='MCAP 文件路径（默认在数据目录中选择）')
+    parser.add_argument('--start', '-s', type=parse_time_arg, help='从该时间开始显示（相对文件开始的秒数，或 分:秒）')
+    parser.add_argument('--end', '-e', type=parse_time_arg, help='时间窗口结束（不含）')
+    parser.add_argument('--at', '-a', type=parse_time_arg, help='从该时刻的消息开始显示')
+    parser.add_argument('--max', '-m', type=int, help='每页消息数（默认询问）')
+    args = parser.parse_args()
+    
+    interactive_menu(args.mcap_file, args.start, args.end, args.at, args.max)
+
+
 if __name__ == "__main__":
     try:
-        interactive_menu()
+        main()
     except Exception as e:
         print(f"❌ 错误: {e}")
         import traceback
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+MCAP 数据集索引工具（fleet catalog）
+
+只读取每个 MCAP 文件的 Header、Footer / Summary 区和 Metadata 记录，
+不读取、不解压任何消息数据；目录树中的文件由多个进程并行打开。
+结果写入一个紧凑的 SQLite 目录库（可选同时导出 Parquet），之后全数据集
+的问题（哪些文件缺少某个 topic、某机型的总时长……）用 SQL 毫秒级回答。
+
+索引是增量的：目录树只做一次 stat 遍历，按 (inode, 大小, mtime) 与目录库
+比较，只重新读取新增 / 修改的文件，删除已消失文件的记录；仅被移动或改名
+的文件直接更新路径。watch 子命令按固定间隔重复这个比较，让目录库在
+录制设备不断写入新文件时保持分钟级以内的新鲜度。
+
+使用方法：
+    python mcap_catalog.py build <目录> [--db mcap_catalog.sqlite] [--workers 8] [--full] [--parquet 目录]
+    python mcap_catalog.py watch <目录> [--db mcap_catalog.sqlite] [--interval 10] [--settle 5]
+    python mcap_catalog.py topics [--db mcap_catalog.sqlite]
+    python mcap_catalog.py query "SELECT path, duration_s FROM files ORDER BY duration_s DESC LIMIT 5"
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mcap.reader import make_reader
+
+DEFAULT_DB = "mcap_catalog.sqlite"
+
+# 目录库结构：每个文件一行，通道 / schema / metadata 字段各一张子表
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    inode INTEGER,
+    size_bytes INTEGER,
+    mtime_ns INTEGER,
+    profile TEXT,
+    library TEXT,
+    has_summary INTEGER,
+    message_count INTEGER,
+    channel_count INTEGER,
+    schema_count INTEGER,
+    chunk_count INTEGER,
+    start_ns INTEGER,
+    end_ns INTEGER,
+    duration_s REAL,
+    compression TEXT,
+    compressed_bytes INTEGER,
+    uncompressed_bytes INTEGER,
+    error TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    channel_id INTEGER,
+    topic TEXT,
+    message_encoding TEXT,
+    schema_name TEXT,
+    message_count INTEGER,
+    chunk_start_ns INTEGER,
+    chunk_end_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS schemas (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    schema_id INTEGER,
+    name TEXT,
+    encoding TEXT
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT,
+    key TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_channels_file ON channels(file_id);
+CREATE INDEX IF NOT EXISTS idx_channels_topic ON channels(topic);
+CREATE INDEX IF NOT EXISTS idx_schemas_file ON schemas(file_id);
+CREATE INDEX IF NOT EXISTS idx_metadata_file ON metadata(file_id);
+CREATE INDEX IF NOT EXISTS idx_metadata_key ON metadata(name, key);
+"""
+
+FILE_COLUMNS = [
+    "path", "inode", "size_bytes", "mtime_ns", "profile", "library", "has_summary",
+    "message_count", "channel_count", "schema_count", "chunk_count",
+    "start_ns", "end_ns", "duration_s", "compression", "compressed_bytes",
+    "uncompressed_bytes", "error", "indexed_at",
+]
+CHANNEL_COLUMNS = ["channel_id", "topic", "message_encoding", "schema_name",
+                   "message_count", "chunk_start_ns", "chunk_end_ns"]
+SCHEMA_COLUMNS = ["schema_id", "name", "encoding"]
+METADATA_COLUMNS = ["name", "key", "value"]
+
+
+def find_mcap_files(root):
+    """递归查找目录下的所有 .mcap 文件（也接受单个文件路径），返回绝对路径"""
+    return sorted(stat_tree(root))
+
+
+def stat_tree(root):
+    """
+    遍历目录树，返回每个 .mcap 文件的 (inode, 大小, mtime_ns)
+
+    只做 stat，不打开文件；遍历中途消失的文件会被忽略。
+
+    Returns:
+        dict: 绝对路径 -> (inode, size_bytes, mtime_ns)
+    """
+    root = os.path.abspath(root)
+    if os.path.isfile(root):
+        try:
+            stat = os.stat(root)
+        except OSError:
+            return {}
+        return {root: (stat.st_ino, stat.st_size, stat.st_mtime_ns)}
+
+    files = {}
+    pending = [root]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".mcap") and entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+    return files
+
+
+def read_file_summary(path):
+    """
+    读取单个 MCAP 文件的摘要信息（不读取消息数据）
+
+    通道的时间范围来自 Chunk Index（覆盖该通道消息的第一个 / 最后一个
+    chunk 的时间边界），精度为 chunk 级别；文件级时间范围来自 Statistics，
+    是精确值。没有 Summary 区的文件（例如录制中断）只记录文件大小和
+    has_summary=0，不会回退到遍历消息。
+
+    文件无法 stat（例如在扫描期间被删除）时返回的记录 mtime_ns 为 None，
+    error 中是原因。
+
+    Returns:
+        dict: 文件行字段，以及 channels / schemas / metadata 三个列表
+    """
+    record = {column: None for column in FILE_COLUMNS}
+    record.update({
+        "path": str(path),
+        "has_summary": 0,
+        "indexed_at": time.time(),
+        "channels": [],
+        "schemas": [],
+        "metadata": [],
+    })
+
+    try:
+        stat = os.stat(path)
+        record.update(inode=stat.st_ino, size_bytes=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        with open(path, "rb") as f:
+            reader = make_reader(f)
+            header = reader.get_header()
+            record["profile"] = header.profile
+            record["library"] = header.library
+
+            summary = reader.get_summary()
+            if summary is None:
+                return record
+            record["has_summary"] = 1
+
+            stats = summary.statistics
+            counts = {}
+            if stats is not None:
+                record["message_count"] = stats.message_count
+                record["channel_count"] = stats.channel_count
+                record["schema_count"] = stats.schema_count
+                record["start_ns"] = stats.message_start_time
+                record["end_ns"] = stats.message_end_time
+                record["duration_s"] = (stats.message_end_time - stats.message_start_time) / 1e9
+                counts = stats.channel_message_counts or {}
+
+            # 压缩方式和大小来自 Chunk Index
+            chunk_indexes = summary.chunk_indexes or []
+            record["chunk_count"] = len(chunk_indexes)
+            record["compression"] = ",".join(sorted({ci.compression or "none" for ci in chunk_indexes})) or None
+            record["compressed_bytes"] = sum(ci.compressed_size for ci in chunk_indexes)
+            record["uncompressed_bytes"] = sum(ci.uncompressed_size for ci in chunk_indexes)
+
+            # 每个通道出现的 chunk 的时间边界
+            bounds = {}
+            for ci in chunk_indexes:
+                for channel_id in ci.message_index_offsets:
+                    start, end = bounds.get(channel_id, (ci.message_start_time, ci.message_end_time))
+                    bounds[channel_id] = (min(start, ci.message_start_time), max(end, ci.message_end_time))
+
+            for schema_id, schema in summary.schemas.items():
+                record["schemas"].append([schema_id, schema.name, schema.encoding])
+
+            for channel_id, channel in summary.channels.items():
+                schema = summary.schemas.get(channel.schema_id)
+                start, end = bounds.get(channel_id, (None, None))
+                record["channels"].append([
+                    channel_id, channel.topic, channel.message_encoding,
+                    schema.name if schema else None, counts.get(channel_id), start, end,
+                ])
+
+            # Metadata 记录通过 Summary 中的 Metadata Index 定位，只读取这些记录
+            for metadata in reader.iter_metadata():
+                for key, value in metadata.metadata.items():
+                    record["metadata"].append([metadata.name, key, value])
+    except Exception as e:
+        record["error"] = str(e)
+
+    return record
+
+
+def scan_files(paths, workers=None):
+    """
+    并行读取多个文件的摘要（按 paths 的顺序逐个返回）
+
+    Args:
+        paths: MCAP 文件路径列表
+        workers: 进程数，默认 CPU 核数；0 或 1 表示在当前进程内顺序读取
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield read_file_summary(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(read_file_summary, paths, chunksize=max(1, len(paths) // (workers * 8)))
+
+
+def open_catalog(db_path):
+    """打开（必要时创建）SQLite 目录库"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA_SQL)
+    # 早期版本的目录库没有 inode 列
+    if "inode" not in {row[1] for row in conn.execute("PRAGMA table_info(files)")}:
+        conn.execute("ALTER TABLE files ADD COLUMN inode INTEGER")
+    return conn
+
+
+def upsert_record(conn, record):
+    """写入一个文件的记录（同一路径的旧记录连同子表一起替换）"""
+    conn.execute("DELETE FROM files WHERE path = ?", (record["path"],))
+    cursor = conn.execute(
+        f"INSERT INTO files ({', '.join(FILE_COLUMNS)}) VALUES ({', '.join('?' * len(FILE_COLUMNS))})",
+        [record[column] for column in FILE_COLUMNS],
+    )
+    file_id = cursor.lastrowid
+    conn.executemany(
+        f"INSERT INTO channels (file_id, {', '.join(CHANNEL_COLUMNS)}) VALUES (?{', ?' * len(CHANNEL_COLUMNS)})",
+        [[file_id] + row for row in record["channels"]],
+    )
+    conn.executemany(
+        f"INSERT INTO schemas (file_id, {', '.join(SCHEMA_COLUMNS)}) VALUES (?{', ?' * len(SCHEMA_COLUMNS)})",
+        [[file_id] + row for row in record["schemas"]],
+    )
+    conn.executemany(
+        f"INSERT INTO metadata (file_id, {', '.join(METADATA_COLUMNS)}) VALUES (?{', ?' * len(METADATA_COLUMNS)})",
+        [[file_id] + row for row in record["metadata"]],
+    )
+    return file_id
+
+
+def write_parquet(conn, output_dir):
+    """
+    把目录库的四张表导出为 Parquet（需要 pyarrow）
+
+    子表用 path 代替 file_id，便于在其他工具中直接 join。
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("❌ 导出 Parquet 需要安装 pyarrow")
+        print("请运行: pip install pyarrow")
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    queries = {
+        "files": "SELECT * FROM files",
+        "channels": "SELECT f.path, c.* FROM channels c JOIN files f ON f.id = c.file_id",
+        "schemas": "SELECT f.path, s.* FROM schemas s JOIN files f ON f.id = s.file_id",
+        "metadata": "SELECT f.path, m.* FROM metadata m JOIN files f ON f.id = m.file_id",
+    }
+    for table, sql in queries.items():
+        cursor = conn.execute(sql)
+        names = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(names) if name != "file_id"}
+        pq.write_table(pa.table(columns), os.path.join(output_dir, f"{table}.parquet"))
+    return True
+
+
+def diff_catalog(conn, root, settle_s=0.0):
+    """
+    比较目录树与目录库，找出需要更新的文件
+
+    文件身份按 (inode, 大小, mtime_ns) 判断。mtime 距今不足 settle_s 秒的
+    文件视为仍在写入，本轮不处理（下一轮再比较）。
+
+    Returns:
+        dict: new / modified（需要读取的路径列表）、deleted（需要删除的路径）、
+              moved（旧路径 -> 新路径，只需改名）、pending（仍在写入）、unchanged
+    """
+    current = stat_tree(root)
+    root = os.path.abspath(root)
+    prefix = root if os.path.isfile(root) else root.rstrip(os.sep) + os.sep
+    known = {
+        path: (inode, size, mtime)
+        for path, inode, size, mtime in conn.execute("SELECT path, inode, size_bytes, mtime_ns FROM files")
+        if path == root or path.startswith(prefix)
+    }
+
+    cutoff = time.time_ns() - int(settle_s * 1e9)
+    delta = {"new": [], "modified": [], "deleted": [], "moved": {}, "pending": [], "unchanged": []}
+    for path, identity in current.items():
+        if known.get(path) == identity:
+            delta["unchanged"].append(path)
+        elif identity[2] > cutoff:
+            delta["pending"].append(path)
+        elif path in known:
+            delta["modified"].append(path)
+        else:
+            delta["new"].append(path)
+
+    deleted = [path for path in known if path not in current]
+    by_identity = {known[path]: path for path in deleted}
+    for path in list(delta["new"]):
+        old = by_identity.pop(current[path], None)
+        if old is not None:
+            delta["moved"][old] = path
+            delta["new"].remove(path)
+    delta["deleted"] = [path for path in deleted if path not in delta["moved"]]
+    return delta
+
+
+def update_catalog(conn, root, workers=None, settle_s=0.0, full=False, verbose=True):
+    """
+    增量更新目录库：只读取新增 / 修改的文件
+
+    Args:
+        conn: open_catalog 返回的连接
+        root: MCAP 文件目录（递归）或单个文件
+        workers: 并行进程数
+        settle_s: 跳过最近 settle_s 秒内修改过的文件
+        full: 忽略目录库中的记录，重新读取所有文件
+
+    Returns:
+        dict: diff_catalog 的结果，另加 indexed（读取的文件数）、bytes、errors
+    """
+    delta = diff_catalog(conn, root, settle_s)
+    if full:
+        delta["modified"] += delta["unchanged"] + list(delta["moved"].values())
+        delta["deleted"] += list(delta["moved"])
+        delta["unchanged"], delta["moved"] = [], {}
+
+    paths = sorted(delta["new"] + delta["modified"])
+    delta.update(indexed=len(paths), bytes=0, errors=0)
+    with conn:
+        for old, new in delta["moved"].items():
+            conn.execute("UPDATE files SET path = ? WHERE path = ?", (new, old))
+        conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in delta["deleted"]])
+        for record in scan_files(paths, workers):
+            # 在 stat 遍历之后被删除的文件
+            if record["mtime_ns"] is None and not os.path.exists(record["path"]):
+                conn.execute("DELETE FROM files WHERE path = ?", (record["path"],))
+                delta["deleted"].append(record["path"])
+                delta["indexed"] -= 1
+                continue
+            upsert_record(conn, record)
+            delta["bytes"] += record["size_bytes"] or 0
+            if record["error"] or not record["has_summary"]:
+                delta["errors"] += 1
+                if verbose:
+                    print(f"  ⚠️  {record['path']}: {record['error'] or '没有 Summary 区'}")
+    return delta
+
+
+def build_catalog(root, db_path=DEFAULT_DB, workers=None, parquet_dir=None, full=False):
+    """
+    为目录树中的 MCAP 文件建立 / 增量更新目录库
+
+    Returns:
+        int: 目录树中的文件数
+    """
+    if not os.path.exists(root):
+        print(f"❌ 路径不存在: {root}")
+        return 0
+
+    start = time.perf_counter()
+    conn = open_catalog(db_path)
+    delta = update_catalog(conn, root, workers, full=full)
+    elapsed = time.perf_counter() - start
+
+    total = delta["indexed"] + len(delta["unchanged"]) + len(delta["moved"]) + len(delta["pending"])
+    if not total:
+        print(f"❌ 未找到 MCAP 文件: {root}")
+    print(f"📁 {total} 个 MCAP 文件: 新增 {len(delta['new'])}，修改 {len(delta['modified'])}，"
+          f"移动 {len(delta['moved'])}，删除 {len(delta['deleted'])}，未变 {len(delta['unchanged'])}")
+    print(f"✅ 已索引 {delta['indexed']} 个文件（{delta['bytes'] / 2**30:.2f} GB 数据）"
+          f"，用时 {elapsed:.2f} 秒")
+    if delta["errors"]:
+        print(f"⚠️  {delta['errors']} 个文件没有可用的摘要")
+    print(f"💾 目录库: {db_path}")
+
+    if parquet_dir and write_parquet(conn, parquet_dir):
+        print(f"💾 Parquet: {parquet_dir}")
+    conn.close()
+    return total
+
+
+def watch_catalog(root, db_path=DEFAULT_DB, workers=None, interval_s=10.0, settle_s=5.0):
+    """
+    持续监视目录树，每 interval_s 秒把变化同步到目录库（Ctrl+C 退出）
+
+    每轮只做一次 stat 遍历，没有变化时不读取任何文件；仍在写入的文件
+    （mtime 距今不足 settle_s 秒）留到下一轮。目录库的延迟约为
+    interval_s + settle_s。某一轮出错（目录暂时不可访问、目录库被锁定
+    等）只打印错误，下一轮重试。
+    """
+    conn = open_catalog(db_path)
+    print(f"👀 监视 {root}（间隔 {interval_s:g} 秒，稳定时间 {settle_s:g} 秒），目录库: {db_path}")
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                delta = update_catalog(conn, root, workers, settle_s)
+            except Exception as e:
+                print(f"[{time.strftime('%H:%M:%S')}] ❌ 本轮更新失败，下一轮重试: {e}")
+                delta = {"indexed": 0, "deleted": [], "moved": {}}
+            if delta["indexed"] or delta["deleted"] or delta["moved"]:
+                print(f"[{time.strftime('%H:%M:%S')}] 新增 {len(delta['new'])}，修改 {len(delta['modified'])}，"
+                      f"移动 {len(delta['moved'])}，删除 {len(delta['deleted'])}，"
+                      f"写入中 {len(delta['pending'])}（{time.perf_counter() - start:.2f} 秒）")
+            time.sleep(max(0.0, interval_s - (time.perf_counter() - start)))
+    except KeyboardInterrupt:
+        print("\n已停止监视")
+    finally:
+        conn.close()
+
+
+def print_rows(cursor):
+    """以对齐的表格打印查询结果"""
+    names = [d[0] for d in cursor.description]
+    rows = [["" if v is None else str(v) for v in row] for row in cursor.fetchall()]
+    widths = [max([len(name)] + [len(row[i]) for row in rows]) for i, name in enumerate(names)]
+    print("  ".join(name.ljust(width) for name, width in zip(names, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+    print(f"({len(rows)} 行)")
+
+
+def topic_summary(conn):
+    """每个 topic 出现在多少个文件中，以及缺少它的文件数"""
+    return conn.execute("""
+        SELECT c.topic,
+               COUNT(DISTINCT c.file_id) AS files,
+               (SELECT COUNT(*) FROM files WHERE has_summary = 1) - COUNT(DISTINCT c.file_id) AS missing_in,
+               SUM(c.message_count) AS messages,
+               GROUP_CONCAT(DISTINCT c.schema_name) AS schemas
+        FROM channels c
+        GROUP BY c.topic
+        ORDER BY files DESC, c.topic
+    """)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCAP 数据集索引工具（只读取 Summary 区）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="扫描目录并建立 / 更新目录库")
+    build.add_argument("root", help="MCAP 文件目录（递归）或单个文件")
+    build.add_argument("--db", default=DEFAULT_DB, help=f"SQLite 目录库路径（默认 {DEFAULT_DB}）")
+    build.add_argument("--workers", "-w", type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    build.add_argument("--full", action="store_true", help="重新读取所有文件（默认只读取新增 / 修改的文件）")
+    build.add_argument("--parquet", help="同时把目录库导出为 Parquet 到该目录（需要 pyarrow）")
+
+    watch = sub.add_parser("watch", help="持续监视目录，增量更新目录库")
+    watch.add_argument("root", help="MCAP 文件目录（递归）")
+    watch.add_argument("--db", default=DEFAULT_DB, help=f"SQLite 目录库路径（默认 {DEFAULT_DB}）")
+    watch.add_argument("--workers", "-w", type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    watch.add_argument("--interval", type=float, default=10.0, help="两次目录比较的间隔秒数（默认 10）")
+    watch.add_argument("--settle", type=float, default=5.0,
+                       help="最近这么多秒内修改过的文件视为仍在写入，留到下一轮（默认 5）")
+
+    topics = sub.add_parser("topics", help="各 topic 出现在多少个文件中")
+    topics.add_argument("--db", default=DEFAULT_DB, help="SQLite 目录库路径")
+
+    query = sub.add_parser("query", help="在目录库上执行 SQL")
+    query.add_argument("sql", help="SQL 语句（表：files, channels, schemas, metadata）")
+    query.add_argument("--db", default=DEFAULT_DB, help="SQLite 目录库路径")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        sys.exit(0 if build_catalog(args.root, args.db, args.workers, args.parquet, args.full) else 1)
+    if args.command == "watch":
+        watch_catalog(args.root, args.db, args.workers, args.interval, args.settle)
+        return
+
+    if not os.path.exists(args.db):
+        print(f"❌ 目录库不存在: {args.db}（先运行 build）")
+        sys.exit(1)
+    conn = open_catalog(args.db)
+    start = time.perf_counter()
+    cursor = topic_summary(conn) if args.command == "topics" else conn.execute(args.sql)
+    print_rows(cursor)
+    print(f"⏱️  {(time.perf_counter() - start) * 1000:.1f} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -220,19 +220,32 @@ def extract_camera_frames(mcap_path, output_dir, topic_filter=None, frame_interv
         print(f"  {topic}: 处理 {count} 帧, 保存 {saved_count} 帧")
 
 
-def compare_mcap_files(mcap_paths):
+def compare_mcap_files(mcap_paths, workers=None):
     """
     比较多个 MCAP 文件的结构
+    
+    只读取每个文件的 Summary 区（并行打开），不遍历消息数据，
+    见 mcap_catalog.read_file_summary
     """
+    from mcap_catalog import scan_files
+    
     print(f"\n{'='*60}")
     print(f"比较 {len(mcap_paths)} 个 MCAP 文件")
     print(f"{'='*60}\n")
     
     all_info = {}
-    for path in mcap_paths:
-        name = os.path.basename(path)
-        print(f"处理: {name}")
-        all_info[name] = analyze_mcap_structure(path)
+    for record in scan_files(list(mcap_paths), workers):
+        name = os.path.basename(record['path'])
+        if record['error'] or not record['has_summary']:
+            print(f"⚠️  {name}: {record['error'] or '没有 Summary 区，跳过'}")
+            continue
+        duration = record['duration_s'] or 0
+        print(f"处理: {name} - {record['message_count']} 条消息, "
+              f"{len(record['channels'])} 个通道, {duration:.2f} 秒")
+        topics = {}
+        for _, topic, _, _, count, _, _ in record['channels']:
+            topics[topic] = topics.get(topic, 0) + (count or 0)
+        all_info[name] = topics
     
     # 打印比较结果
     print(f"\n{'='*60}")
@@ -240,14 +253,16 @@ def compare_mcap_files(mcap_paths):
     print(f"{'='*60}")
     
     all_topics = set()
-    for info in all_info.values():
-        if info:
-            for channel_info in info.values():
-                all_topics.add(channel_info['topic'])
+    for topics in all_info.values():
+        all_topics.update(topics)
     
     print(f"\n所有发现的 topics:")
     for topic in sorted(all_topics):
-        print(f"  - {topic}")
+        missing = [name for name, topics in all_info.items() if topic not in topics]
+        suffix = f"  (缺失: {', '.join(missing)})" if missing else ""
+        print(f"  - {topic}{suffix}")
+    
+    return all_info
 
 
 def main():
@@ -1,17 +1,105 @@
 #!/usr/bin/env python3
 """
 快速查看 MCAP 文件内容
-使用方法：python quick_view.py <mcap文件路径>
+使用方法：python quick_view.py <mcap文件路径> [--full]
+
+默认只读取 Summary 区：消息数来自 Statistics，时间范围来自 Chunk Index 和
+Message Index 记录，每个通道的样本消息通过 seek 到包含该通道的第一个 chunk
+读取。不论文件多大都在一秒内返回。--full 遍历全部消息，得到精确的平均大小
+和数据量。
 """
 
+import struct
 import sys
+import time
 from mcap.reader import make_reader
 from pathlib import Path
 from datetime import datetime
 
+# Message Index 记录：opcode(1) + 长度(8) + channel_id(2) + 条目字节数(4)，条目为 (log_time, offset)
+MESSAGE_INDEX_PREFIX = struct.Struct('<BQHI')
+
+
+def read_message_index_times(f, offset):
+    """读取一条 Message Index 记录，返回其中所有消息的 log_time（不读取消息本身）"""
+    f.seek(offset)
+    _, _, _, entries_len = MESSAGE_INDEX_PREFIX.unpack(f.read(MESSAGE_INDEX_PREFIX.size))
+    data = f.read(entries_len)
+    return [log_time for log_time, _ in struct.iter_unpack('<QQ', data)]
+
 
-def quick_view(mcap_path):
-    """快速查看 MCAP 文件信息"""
+def channel_time_range(f, summary, channel_id):
+    """
+    通道第一条 / 最后一条消息的 log_time
+
+    只读取可能包含首尾消息的 chunk 的 Message Index 记录（chunk 不重叠时
+    各一个）。文件没有 Message Index 时返回 None。
+    """
+    chunks = [ci for ci in summary.chunk_indexes if channel_id in ci.message_index_offsets]
+    if not chunks:
+        return None
+    
+    # 首条消息一定在 start <= 最早 chunk 的 end 的某个 chunk 中，末条同理
+    first_end = min(chunks, key=lambda ci: ci.message_start_time).message_end_time
+    last_start = max(chunks, key=lambda ci: ci.message_end_time).message_start_time
+    first = last = None
+    for ci in chunks:
+        if ci.message_start_time > first_end and ci.message_end_time < last_start:
+            continue
+        times = read_message_index_times(f, ci.message_index_offsets[channel_id])
+        if times:
+            first = min(times) if first is None else min(first, min(times))
+            last = max(times) if last is None else max(last, max(times))
+    return None if first is None else (first, last)
+
+
+def sample_message(reader, channel, time_range):
+    """读取通道的第一条消息（只解压包含它的 chunk）"""
+    start = time_range[0] if time_range else None
+    end = time_range[0] + 1 if time_range else None
+    for _, msg_channel, message in reader.iter_messages(topics=[channel.topic], start_time=start, end_time=end):
+        if msg_channel.id == channel.id:
+            return message
+    return None
+
+
+def print_channels_from_summary(f, reader, summary):
+    """只根据 Summary 区打印每个通道的信息"""
+    counts = summary.statistics.channel_message_counts if summary.statistics else {}
+    
+    for i, (channel_id, channel) in enumerate(summary.channels.items(), 1):
+        schema = summary.schemas.get(channel.schema_id)
+        print(f"\n通道 {i}: {channel.topic}")
+        print(f"  └─ 消息编码: {channel.message_encoding}")
+        if schema:
+            print(f"  └─ Schema:   {schema.name}")
+        
+        count = counts.get(channel_id, 0)
+        print(f"  └─ 消息数量: {count:,}")
+        if not count:
+            continue
+        
+        time_range = channel_time_range(f, summary, channel_id)
+        if time_range:
+            duration = (time_range[1] - time_range[0]) / 1e9
+            fps = count / duration if duration > 0 else 0
+            print(f"  └─ 平均帧率: {fps:.2f} fps")
+            print(f"  └─ 时间范围: {duration:.2f} 秒")
+        
+        message = sample_message(reader, channel, time_range)
+        if message is not None:
+            print(f"  └─ 样本大小: {len(message.data)/1024:.2f} KB/消息 "
+                  f"(约 {len(message.data) * count/1024/1024:.2f} MB)")
+
+
+def quick_view(mcap_path, full=False):
+    """
+    快速查看 MCAP 文件信息
+    
+    Args:
+        mcap_path: MCAP 文件路径
+        full: 遍历全部消息统计精确的大小（默认只读取 Summary 区）
+    """
     
     if not Path(mcap_path).exists():
         print(f"❌ 文件不存在: {mcap_path}")
@@ -21,6 +109,7 @@ def quick_view(mcap_path):
     file_size = Path(mcap_path).stat().st_size / (1024 * 1024)
     print(f"📊 大小: {file_size:.2f} MB\n")
     
+    started = time.perf_counter()
     with open(mcap_path, "rb") as f:
         reader = make_reader(f)
         
@@ -49,7 +138,16 @@ def quick_view(mcap_path):
                 print()
             
             # 通道信息
-            if summary and summary.channels:
+            if summary and summary.channels and summary.statistics and not full:
+                print("=" * 70)
+                print("📡 通道列表（仅 Summary 区，使用 --full 遍历全部消息）")
+                print("=" * 70)
+                
+                print_channels_from_summary(f, reader, summary)
+                
+                print("\n" + "=" * 70)
+            
+            elif summary and summary.channels:
                 print("=" * 70)
                 print("📡 通道列表")
                 print("=" * 70)
@@ -132,11 +230,16 @@ def quick_view(mcap_path):
             print(f"❌ 错误: {e}")
             import traceback
             traceback.print_exc()
+    
+    print(f"⏱️  用时 {time.perf_counter() - started:.3f} 秒")
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("使用方法: python quick_view.py <mcap文件路径>")
+    full = "--full" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--full"]
+    
+    if not args:
+        print("使用方法: python quick_view.py <mcap文件路径> [--full]")
         print("\n示例:")
         print("  python quick_view.py ../QA_Feature_CaseDesign/4_Mcap\\ Data/output-20260129/0.mcap")
         print("  python quick_view.py path/to/file.mcap")
@@ -160,14 +263,14 @@ def main():
             
             # 自动分析第一个文件
             print(f"\n自动分析第一个文件: {mcap_files[0]}")
-            quick_view(str(mcap_files[0]))
+            quick_view(str(mcap_files[0]), full)
         else:
             print("\n❌ 未找到 MCAP 文件")
         
         return
     
-    mcap_path = sys.argv[1]
-    quick_view(mcap_path)
+    mcap_path = args[0]
+    quick_view(mcap_path, full)
 
 
 if __name__ == "__main__":
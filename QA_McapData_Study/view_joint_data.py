@@ -2,129 +2,95 @@
 """
 查看 MCAP 文件中的关节状态数据
 可以查看具体的关节位置、速度、力矩等信息
+
+--start / --end / --at 指定时间窗口（相对文件开始的秒数，或 分:秒 / 时:分:秒），
+读取时按 Chunk Index 直接 seek 到覆盖该时间的 chunk，不解码之前的数据。
 """
 
 import sys
+from collections import deque
+from itertools import islice
 from mcap.reader import make_reader
 from pathlib import Path
-import struct
+
+# JointState 解码使用 QA_Mcap_Checker 中共享的 CDR 解码器，与检查工具结果一致
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "QA_Mcap_Checker"))
+from mcap_checker.cdr import decode_joint_state
 
 
-def parse_cdr_joint_state(data):
+def parse_time_arg(value):
     """
-    解析 CDR 编码的 JointState 消息
-    
-    JointState 消息格式（ROS 2）:
-    - header (Header)
-    - name[] (string array)
-    - position[] (double array)
-    - velocity[] (double array)
-    - effort[] (double array)
+    解析时间参数，返回相对文件开始的秒数
+
+    支持 "90"、"90.5"、"1:30"（分:秒）、"0:27:00"（时:分:秒）
     """
-    try:
-        # CDR 格式解析（简化版）
-        # 注意：这是一个简化的解析器，可能需要根据实际消息格式调整
-        
-        offset = 0
-        
-        # 跳过 CDR header (4 bytes)
-        offset += 4
-        
-        # 解析 Header
-        # timestamp (int32 sec + uint32 nanosec)
-        if len(data) < offset + 8:
-            return None
-        
-        sec = struct.unpack_from('<i', data, offset)[0]
-        offset += 4
-        nanosec = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        
-        timestamp = sec + nanosec / 1e9
-        
-        # 跳过 frame_id string
-        if len(data) < offset + 4:
-            return None
-        string_len = struct.unpack_from('<I', data, offset)[0]
-        offset += 4 + string_len
-        
-        # 对齐到 4 字节边界
-        if offset % 4 != 0:
-            offset += 4 - (offset % 4)
-        
-        # 解析 name array
-        if len(data) < offset + 4:
-            return None
-        name_count = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        
-        names = []
-        for _ in range(name_count):
-            if len(data) < offset + 4:
-                break
-            name_len = struct.unpack_from('<I', data, offset)[0]
-            offset += 4
-            if len(data) < offset + name_len:
-                break
-            name = data[offset:offset + name_len].decode('utf-8').rstrip('\x00')
-            names.append(name)
-            offset += name_len
-            # 对齐
-            if offset % 4 != 0:
-                offset += 4 - (offset % 4)
-        
-        # 解析 position array
-        if len(data) < offset + 4:
-            return {"timestamp": timestamp, "names": names, "positions": [], "velocities": [], "efforts": []}
-        
-        pos_count = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        
-        positions = []
-        for _ in range(pos_count):
-            if len(data) < offset + 8:
-                break
-            pos = struct.unpack_from('<d', data, offset)[0]
-            positions.append(pos)
-            offset += 8
-        
-        # 解析 velocity array
-        velocities = []
-        if len(data) >= offset + 4:
-            vel_count = struct.unpack_from('<I', data, offset)[0]
-            offset += 4
-            for _ in range(vel_count):
-                if len(data) < offset + 8:
-                    break
-                vel = struct.unpack_from('<d', data, offset)[0]
-                velocities.append(vel)
-                offset += 8
-        
-        # 解析 effort array
-        efforts = []
-        if len(data) >= offset + 4:
-            eff_count = struct.unpack_from('<I', data, offset)[0]
-            offset += 4
-            for _ in range(eff_count):
-                if len(data) < offset + 8:
-                    break
-                eff = struct.unpack_from('<d', data, offset)[0]
-                efforts.append(eff)
-                offset += 8
-        
-        return {
-            "timestamp": timestamp,
-            "names": names,
-            "positions": positions,
-            "velocities": velocities,
-            "efforts": efforts
-        }
-    
-    except Exception as e:
+    if value is None:
         return None
+    seconds = 0.0
+    for part in str(value).strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
 
 
-def view_joint_data(mcap_path, topic, max_messages=10, show_raw=False):
+def get_time_origin(reader):
+    """文件第一条消息的 log_time（来自 Statistics；没有 Summary 时返回 None）"""
+    summary = reader.get_summary()
+    if summary and summary.statistics:
+        return summary.statistics.message_start_time
+    return None
+
+
+def to_log_time(origin, seconds):
+    """相对秒数 -> 绝对 log_time（纳秒）"""
+    if seconds is None:
+        return None
+    return (origin or 0) + int(round(seconds * 1e9))
+
+
+def read_topic_window(reader, topic, start_ns=None, end_ns=None, limit=None, reverse=False):
+    """
+    读取一个 topic 在 [start_ns, end_ns) 内的消息，按时间升序返回
+
+    SeekingReader 按 Chunk Index 只解压与时间窗口重叠、且包含该 topic 的
+    chunk，并且是惰性读取，取满 limit 条即停止。reverse=True 时取窗口中
+    最后 limit 条（向前翻页）。
+
+    Returns:
+        list: [(channel, message), ...]
+    """
+    summary = reader.get_summary()
+    indexed = summary is not None and bool(summary.chunk_indexes)
+    messages = reader.iter_messages(
+        topics=[topic], start_time=start_ns, end_time=end_ns,
+        reverse=reverse and indexed
+    )
+    pairs = ((channel, message) for _, channel, message in messages)
+    
+    if not reverse:
+        return list(islice(pairs, limit))
+    if not indexed:
+        # 没有索引时只能顺序读取，保留最后 limit 条
+        return list(deque(pairs, maxlen=limit))
+    window = list(islice(pairs, limit))
+    window.reverse()
+    return window
+
+
+def find_message_at(reader, topic, at_ns):
+    """
+    时刻 at_ns 的消息：at_ns 之前（含）的最后一条，没有则为之后的第一条
+
+    Returns:
+        int: 该消息的 log_time，topic 没有消息时返回 None
+    """
+    for _, message in read_topic_window(reader, topic, end_ns=at_ns + 1, limit=1, reverse=True):
+        return message.log_time
+    for _, message in read_topic_window(reader, topic, start_ns=at_ns, limit=1):
+        return message.log_time
+    return None
+
+
+def view_joint_data(mcap_path, topic, max_messages=10, show_raw=False, start=None, end=None, at=None):
     """
     查看指定 topic 的关节数据
     
@@ -133,6 +99,9 @@ def view_joint_data(mcap_path, topic, max_messages=10, show_raw=False):
         topic: 要查看的 topic
         max_messages: 显示的最大消息数
         show_raw: 是否显示原始数据
+        start: 窗口开始（相对文件开始的秒数）
+        end: 窗口结束（秒，不含）
+        at: 从该时刻的消息（之前最后一条）开始显示，优先于 start
     """
     print(f"\n{'='*80}")
     print(f"查看关节数据: {topic}")
@@ -143,20 +112,22 @@ def view_joint_data(mcap_path, topic, max_messages=10, show_raw=False):
         return
     
     message_count = 0
-    first_time = None
     
     with open(mcap_path, "rb") as f:
         reader = make_reader(f)
+        origin = get_time_origin(reader)
+        start_ns = to_log_time(origin, start)
+        end_ns = to_log_time(origin, end)
+        if at is not None:
+            start_ns = find_message_at(reader, topic, to_log_time(origin, at))
         
-        for schema, channel, message in reader.iter_messages():
-            if channel.topic != topic:
-                continue
-            
+        window = [] if at is not None and start_ns is None else \
+            read_topic_window(reader, topic, start_ns, end_ns, limit=max_messages + 1)
+        first_time = origin if origin is not None else (window[0][1].log_time if window else None)
+        
+        for channel, message in window[:max_messages]:
             message_count += 1
             
-            if first_time is None:
-                first_time = message.log_time
-            
             relative_time = (message.log_time - first_time) / 1e9
             
             print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
@@ -168,30 +139,30 @@ def view_joint_data(mcap_path, topic, max_messages=10, show_raw=False):
             print(f"  数据大小:   {len(message.data)} bytes")
             
             # 解析关节状态
-            joint_state = parse_cdr_joint_state(message.data)
+            joint_state = decode_joint_state(message.data)
             
             if joint_state:
                 print(f"\n  📊 关节状态:")
                 
-                if joint_state['names']:
-                    print(f"     关节名称: {', '.join(joint_state['names'])}")
+                if joint_state['name']:
+                    print(f"     关节名称: {', '.join(joint_state['name'])}")
                 
-                if joint_state['positions']:
+                if joint_state['position']:
                     print(f"\n     🔵 位置 (Position):")
-                    for i, pos in enumerate(joint_state['positions']):
-                        joint_name = joint_state['names'][i] if i < len(joint_state['names']) else f"Joint{i}"
+                    for i, pos in enumerate(joint_state['position']):
+                        joint_name = joint_state['name'][i] if i < len(joint_state['name']) else f"Joint{i}"
                         print(f"        [{i}] {joint_name:20s}: {pos:10.6f} rad ({pos*180/3.14159:.2f}°)")
                 
-                if joint_state['velocities']:
+                if joint_state['velocity']:
                     print(f"\n     🟢 速度 (Velocity):")
-                    for i, vel in enumerate(joint_state['velocities']):
-                        joint_name = joint_state['names'][i] if i < len(joint_state['names']) else f"Joint{i}"
+                    for i, vel in enumerate(joint_state['velocity']):
+                        joint_name = joint_state['name'][i] if i < len(joint_state['name']) else f"Joint{i}"
                         print(f"        [{i}] {joint_name:20s}: {vel:10.6f} rad/s")
                 
-                if joint_state['efforts']:
+                if joint_state['effort']:
                     print(f"\n     🔴 力矩 (Effort):")
-                    for i, eff in enumerate(joint_state['efforts']):
-                        joint_name = joint_state['names'][i] if i < len(joint_state['names']) else f"Joint{i}"
+                    for i, eff in enumerate(joint_state['effort']):
+                        joint_name = joint_state['name'][i] if i < len(joint_state['name']) else f"Joint{i}"
                         print(f"        [{i}] {joint_name:20s}: {eff:10.6f} Nm")
             
             else:
@@ -203,11 +174,14 @@ def view_joint_data(mcap_path, topic, max_messages=10, show_raw=False):
             
             print()
             
-            if message_count >= max_messages:
-                print(f"... (已显示 {max_messages} 条消息，使用 --max 参数查看更多)")
-                break
+        if len(window) > max_messages:
+            print(f"... (已显示 {max_messages} 条消息，使用 --max 参数查看更多，"
+                  f"或 --start {(window[-1][1].log_time - first_time) // 1000000 / 1000:.3f} 查看下一页)")
         
-        if message_count == 0:
+        summary = reader.get_summary()
+        if message_count == 0 and summary and any(c.topic == topic for c in summary.channels.values()):
+            print(f"❌ 时间窗口内没有 {topic} 的消息")
+        elif message_count == 0:
             print(f"❌ 未找到 topic: {topic}")
             print(f"\n可用的 topics:")
             
@@ -274,6 +248,13 @@ def main():
   
   # 显示原始数据
   python view_joint_data.py ../QA_Feature_CaseDesign/4_Mcap\ Data/output-20260129/0.mcap --topic /robot/arm_left_lead/joint_states --raw
+  
+  # 查看第 2 分钟开始的 20 条消息（直接 seek，不解码之前的数据）
+  python view_joint_data.py ../QA_Feature_CaseDesign/4_Mcap\ Data/output-20260129/0.mcap --start 2:00 --max 20
+  
+  # 查看 95.5 秒时刻的关节状态，或 10~12 秒之间的全部消息
+  python view_joint_data.py ../QA_Feature_CaseDesign/4_Mcap\ Data/output-20260129/0.mcap --at 95.5 --max 1
+  python view_joint_data.py ../QA_Feature_CaseDesign/4_Mcap\ Data/output-20260129/0.mcap --start 10 --end 12 --max 1000
         """
     )
     
@@ -282,6 +263,9 @@ def main():
     parser.add_argument('--max', '-m', type=int, default=10, help='显示的最大消息数（默认: 10）')
     parser.add_argument('--list', '-l', action='store_true', help='列出所有 topics')
     parser.add_argument('--raw', '-r', action='store_true', help='显示原始数据')
+    parser.add_argument('--start', '-s', type=parse_time_arg, help='窗口开始时间（相对文件开始的秒数，或 分:秒）')
+    parser.add_argument('--end', '-e', type=parse_time_arg, help='窗口结束时间（不含）')
+    parser.add_argument('--at', '-a', type=parse_time_arg, help='查看该时刻的消息（该时刻之前的最后一条）')
     
     args = parser.parse_args()
     
@@ -297,7 +281,7 @@ def main():
     if args.list:
         list_topics(args.mcap_file)
     elif args.topic:
-        view_joint_data(args.mcap_file, args.topic, args.max, args.raw)
+        view_joint_data(args.mcap_file, args.topic, args.max, args.raw, args.start, args.end, args.at)
     else:
         # 默认显示左臂主控制器
         print("ℹ️  未指定 topic，使用默认: /robot/arm_left_lead/joint_states")
@@ -306,7 +290,10 @@ def main():
             args.mcap_file, 
             "/robot/arm_left_lead/joint_states", 
             args.max, 
-            args.raw
+            args.raw,
+            args.start,
+            args.end,
+            args.at
         )
 
 
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Checker benchmark suite.
+
+Generates synthetic episodes (synth_mcap.py) for a set of size tiers and
+times ``run_checks`` on each of them: the full run without profiling,
+and every rule group with ``run_checks(profile=True)``. Each measurement
+is the best of ``--repeat`` runs. Results are written as JSON and
+compared against a saved baseline; rules that got slower than the
+tolerance are reported as regressions (exit code 1), as are fault tiers
+whose injected faults were not reported.
+
+Generated files are cached in ``benchmarks/.data`` (keyed by the tier
+spec), so only the first run pays for generation.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # all tiers, compare with baseline.json
+    python benchmarks/run_benchmarks.py --tiers 1min,10min --repeat 5
+    python benchmarks/run_benchmarks.py --save-baseline      # store this run as the baseline
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from mcap_checker import config
+from mcap_checker.checker import run_checks
+from synth_mcap import generate_mcap
+
+# Bump when the generator output changes (invalidates cached files)
+GENERATOR_VERSION = 2
+
+# Size tiers: generate_mcap keyword arguments. D1 matches every frame to the
+# nearest joint message, so the desync tier logs joints at 10 Hz: a 50 ms late
+# frame is then up to 50 ms from a joint message (> MAX_SYNC_MS). The rollback
+# fails B1, which skips C/D/F, so it gets a tier of its own.
+TIERS: Dict[str, Dict[str, Any]] = {
+    "1min": {"duration_s": 60.0},
+    "1min-faults": {
+        "duration_s": 60.0,
+        "joint_hz": 10.0,
+        "faults": {"gap": [[12.0, 0.5]], "nan": [30.0], "desync": [[35.0, 20.0, 50.0]]},
+    },
+    "1min-rollback": {"duration_s": 60.0, "faults": {"rollback": [40.0]}},
+    "10min": {"duration_s": 600.0},
+    "1h": {"duration_s": 3600.0},
+}
+
+# Items the injected faults must produce (checked on every run)
+EXPECTED_ITEMS: Dict[str, List[str]] = {
+    "1min-faults": ["C1: Large time gap detected", "E1: NaN in joint values", "D1: Camera-joint desync"],
+    "1min-rollback": ["B1: Timestamp rollback"],
+}
+
+DATA_DIR = BENCH_DIR / ".data"
+RESULTS_DIR = BENCH_DIR / "results"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def tier_file(name: str, spec: Dict[str, Any]) -> Path:
+    """Generate (once) and return the MCAP file of a tier."""
+    payload = json.dumps([GENERATOR_VERSION, spec], sort_keys=True)
+    digest = hashlib.blake2b(payload.encode(), digest_size=6).hexdigest()
+    path = DATA_DIR / f"{name}-{digest}.mcap"
+    if not path.exists():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        tmp = path.with_suffix(".tmp")
+        counts = generate_mcap(str(tmp), **spec)
+        os.replace(tmp, path)
+        print(f"  generated {path.name}: {counts['file_size'] / 2**20:.1f} MiB "
+              f"in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def bench_tier(path: Path, repeat: int, chunk_workers: int) -> Dict[str, Any]:
+    """Best-of-``repeat`` total and per-rule wall times of one file."""
+    totals = []
+    rules: Dict[str, List[float]] = {}
+    report = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        report = run_checks(str(path), chunk_workers=chunk_workers)
+        totals.append(time.perf_counter() - started)
+
+        profiled = run_checks(str(path), chunk_workers=chunk_workers, profile=True)
+        for rule, entry in profiled.profiler.to_dict().items():
+            rules.setdefault(rule, []).append(entry["wall_s"])
+
+    return {
+        "file_mb": round(path.stat().st_size / 2**20, 2),
+        "level": report.level,
+        "issues": sorted({name for status, name, _ in report.items if status != "PASS"}),
+        "total_s": round(min(totals), 6),
+        "rules_s": {rule: round(min(times), 6) for rule, times in rules.items()},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_delta_s: float) -> List[Tuple[str, str, float, float]]:
+    """
+    Regressions of ``results`` against ``baseline``.
+
+    A timing regresses when it is more than ``tolerance`` (relative) and
+    ``min_delta_s`` (absolute, filters noise on very fast rules) slower.
+    Tiers / rules missing on either side are skipped.
+
+    Returns:
+        (tier, rule, baseline s, current s) per regression.
+    """
+    regressions = []
+    for tier, current in results["tiers"].items():
+        previous = baseline.get("tiers", {}).get(tier)
+        if previous is None or previous.get("spec") != current.get("spec"):
+            continue
+        pairs = [("total", previous["total_s"], current["total_s"])]
+        pairs += [(rule, previous["rules_s"][rule], seconds)
+                  for rule, seconds in current["rules_s"].items() if rule in previous["rules_s"]]
+        for rule, before, after in pairs:
+            if after > before * (1 + tolerance) and after - before > min_delta_s:
+                regressions.append((tier, rule, before, after))
+    return regressions
+
+
+def print_results(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    for tier, data in results["tiers"].items():
+        previous = baseline.get("tiers", {}).get(tier, {}) if baseline else {}
+        print(f"\n{tier}: {data['file_mb']} MiB, {data['level']}, total {data['total_s']:.3f}s"
+              + (f" (baseline {previous['total_s']:.3f}s)" if previous.get("total_s") else ""))
+        for rule, seconds in data["rules_s"].items():
+            before = previous.get("rules_s", {}).get(rule)
+            suffix = f"  ({(seconds / before - 1) * 100:+.0f}%)" if before else ""
+            print(f"  {rule:<8} {seconds:>9.4f}s{suffix}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCAP checker on synthetic episodes")
+    parser.add_argument("--tiers", default=",".join(TIERS),
+                       help=f"Comma-separated tiers (default: all of {', '.join(TIERS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per tier (best is kept)")
+    parser.add_argument("--chunk-workers", type=int, default=0, help="Forwarded to run_checks")
+    parser.add_argument("--no-vision", action="store_true", help="Do not enable the G rules")
+    parser.add_argument("--no-advanced", action="store_true", help="Do not enable the F1-F2 rules")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/bench-<time>.json)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                       help="Relative slowdown reported as a regression (default 0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                       help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    config.ENABLE_VISION_CHECKS = not args.no_vision
+    config.ENABLE_ADVANCED_CHECKS = not args.no_advanced
+
+    names = [name for name in args.tiers.split(",") if name]
+    unknown = [name for name in names if name not in TIERS]
+    if unknown:
+        parser.error(f"Unknown tiers: {', '.join(unknown)}")
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+        },
+        "settings": {
+            "repeat": args.repeat,
+            "chunk_workers": args.chunk_workers,
+            "vision": config.ENABLE_VISION_CHECKS,
+            "advanced": config.ENABLE_ADVANCED_CHECKS,
+        },
+        "tiers": {},
+    }
+    for name in names:
+        print(f"[{name}]")
+        path = tier_file(name, TIERS[name])
+        data = bench_tier(path, args.repeat, args.chunk_workers)
+        data["spec"] = TIERS[name]
+        results["tiers"][name] = data
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    baseline = {}
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("settings") != results["settings"]:
+            print(f"\nNote: baseline settings differ: {baseline.get('settings')}")
+
+    print_results(results, baseline)
+    print(f"\nResults saved to: {output}")
+
+    exit_code = 0
+    for name, data in results["tiers"].items():
+        missing = [item for item in EXPECTED_ITEMS.get(name, []) if item not in data["issues"]]
+        if missing:
+            print(f"\n✗ {name}: injected faults not reported: {', '.join(missing)}")
+            exit_code = 1
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {baseline_path}:")
+            for tier, rule, before, after in regressions:
+                print(f"  ✗ {tier} {rule}: {before:.4f}s -> {after:.4f}s ({(after / before - 1) * 100:+.0f}%)")
+            exit_code = 1
+        else:
+            print(f"\n✓ No regressions vs {baseline_path} (tolerance {args.tolerance:.0%})")
+    else:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to create one")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline saved to: {baseline_path}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Synthetic MCAP generator for benchmarks.
+
+Writes a robot arm episode with the same layout as the recordings the
+checker is built for: lead/follow ``sensor_msgs/msg/JointState`` topics
+per arm, raw ``sensor_msgs/msg/Image`` camera topics and one metadata
+record with the required fields. Rates, sizes, compression and duration
+are configurable, and faults can be injected at given times:
+
+- gap:      no messages at all in [t, t + duration)
+- nan:      NaN position in the next message of the first joint topic
+- rollback: the next message of the first joint topic is logged 100 ms
+            in the past
+- desync:   camera messages in [t, t + duration) are logged with an offset
+            (header stamps keep the capture time); the frames that would be
+            logged out of order after the window are dropped
+
+Usage:
+    python benchmarks/synth_mcap.py out.mcap --duration 60 --cameras 2
+    python benchmarks/synth_mcap.py out.mcap --gap 12:0.5 --nan 30 --desync 40:5:50
+"""
+
+import argparse
+import os
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from mcap.writer import CompressionType, Writer
+
+JOINT_STATE_SCHEMA = b"""std_msgs/Header header
+string[] name
+float64[] position
+float64[] velocity
+float64[] effort
+================================================================================
+MSG: std_msgs/Header
+builtin_interfaces/Time stamp
+string frame_id
+"""
+
+IMAGE_SCHEMA = b"""std_msgs/Header header
+uint32 height
+uint32 width
+string encoding
+uint8 is_bigendian
+uint32 step
+uint8[] data
+================================================================================
+MSG: std_msgs/Header
+builtin_interfaces/Time stamp
+string frame_id
+"""
+
+COMPRESSION = {
+    "zstd": CompressionType.ZSTD,
+    "lz4": CompressionType.LZ4,
+    "none": CompressionType.NONE,
+}
+
+START_NS = 1_700_000_000_000_000_000
+ROLLBACK_NS = 100_000_000
+
+# Event kinds in the merged message stream
+_JOINT, _CAMERA = 0, 1
+
+
+class _CdrBuffer:
+    """Little-endian CDR writer (alignment relative to the 4-byte encapsulation header)."""
+
+    def __init__(self):
+        self.data = bytearray(b'\x00\x01\x00\x00')
+
+    def align(self, n: int) -> None:
+        self.data += b'\x00' * (-(len(self.data) - 4) % n)
+
+    def pack(self, fmt: str, *values: Any) -> None:
+        self.data += struct.pack('<' + fmt, *values)
+
+    def string(self, text: str) -> None:
+        raw = text.encode() + b'\x00'
+        self.align(4)
+        self.pack('I', len(raw))
+        self.data += raw
+
+
+class _JointStateTemplate:
+    """
+    Byte layout of the JointState messages of one topic.
+
+    Only the stamp and the position / velocity values change between
+    messages, so each message is the template with those bytes replaced.
+    """
+
+    def __init__(self, frame_id: str, names: Sequence[str]):
+        dof = len(names)
+        buffer = _CdrBuffer()
+        buffer.pack('iI', 0, 0)
+        buffer.string(frame_id)
+        buffer.align(4)
+        buffer.pack('I', dof)
+        for name in names:
+            buffer.string(name)
+        offsets = []
+        for count in (dof, dof, 0):
+            buffer.align(4)
+            buffer.pack('I', count)
+            if count:
+                buffer.align(8)
+            offsets.append(len(buffer.data))
+            buffer.data += b'\x00' * (8 * count)
+        self.template = bytes(buffer.data)
+        self.position_offset, self.velocity_offset = offsets[0], offsets[1]
+        self.values = struct.Struct(f'<{dof}d')
+
+    def encode(self, stamp_ns: int, position: np.ndarray, velocity: np.ndarray) -> bytes:
+        data = bytearray(self.template)
+        struct.pack_into('<iI', data, 4, stamp_ns // 1_000_000_000, stamp_ns % 1_000_000_000)
+        self.values.pack_into(data, self.position_offset, *position)
+        self.values.pack_into(data, self.velocity_offset, *velocity)
+        return bytes(data)
+
+
+def _encode_image(stamp_ns: int, frame_id: str, pixels: np.ndarray) -> bytes:
+    height, width = pixels.shape[:2]
+    buffer = _CdrBuffer()
+    buffer.pack('iI', stamp_ns // 1_000_000_000, stamp_ns % 1_000_000_000)
+    buffer.string(frame_id)
+    buffer.align(4)
+    buffer.pack('II', height, width)
+    buffer.string('rgb8')
+    buffer.pack('B', 0)
+    buffer.align(4)
+    buffer.pack('I', width * 3)
+    buffer.pack('I', pixels.nbytes)
+    buffer.data += pixels.tobytes()
+    return bytes(buffer.data)
+
+
+def _in_windows(times_s: np.ndarray, windows: Sequence[Sequence[float]]) -> np.ndarray:
+    mask = np.zeros(len(times_s), dtype=bool)
+    for window in windows:
+        mask |= (times_s >= window[0]) & (times_s < window[0] + window[1])
+    return mask
+
+
+def _rows_at(rows: np.ndarray, times: np.ndarray, fault_times: Sequence[float]) -> set:
+    """Row of the first message in ``rows`` at / after each fault time."""
+    positions = np.searchsorted(times[rows], fault_times)
+    return {int(rows[i]) for i in positions if i < len(rows)}
+
+
+def generate_mcap(path: str, duration_s: float = 60.0, joint_hz: float = 50.0, dof: int = 7,
+                  arms: Sequence[str] = ("left", "right"), cameras: int = 2, camera_fps: float = 30.0,
+                  width: int = 64, height: int = 48, compression: str = "zstd",
+                  chunk_size: int = 1 << 20, faults: Optional[Dict[str, List]] = None,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Write a synthetic episode.
+
+    Args:
+        path: Output MCAP path.
+        duration_s: Episode length (seconds).
+        joint_hz: Rate of every joint_states topic (Hz).
+        dof: Joints per arm.
+        arms: Arm names; each arm gets a lead and a follow joint_states topic.
+        cameras: Number of camera topics.
+        camera_fps: Camera frame rate.
+        width, height: Image size (rgb8).
+        compression: "zstd", "lz4" or "none".
+        chunk_size: MCAP chunk size (bytes).
+        faults: Optional dict with lists of injected faults (times in s):
+            ``gap``: [(t, duration)], ``nan``: [t], ``rollback``: [t],
+            ``desync``: [(t, duration, offset_ms)].
+        seed: Random seed of the joint trajectories.
+
+    Returns:
+        Dict with the message counts and the file size.
+    """
+    faults = faults or {}
+    rng = np.random.default_rng(seed)
+
+    # Message stream: (time, kind, topic index) merged in log-time order
+    joint_topics = [f"/robot/arm_{arm}_{role}/joint_states" for arm in arms for role in ("lead", "follow")]
+    camera_topics = [f"/camera/cam_{i}/image_raw" for i in range(cameras)]
+    joint_times = np.arange(0.0, duration_s, 1.0 / joint_hz)
+    camera_times = np.arange(0.0, duration_s, 1.0 / camera_fps) if cameras else np.zeros(0)
+
+    times = np.concatenate([np.tile(joint_times, len(joint_topics)),
+                            np.tile(camera_times, len(camera_topics))])
+    kinds = np.concatenate([np.full(len(joint_times) * len(joint_topics), _JOINT),
+                            np.full(len(camera_times) * len(camera_topics), _CAMERA)])
+    topics = np.concatenate([np.repeat(np.arange(len(joint_topics)), len(joint_times)),
+                             np.repeat(np.arange(len(camera_topics)), len(camera_times))])
+    order = np.lexsort((topics, kinds, times))
+    times, kinds, topics = times[order], kinds[order], topics[order]
+
+    keep = ~_in_windows(times, faults.get("gap", []))
+    times, kinds, topics = times[keep], kinds[keep], topics[keep]
+    log_ns = START_NS + np.round(times * 1e9).astype(np.int64)
+
+    capture_ns = log_ns.copy()
+
+    # Desync: late camera frames keep their capture stamp; after the window,
+    # frames that would be logged before the last late one are dropped
+    for start, length, offset_ms in faults.get("desync", []):
+        log_ns[(kinds == _CAMERA) & _in_windows(times, [(start, length)])] += int(offset_ms * 1e6)
+    keep = np.ones(len(times), dtype=bool)
+    for topic in range(len(camera_topics)):
+        rows = np.flatnonzero((kinds == _CAMERA) & (topics == topic))
+        previous = np.maximum.accumulate(log_ns[rows])
+        keep[rows[1:]] = log_ns[rows[1:]] > previous[:-1]
+    order = np.argsort(log_ns[keep], kind="stable")
+    times, kinds, topics = times[keep][order], kinds[keep][order], topics[keep][order]
+    log_ns, capture_ns = log_ns[keep][order], capture_ns[keep][order]
+
+    # NaN / rollback: first message of the first joint topic at / after each time
+    first_topic = np.flatnonzero((kinds == _JOINT) & (topics == 0))
+    nan_rows = _rows_at(first_topic, times, faults.get("nan", []))
+    rollback_rows = _rows_at(first_topic, times, faults.get("rollback", []))
+
+    # Smooth joint trajectories: a few sines per joint
+    phases = rng.uniform(0, 2 * np.pi, (len(joint_topics), dof))
+    frequencies = rng.uniform(0.05, 0.5, (len(joint_topics), dof))
+    amplitudes = rng.uniform(0.2, 1.0, (len(joint_topics), dof))
+    names = [f"joint{i + 1}" for i in range(dof)]
+    templates = [_JointStateTemplate(topic.split('/')[2], names) for topic in joint_topics]
+
+    yy, xx = np.mgrid[0:height, 0:width]
+    pattern = np.stack([xx * 255 // max(width - 1, 1), yy * 255 // max(height - 1, 1),
+                        (xx + yy) % 256], axis=2).astype(np.uint8)
+
+    counts = {"joint_messages": 0, "camera_messages": 0}
+    with open(path, "wb") as f:
+        writer = Writer(f, chunk_size=chunk_size, compression=COMPRESSION[compression])
+        writer.start(profile="ros2", library="mcap_checker benchmarks")
+        joint_schema = writer.register_schema("sensor_msgs/msg/JointState", "ros2msg", JOINT_STATE_SCHEMA)
+        image_schema = writer.register_schema("sensor_msgs/msg/Image", "ros2msg", IMAGE_SCHEMA)
+        joint_channels = [writer.register_channel(topic, "cdr", joint_schema) for topic in joint_topics]
+        camera_channels = [writer.register_channel(topic, "cdr", image_schema) for topic in camera_topics]
+
+        for row in range(len(times)):
+            t, topic, log_time = times[row], topics[row], int(log_ns[row])
+            if kinds[row] == _JOINT:
+                angle = 2 * np.pi * frequencies[topic] * t + phases[topic]
+                position = amplitudes[topic] * np.sin(angle)
+                velocity = amplitudes[topic] * 2 * np.pi * frequencies[topic] * np.cos(angle)
+                if row in nan_rows:
+                    position[0] = np.nan
+                if row in rollback_rows:
+                    log_time -= ROLLBACK_NS
+                data = templates[topic].encode(log_time, position, velocity)
+                writer.add_message(joint_channels[topic], log_time, data, log_time)
+                counts["joint_messages"] += 1
+            else:
+                # Pattern moving 10 px/s (constant mean brightness)
+                frame = np.roll(pattern, int(t * 10) % width, axis=1)
+                data = _encode_image(int(capture_ns[row]), camera_topics[topic].split('/')[2], frame)
+                writer.add_message(camera_channels[topic], log_time, data, log_time)
+                counts["camera_messages"] += 1
+
+        writer.add_metadata("episode", {
+            "robot_model": "synthetic_arm",
+            "arm_dof": str(dof),
+            "control_mode": "teleoperation",
+            "task_description": "synthetic benchmark episode",
+            "episode_id": f"synthetic-{seed}",
+        })
+        writer.finish()
+
+    counts["file_size"] = os.path.getsize(path)
+    return counts
+
+
+def _parse_faults(args: argparse.Namespace) -> Dict[str, List]:
+    def numbers(text: str) -> List[float]:
+        return [float(part) for part in text.split(':')]
+    return {
+        "gap": [numbers(v) for v in args.gap],
+        "nan": [float(v) for v in args.nan],
+        "rollback": [float(v) for v in args.rollback],
+        "desync": [numbers(v) for v in args.desync],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic robot arm MCAP")
+    parser.add_argument("output", help="Output MCAP path")
+    parser.add_argument("--duration", type=float, default=60.0, help="Episode length (s)")
+    parser.add_argument("--joint-hz", type=float, default=50.0, help="joint_states rate per topic (Hz)")
+    parser.add_argument("--dof", type=int, default=7, help="Joints per arm")
+    parser.add_argument("--arms", default="left,right", help="Comma-separated arm names")
+    parser.add_argument("--cameras", type=int, default=2, help="Number of cameras")
+    parser.add_argument("--fps", type=float, default=30.0, help="Camera frame rate")
+    parser.add_argument("--resolution", default="64x48", help="Image size WIDTHxHEIGHT (rgb8)")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION), default="zstd")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Chunk size (bytes)")
+    parser.add_argument("--gap", action="append", default=[], metavar="T:DUR",
+                       help="Drop all messages for DUR s at T s (repeatable)")
+    parser.add_argument("--nan", action="append", default=[], metavar="T",
+                       help="NaN joint position at T s (repeatable)")
+    parser.add_argument("--rollback", action="append", default=[], metavar="T",
+                       help="Timestamp rollback at T s (repeatable)")
+    parser.add_argument("--desync", action="append", default=[], metavar="T:DUR:MS",
+                       help="Log camera frames MS ms late for DUR s at T s (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.lower().split('x'))
+    counts = generate_mcap(args.output, duration_s=args.duration, joint_hz=args.joint_hz, dof=args.dof,
+                           arms=[a for a in args.arms.split(',') if a], cameras=args.cameras,
+                           camera_fps=args.fps, width=width, height=height,
+                           compression=args.compression, chunk_size=args.chunk_size,
+                           faults=_parse_faults(args), seed=args.seed)
+    print(f"{args.output}: {counts['joint_messages']} joint + {counts['camera_messages']} camera messages, "
+          f"{counts['file_size'] / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from mcap_checker import run_checks, CheckReport
+from mcap_checker.batch import run_batch
 
 
 def example_basic_usage():
@@ -92,25 +93,16 @@ def example_batch_processing():
         # "demo3.mcap",
     ]
     
-    results = []
-    
-    for mcap_file in mcap_files:
-        try:
-            report = run_checks(mcap_file)
-            results.append({
-                'file': mcap_file,
-                'level': report.level,
-                'report': report
-            })
-        except Exception as e:
-            print(f"✗ Check failed: {mcap_file} - {e}")
+    # Files are checked in parallel worker processes; one row per file is
+    # streamed to the JSONL output as soon as it finishes
+    result = run_batch(mcap_files, "batch_results.jsonl", workers=4, timeout=300)
     
     # Summarize results
-    print(f"\nBatch checking finished, processed {len(results)} files:\n")
-    
-    for result in results:
-        icon = "✓" if result['level'] == "PASS" else "⚠" if result['level'] == "WARN" else "✗"
-        print(f"{icon} {result['file']}: {result['level']}")
+    levels = result['levels']
+    print(f"\nBatch checking finished, processed {result['files']} files: "
+          f"{levels['PASS']} passed, {levels['WARN']} warnings, {levels['FAIL']} failed")
+    print(f"Throughput: {result['files_per_s']:.2f} files/s, {result['mb_per_s']:.1f} MB/s")
+    print(f"Per-file results: {result['output']}")
 
 
 def example_custom_config():
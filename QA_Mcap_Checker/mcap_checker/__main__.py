@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Package entry point.
+
+    python -m mcap_checker <file.mcap> [options]          # single file
+    python -m mcap_checker batch <dir|glob> [options]     # parallel batch
+"""
+
+import sys
+
+if len(sys.argv) > 1 and sys.argv[1] == "batch":
+    from .batch import main as batch_main
+    batch_main(sys.argv[2:])
+else:
+    from .checker import main
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Parallel batch checker.
+
+Shards MCAP files over a process pool, streams one result row per file to
+an aggregate JSONL or CSV file as soon as it finishes, and prints the
+overall throughput at the end.
+
+Usage:
+    python -m mcap_checker batch <dir|glob> [--workers N] [--timeout S] [--output results.jsonl]
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .cache import run_checks_cached
+from .checker import run_checks
+from .report import CheckReport
+from . import config
+
+# Rule switches forwarded to the worker processes
+_CONFIG_FLAGS = (
+    'ENABLE_STRICT_MODE',
+    'ENABLE_VISION_CHECKS',
+    'ENABLE_ADVANCED_CHECKS',
+    'USE_MESSAGE_INDEX',
+    'BOUNDED_MEMORY_TIMING',
+    'USE_RESULT_CACHE',
+    'RESULT_CACHE_DIR',
+)
+
+CSV_FIELDS = ['file', 'level', 'passed', 'warnings', 'failed', 'size_mb', 'seconds', 'error']
+
+
+class CheckTimeout(BaseException):
+    """
+    Raised inside a worker when a file exceeds the per-file timeout.
+
+    Derives from BaseException so the per-rule ``except Exception``
+    handlers cannot turn it into a warning.
+    """
+
+
+def collect_files(target: str) -> List[str]:
+    """
+    Resolve a directory, glob pattern or single file into MCAP paths.
+
+    Args:
+        target: Directory (searched recursively for *.mcap), glob pattern
+            (``**`` allowed) or file path.
+
+    Returns:
+        Sorted list of file paths.
+    """
+    path = Path(target)
+    if path.is_dir():
+        return sorted(str(p) for p in path.rglob("*.mcap"))
+    if path.is_file():
+        return [str(path)]
+    return sorted(p for p in glob.glob(target, recursive=True) if os.path.isfile(p))
+
+
+def _init_worker(flags: Dict[str, Any]):
+    """Apply the parent's rule switches in a worker process."""
+    for name, value in flags.items():
+        setattr(config, name, value)
+
+
+def _on_timeout(signum, frame):
+    raise CheckTimeout()
+
+
+def _check_file(path: str, strict: bool, timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Check one file inside a worker and return its result row.
+
+    The timeout is enforced with an interval timer where available, so a
+    stuck file fails on its own without blocking the worker slot.
+    """
+    start = time.perf_counter()
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    error = None
+    try:
+        if config.USE_RESULT_CACHE:
+            report = run_checks_cached(path, strict_mode=strict)
+        else:
+            report = run_checks(path, strict_mode=strict)
+    except CheckTimeout:
+        error = f"Timed out after {timeout:g}s"
+    except Exception as e:
+        error = str(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    if error is not None:
+        report = CheckReport(path)
+        report.fail("Check aborted", error)
+        report.finalize()
+
+    return _result_row(path, report.to_dict(), time.perf_counter() - start, error)
+
+
+def _result_row(path: str, report: Optional[Dict[str, Any]], seconds: float,
+                error: Optional[str] = None) -> Dict[str, Any]:
+    """Build the aggregate row for one file."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    row = {
+        'file': path,
+        'level': report['level'] if report else 'FAIL',
+        'size_bytes': size,
+        'seconds': round(seconds, 3),
+        'error': error,
+    }
+    if report:
+        row['summary'] = report['summary']
+        row['items'] = report['items']
+    return row
+
+
+class ResultWriter:
+    """Streams result rows to a JSONL or CSV file (chosen by extension)."""
+
+    def __init__(self, output_path: str):
+        self.path = output_path
+        self.is_csv = output_path.lower().endswith('.csv')
+        self._file = open(output_path, 'w', encoding='utf-8', newline='')
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        """Append one row and flush it to disk."""
+        if self._csv is not None:
+            summary = row.get('summary') or {}
+            self._csv.writerow({
+                'file': row['file'],
+                'level': row['level'],
+                'passed': summary.get('passed', 0),
+                'warnings': summary.get('warnings', 0),
+                'failed': summary.get('failed', 0),
+                'size_mb': round(row['size_bytes'] / 1e6, 3),
+                'seconds': row['seconds'],
+                'error': row['error'] or '',
+            })
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_batch(files: List[str], output_path: str, workers: Optional[int] = None,
+              timeout: Optional[float] = None, strict_mode: bool = False,
+              verbose: bool = True) -> Dict[str, Any]:
+    """
+    Check many MCAP files in parallel.
+
+    Args:
+        files: MCAP file paths.
+        output_path: Aggregate output (.jsonl or .csv).
+        workers: Worker processes (default: CPU count).
+        timeout: Per-file timeout in seconds (None or 0 disables it).
+        strict_mode: Whether to enable strict mode.
+        verbose: Print one line per finished file.
+
+    Returns:
+        Batch summary: file count, level counts, elapsed time and
+        throughput (files/s, MB/s).
+    """
+    workers = workers or os.cpu_count() or 1
+    flags = {name: getattr(config, name) for name in _CONFIG_FLAGS}
+    counts = {"PASS": 0, "WARN": 0, "FAIL": 0}
+    total_bytes = 0
+
+    start = time.perf_counter()
+    with ResultWriter(output_path) as writer, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(flags,)) as pool:
+        futures = {pool.submit(_check_file, path, strict_mode, timeout): path for path in files}
+
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                row = future.result()
+            except BrokenProcessPool as e:
+                row = _result_row(path, None, 0.0, f"Worker crashed: {e}")
+            except Exception as e:
+                row = _result_row(path, None, 0.0, str(e))
+
+            writer.write(row)
+            counts[row['level']] = counts.get(row['level'], 0) + 1
+            total_bytes += row['size_bytes']
+
+            if verbose:
+                icon = "✓" if row['level'] == "PASS" else "⚠" if row['level'] == "WARN" else "✗"
+                print(f"[{done}/{len(files)}] {icon} {row['level']} {path} ({row['seconds']:.2f}s)")
+
+    elapsed = time.perf_counter() - start
+    return {
+        'files': len(files),
+        'levels': counts,
+        'bytes': total_bytes,
+        'seconds': elapsed,
+        'files_per_s': len(files) / elapsed if elapsed > 0 else 0.0,
+        'mb_per_s': total_bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
+        'output': output_path,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point for batch checking."""
+    parser = argparse.ArgumentParser(
+        prog="python -m mcap_checker batch",
+        description="Check many MCAP files in parallel",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m mcap_checker batch Data/
+  python -m mcap_checker batch "Data/**/*.mcap" --workers 8 --timeout 300
+  python -m mcap_checker batch Data/ --output Reports/batch.csv
+        """
+    )
+
+    parser.add_argument("target", help="Directory, glob pattern or MCAP file")
+    parser.add_argument("--workers", "-w", type=int, default=config.BATCH_WORKERS,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--timeout", "-t", type=float, default=config.BATCH_FILE_TIMEOUT_S,
+                        help="Per-file timeout in seconds, 0 to disable")
+    parser.add_argument("--output", "-o",
+                        help="Aggregate results file (.jsonl or .csv)")
+    parser.add_argument("--strict", "-s", action="store_true",
+                        help="Enable strict mode (more checks as Hard Fail)")
+    parser.add_argument("--enable-vision", action="store_true",
+                        help="Enable vision quality checks (slow)")
+    parser.add_argument("--enable-advanced", action="store_true",
+                        help="Enable advanced checks (trajectory, vibration)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Always scan messages for B1 timestamps instead of reading the message index")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Keep running per-topic timing statistics instead of every timestamp (O(channels) memory)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse cached results of unchanged files (re-run only changed rules)")
+    parser.add_argument("--cache-dir",
+                        help="Result cache directory (implies --cache)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="Do not print a line per finished file")
+
+    args = parser.parse_args(argv)
+
+    if args.strict:
+        config.ENABLE_STRICT_MODE = True
+    if args.enable_vision:
+        config.ENABLE_VISION_CHECKS = True
+    if args.enable_advanced:
+        config.ENABLE_ADVANCED_CHECKS = True
+    if args.no_index:
+        config.USE_MESSAGE_INDEX = False
+    if args.low_memory:
+        config.BOUNDED_MEMORY_TIMING = True
+    if args.cache or args.cache_dir:
+        config.USE_RESULT_CACHE = True
+    if args.cache_dir:
+        config.RESULT_CACHE_DIR = args.cache_dir
+
+    files = collect_files(args.target)
+    if not files:
+        print(f"Error: No MCAP files found: {args.target}")
+        sys.exit(1)
+
+    if args.output:
+        output = args.output
+    else:
+        reports_dir = Path(__file__).parent.parent / "Reports"
+        reports_dir.mkdir(exist_ok=True)
+        output = str(reports_dir / f"batch_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+    result = run_batch(files, output, workers=args.workers, timeout=args.timeout,
+                       strict_mode=args.strict, verbose=not args.quiet)
+
+    levels = result['levels']
+    print(f"\n{'='*60}")
+    print(f"Batch: {result['files']} files | "
+          f"{levels['PASS']} passed, {levels['WARN']} warnings, {levels['FAIL']} failed")
+    print(f"Throughput: {result['files_per_s']:.2f} files/s, {result['mb_per_s']:.1f} MB/s "
+          f"({result['bytes'] / 1e6:.1f} MB in {result['seconds']:.1f}s)")
+    print(f"{'='*60}")
+    print(f"\n✓ Results saved to: {output}")
+
+    # Same exit codes as the single-file checker, for the worst file
+    if levels['FAIL']:
+        sys.exit(1)
+    if levels['WARN']:
+        sys.exit(2)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
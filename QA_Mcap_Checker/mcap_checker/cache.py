@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+On-disk result cache.
+
+Reports are stored per file content, keyed by (file size, mtime, hash of
+the MCAP summary section, strict mode). Inside an entry every rule group
+keeps its own items together with the rule version and the thresholds it
+ran with, so after a rule or threshold change only the affected groups
+(plus the groups they depend on / that depend on them) are re-run.
+Entries are evicted least-recently-used.
+
+Usage:
+    from mcap_checker.cache import ResultCache, run_checks_cached
+    report = run_checks_cached("demo.mcap", cache=ResultCache())
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .checker import run_checks
+from .report import CheckReport
+from .registry import RULES, select_rules
+from . import config
+
+# group -> (version, config names whose values affect its results);
+# versions are bumped in registry.RULES
+RULE_GROUPS = {rule.name: (rule.version, rule.config) for rule in RULES}
+
+# Groups computed from the outputs of other groups (B1 timestamps)
+RULE_DEPENDENCIES = {rule.name: rule.depends for rule in RULES if rule.depends}
+
+CACHE_FORMAT = 1
+
+# Footer record (opcode + length + 2 offsets + crc) followed by the magic
+_FOOTER = struct.Struct('<BQQQI')
+_FOOTER_OPCODE = 0x02
+_MAGIC_SIZE = 8
+_TAIL_HASH_BYTES = 1 << 20
+
+
+def active_groups() -> List[str]:
+    """Rule groups run with the current rule switches, in report order."""
+    return [rule.name for rule in select_rules()]
+
+
+def group_signature(group: str) -> str:
+    """Version + threshold values of a rule group, as a short digest."""
+    version, names = RULE_GROUPS[group]
+    thresholds = {name: getattr(config, name, None) for name in names}
+    payload = json.dumps([version, thresholds], sort_keys=True, default=repr)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def summary_digest(path: str, size: int) -> str:
+    """
+    Hash of the summary section (plus footer).
+
+    The summary holds the statistics, chunk indexes and metadata indexes,
+    so it changes with any change to the recorded content. Files without
+    a summary (e.g. still being recorded) hash their last MiB instead.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        start = None
+        footer_at = size - _MAGIC_SIZE - _FOOTER.size
+        if footer_at > 0:
+            f.seek(footer_at)
+            opcode, _, summary_start, _, _ = _FOOTER.unpack(f.read(_FOOTER.size))
+            if opcode == _FOOTER_OPCODE and 0 < summary_start < size:
+                start = summary_start
+        if start is None:
+            start = max(0, size - _TAIL_HASH_BYTES)
+        f.seek(start)
+        while True:
+            block = f.read(1 << 16)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def expand_groups(groups: Iterable[str]) -> Set[str]:
+    """
+    Groups to re-run for a set of stale groups.
+    
+    Dependents of a stale group re-run too (their inputs may change), and
+    every re-run group brings the groups it depends on (its inputs).
+    """
+    result = set(groups)
+    changed = True
+    while changed:
+        changed = False
+        for group, depends in RULE_DEPENDENCIES.items():
+            if group not in result and result.intersection(depends):
+                result.add(group)
+                changed = True
+    
+    for group in list(result):
+        result.update(RULE_DEPENDENCIES.get(group, ()))
+    return result
+
+
+class ResultCache:
+    """
+    Directory of cached reports, one JSON file per file content.
+
+    Args:
+        directory: Cache directory (default: config.RESULT_CACHE_DIR or
+            ``.mcap_cache`` in the project root).
+        max_entries: LRU capacity (default: config.RESULT_CACHE_MAX_ENTRIES).
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: Optional[int] = None):
+        if directory is None:
+            directory = config.RESULT_CACHE_DIR or str(Path(__file__).parent.parent / ".mcap_cache")
+        self.directory = Path(directory)
+        self.max_entries = max_entries or config.RESULT_CACHE_MAX_ENTRIES
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, path: str, strict_mode: bool = False) -> Optional[str]:
+        """Cache key of a file, or None if it cannot be read."""
+        try:
+            stat = os.stat(path)
+            content = summary_digest(path, stat.st_size)
+        except OSError:
+            return None
+        payload = f"{CACHE_FORMAT}:{stat.st_size}:{stat.st_mtime_ns}:{content}:{int(strict_mode)}"
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry and mark it as recently used."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def store(self, key: str, entry: Dict[str, Any]):
+        """Write an entry atomically, then evict the oldest ones."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, self._entry_path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used entries beyond ``max_entries``."""
+        entries = list(self.directory.glob("*.json"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime if p.exists() else 0)
+        for entry_path in entries[:len(entries) - self.max_entries]:
+            try:
+                entry_path.unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove all entries."""
+        for entry_path in self.directory.glob("*.json"):
+            entry_path.unlink()
+
+
+def _add_items(report: CheckReport, group: str, data: Dict[str, Any]) -> None:
+    """Replay a cached rule group (items, skip reason) into a report."""
+    if data.get("skipped"):
+        report.skip_rule(group, data["skipped"])
+    report.begin_rule(group)
+    for lvl, name, info in data["items"]:
+        if lvl == "PASS":
+            report.ok(name, info)
+        elif lvl == "WARN":
+            report.warn(name, info)
+        else:
+            report.fail(name, info)
+
+
+def _group_items(report: CheckReport) -> Optional[Dict[str, List]]:
+    """Items of a report per rule group (None if any item is untagged)."""
+    groups: Dict[str, List] = {}
+    for item, group in zip(report.items, report.item_rules):
+        if group is None:
+            return None
+        groups.setdefault(group, []).append(list(item))
+    return groups
+
+
+def run_checks_cached(mcap_path: str, strict_mode: bool = False,
+                      chunk_workers: Optional[int] = None,
+                      cache: Optional[ResultCache] = None) -> CheckReport:
+    """
+    run_checks with the result cache.
+
+    Unchanged files return their stored report without being opened
+    (only the summary section is hashed). If rule versions or thresholds
+    changed, only the affected rule groups are re-run and merged with the
+    cached items of the others.
+
+    Args:
+        mcap_path: Path to MCAP file.
+        strict_mode: Whether to enable strict mode.
+        chunk_workers: Forwarded to run_checks.
+        cache: ResultCache (default: a cache in the default directory).
+
+    Returns:
+        CheckReport instance.
+    """
+    cache = cache or ResultCache()
+    key = cache.key(mcap_path, strict_mode)
+    if key is None:
+        return run_checks(mcap_path, strict_mode=strict_mode, chunk_workers=chunk_workers)
+
+    groups = active_groups()
+    signatures = {group: group_signature(group) for group in groups}
+    entry = cache.load(key) or {}
+    cached = entry.get("groups", {})
+
+    # The file stopped at A1 (unreadable): nothing else was run
+    stopped = entry.get("stopped") and cached.get("A", {}).get("signature") == signatures["A"]
+
+    stale = [group for group in groups
+             if cached.get(group, {}).get("signature") != signatures[group]]
+    if stopped or not stale:
+        report = CheckReport(mcap_path)
+        report.unreadable = bool(stopped)
+        for group in (["A"] if stopped else groups):
+            _add_items(report, group, cached[group])
+        report.begin_rule(None)
+        report.finalize()
+        return report
+    
+    rerun = expand_groups(stale)
+    fresh = run_checks(mcap_path, strict_mode=strict_mode,
+                       chunk_workers=chunk_workers, rules=rerun)
+    fresh_items = _group_items(fresh)
+    if fresh_items is None:
+        # Items outside any rule (unreadable file, scan error) are not
+        # cached; a partial run is repeated in full
+        if rerun.issuperset(groups):
+            return fresh
+        return run_checks(mcap_path, strict_mode=strict_mode, chunk_workers=chunk_workers)
+    
+    # A1 failed: run_checks stopped after the structural checks
+    stopped = "A" in rerun and fresh.unreadable
+    
+    report = CheckReport(mcap_path)
+    report.unreadable = stopped
+    new_groups = {}
+    for group in (["A"] if stopped else groups):
+        if group in rerun:
+            data = {"signature": signatures[group], "items": fresh_items.get(group, [])}
+            if group in fresh.skipped:
+                data["skipped"] = fresh.skipped[group]
+        else:
+            data = cached[group]
+        new_groups[group] = data
+        _add_items(report, group, data)
+    report.begin_rule(None)
+    report.finalize()
+
+    # Keep groups that are currently switched off for later runs
+    for group, data in cached.items():
+        new_groups.setdefault(group, data)
+    cache.store(key, {"file": mcap_path, "stopped": bool(stopped), "groups": new_groups})
+    return report
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Shared CDR decoders.
+
+Used by the checker and by the QA_McapData_Study viewers, so every tool
+reports the same JointState values for the same bytes. ``corpus``
+holds the correctness corpus (``python -m mcap_checker.cdr.corpus``).
+"""
+
+from .jointstate import (JointStateArrays, JointStateBatch, decode_joint_state,
+                         decode_joint_state_arrays, decode_joint_state_batch)
+
+__all__ = ['JointStateArrays', 'JointStateBatch', 'decode_joint_state',
+           'decode_joint_state_arrays', 'decode_joint_state_batch']
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+CDR decoder correctness corpus.
+
+A set of hand-encoded sensor_msgs/msg/JointState messages covering the
+layout edge cases (string and 8-byte padding, frame ids, big-endian
+encapsulation, missing or empty trailing sequences, special float
+values, truncation), each with its expected decoding. ``verify`` checks
+that the list, array and batch decoders all agree with the corpus and,
+optionally, with each other on every JointState message of real files.
+
+A second, smaller set checks the schema-compiled decoder (ros2msg.py)
+on the array element types it reads with ``np.frombuffer`` / memoryview.
+
+Usage:
+    python -m mcap_checker.cdr.corpus                  # corpus only
+    python -m mcap_checker.cdr.corpus file.mcap ...    # corpus + files
+"""
+
+import argparse
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..ros2msg import compile_schema
+from .jointstate import decode_joint_state, decode_joint_state_arrays, decode_joint_state_batch
+
+
+class _Writer:
+    """CDR writer (alignment relative to the 4-byte encapsulation header)."""
+
+    def __init__(self, little: bool):
+        self.order = '<' if little else '>'
+        self.data = bytearray(b'\x00\x01\x00\x00' if little else b'\x00\x00\x00\x00')
+
+    def align(self, n: int) -> None:
+        self.data += b'\x00' * (-(len(self.data) - 4) % n)
+
+    def pack(self, fmt: str, *values: Any) -> None:
+        self.data += struct.pack(self.order + fmt, *values)
+
+    def string(self, text: str) -> None:
+        raw = text.encode('utf-8') + b'\x00'
+        self.align(4)
+        self.pack('I', len(raw))
+        self.data += raw
+
+    def float64s(self, values: Sequence[float]) -> None:
+        self.align(4)
+        self.pack('I', len(values))
+        if values:
+            self.align(8)
+            self.pack(f'{len(values)}d', *values)
+
+
+def encode_joint_state(names: Sequence[str], position: Sequence[float],
+                       velocity: Optional[Sequence[float]] = (),
+                       effort: Optional[Sequence[float]] = (),
+                       stamp_ns: int = 0, frame_id: str = '', little: bool = True) -> bytes:
+    """
+    Encode a JointState message.
+
+    ``velocity`` / ``effort`` set to None leave the sequence (and the
+    ones after it) out of the message entirely, as truncated writers do.
+    """
+    writer = _Writer(little)
+    sec, nanosec = divmod(stamp_ns, 1_000_000_000)
+    writer.pack('iI', sec, nanosec)
+    writer.string(frame_id)
+    writer.align(4)
+    writer.pack('I', len(names))
+    for name in names:
+        writer.string(name)
+    writer.float64s(position)
+    for values in (velocity, effort):
+        if values is None:
+            break
+        writer.float64s(values)
+    return bytes(writer.data)
+
+
+def _expected(names: Sequence[str], position: Sequence[float], velocity: Optional[Sequence[float]] = (),
+              effort: Optional[Sequence[float]] = (), stamp_ns: int = 0) -> Dict[str, Any]:
+    return {
+        'stamp': stamp_ns,
+        'name': list(names),
+        'position': list(position),
+        'velocity': list(velocity or ()),
+        'effort': list(effort if velocity is not None and effort is not None else ()),
+    }
+
+
+def _case(name: str, names: Sequence[str], position: Sequence[float], velocity: Optional[Sequence[float]] = (),
+          effort: Optional[Sequence[float]] = (), stamp_ns: int = 1_700_000_000_123_456_789,
+          frame_id: str = '', little: bool = True) -> Dict[str, Any]:
+    data = encode_joint_state(names, position, velocity, effort, stamp_ns, frame_id, little)
+    return {'name': name, 'data': data, 'expected': _expected(names, position, velocity, effort, stamp_ns)}
+
+
+_ARM = ['joint1', 'joint2', 'joint3', 'joint4', 'joint5', 'joint6', 'gripper']
+_Q = [0.1, -0.25, 1.5, 0.0, -3.14159, 2.5, 0.04]
+
+_BASE = encode_joint_state(_ARM, _Q, _Q, _Q)
+_POSITION_ONLY = encode_joint_state(_ARM, _Q, None)
+
+
+def build_corpus() -> List[Dict[str, Any]]:
+    """
+    Corpus cases: dicts with 'name', 'data' and 'expected' (the decoded
+    dict, or None when the message must be rejected).
+    """
+    cases = [
+        _case('7dof', _ARM, _Q, [v * 2 for v in _Q], [v * 3 for v in _Q]),
+        # same byte layout as '7dof': decoded from the cached layout
+        _case('7dof-cached-layout', _ARM, [v + 1 for v in _Q], [v - 1 for v in _Q], _Q, stamp_ns=42),
+        # name lengths 1..3 exercise the 4-byte string padding, the odd
+        # total the 8-byte float64 alignment
+        _case('name-padding', ['a', 'bb', 'ccc'], [1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]),
+        _case('frame-id', _ARM, _Q, _Q, _Q, frame_id='base_link'),
+        _case('big-endian', ['a', 'bb', 'ccc'], [1.0, -2.0, 3.5], [0.5, 0.25, 0.125], [], little=False),
+        _case('no-effort', _ARM, _Q, _Q, None),
+        _case('position-only', _ARM, _Q, None),
+        _case('empty-velocity', _ARM, _Q, [], _Q),
+        _case('no-names', [], _Q, _Q, _Q),
+        _case('empty', [], [], [], []),
+        _case('special-values', ['j1', 'j2', 'j3', 'j4', 'j5'],
+              [float('nan'), float('inf'), float('-inf'), -0.0, 1e308], [5e-324] * 5, [0.0] * 5),
+        _case('utf8-names', ['关节1', 'ärm', 'j'], [0.5, 0.25, 0.125]),
+        _case('negative-stamp', ['j'], [1.0], stamp_ns=-1_500_000_000),
+        _case('single-dof', ['j'], [1.0], [2.0], [3.0]),
+        _case('unequal-lengths', _ARM, _Q, _Q[:3], _Q[:5]),
+        {'name': 'trailing-bytes', 'data': _BASE + b'\x00' * 12, 'expected': _expected(_ARM, _Q, _Q, _Q, 0)},
+        {'name': 'truncated-position', 'data': _POSITION_ONLY[:-20], 'expected': None},
+        {'name': 'truncated-effort', 'data': _BASE[:-4], 'expected': None},
+        {'name': 'truncated-header', 'data': _BASE[:10], 'expected': None},
+        {'name': 'name-overrun', 'data': _BASE[:24] + struct.pack('<I', 1 << 30) + _BASE[28:], 'expected': None},
+    ]
+    return cases
+
+
+_HEADER_SCHEMA = "std_msgs/Header header\n{}\n================\nMSG: std_msgs/Header\n" \
+                 "builtin_interfaces/Time stamp\nstring frame_id\n"
+
+
+def _ros2msg_case(name: str, schema: str, build: Any, expected: Optional[Dict[str, Any]],
+                  little: bool = True) -> Dict[str, Any]:
+    writer = _Writer(little)
+    build(writer)
+    return {'name': name, 'schema': schema, 'data': bytes(writer.data), 'expected': expected}
+
+
+def build_ros2msg_corpus() -> List[Dict[str, Any]]:
+    """
+    Schema-compiled decoder cases: dicts with 'name', 'schema' (ros2msg
+    text of a test/msg/Case type), 'data' and 'expected'.
+    """
+    def seq(fmt, values):
+        def build(w):
+            w.pack('I', len(values))
+            if values:
+                w.align(struct.calcsize(fmt))
+                w.pack(f'{len(values)}{fmt}', *values)
+        return build
+
+    def header_then(build):
+        def wrapped(w):
+            w.pack('iI', 5, 6)
+            w.string('map')
+            w.align(4)
+            build(w)
+        return wrapped
+
+    header = {'header': {'stamp': {'sec': 5, 'nanosec': 6}, 'frame_id': 'map'}}
+    return [
+        _ros2msg_case('bool-seq', 'bool[] flags', seq('?', [True, False]), {'flags': [True, False]}),
+        _ros2msg_case('bool-seq-big-endian', 'bool[] flags', seq('?', [False, True, True]),
+                      {'flags': [False, True, True]}, little=False),
+        _ros2msg_case('bool-fixed', 'bool[3] flags\nbool last',
+                      lambda w: w.pack('4?', True, False, True, True),
+                      {'flags': [True, False, True], 'last': True}),
+        _ros2msg_case('bool-seq-empty', 'bool[] flags', seq('?', []), {'flags': []}),
+        _ros2msg_case('bool-seq-after-header', _HEADER_SCHEMA.format('bool[] flags'),
+                      header_then(seq('?', [True])), dict(header, flags=[True])),
+        _ros2msg_case('int16-seq-big-endian', 'int16[] values', seq('h', [1, -2, 300]),
+                      {'values': [1, -2, 300]}, little=False),
+        _ros2msg_case('float64-seq-alignment', 'bool ok\nfloat64[] values',
+                      lambda w: (w.pack('?', True), w.float64s([0.5, -1.25])),
+                      {'ok': True, 'values': [0.5, -1.25]}),
+        _ros2msg_case('uint8-seq', 'uint8[] data', seq('B', [0, 255, 7]), {'data': b'\x00\xff\x07'}),
+        _ros2msg_case('string-seq', 'string[] names', lambda w: (w.pack('I', 2), w.string('a'), w.string('bc')),
+                      {'names': ['a', 'bc']}),
+        _ros2msg_case('truncated-bool-seq', 'bool[] flags', lambda w: (w.pack('I', 5), w.pack('2?', True, True)),
+                      None),
+    ]
+
+
+def _plain(value: Any) -> Any:
+    """Decoded value with arrays / memoryviews as lists / bytes."""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, memoryview):
+        return bytes(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return value
+
+
+def verify_ros2msg_corpus() -> List[str]:
+    """Check the schema-compiled decoder against its corpus. Returns the mismatches."""
+    errors = []
+    for case in build_ros2msg_corpus():
+        label = case['name']
+        try:
+            decoded = compile_schema('test/msg/Case', case['schema'].encode('utf-8'))(case['data'])
+        except Exception as e:
+            errors.append(f"{label}: {type(e).__name__}: {e}")
+            continue
+        if case['expected'] is None:
+            if decoded is not None:
+                errors.append(f"{label}: accepted a malformed message")
+        elif decoded is None:
+            errors.append(f"{label}: rejected")
+        elif _plain(decoded) != case['expected']:
+            errors.append(f"{label}: {_plain(decoded)} != {case['expected']}")
+    return errors
+
+
+def _same_floats(actual: Sequence[float], expected: Sequence[float]) -> bool:
+    """Bit-exact comparison (NaN == NaN, -0.0 != 0.0)."""
+    return len(actual) == len(expected) and \
+        struct.pack(f'<{len(actual)}d', *actual) == struct.pack(f'<{len(expected)}d', *expected)
+
+
+def _compare(label: str, decoded: Dict[str, Any], expected: Dict[str, Any]) -> List[str]:
+    errors = []
+    if decoded['stamp'] != expected['stamp']:
+        errors.append(f"{label}: stamp {decoded['stamp']} != {expected['stamp']}")
+    if list(decoded['name']) != expected['name']:
+        errors.append(f"{label}: name {decoded['name']} != {expected['name']}")
+    for field in ('position', 'velocity', 'effort'):
+        if not _same_floats(list(decoded[field]), expected[field]):
+            errors.append(f"{label}: {field} {list(decoded[field])} != {expected[field]}")
+    return errors
+
+
+def _check_message(label: str, data: bytes, expected: Optional[Dict[str, Any]],
+                   batch_row: Optional[Dict[str, Any]]) -> List[str]:
+    """Compare the list and array decoders (and a batch row) with ``expected``."""
+    errors = []
+    decoded = decode_joint_state(data)
+    arrays = decode_joint_state_arrays(data)
+    if expected is None:
+        if decoded is not None:
+            errors.append(f"{label}: list decoder accepted a malformed message")
+        if arrays is not None:
+            errors.append(f"{label}: array decoder accepted a malformed message")
+        if batch_row is not None:
+            errors.append(f"{label}: batch decoder accepted a malformed message")
+        return errors
+
+    if decoded is None or arrays is None:
+        return [f"{label}: rejected by the {'list' if decoded is None else 'array'} decoder"]
+    errors += _compare(f"{label} (list)", decoded, expected)
+    errors += _compare(f"{label} (arrays)", {
+        'stamp': arrays.stamp, 'name': arrays.name, 'position': arrays.position,
+        'velocity': arrays.velocity, 'effort': arrays.effort,
+    }, expected)
+
+    # The batch decoder skips names and messages without positions
+    if expected['position']:
+        if batch_row is None:
+            errors.append(f"{label}: rejected by the batch decoder")
+        else:
+            errors += _compare(f"{label} (batch)", dict(batch_row, name=expected['name']), expected)
+    elif batch_row is not None:
+        errors.append(f"{label}: batch decoder kept a message without positions")
+    return errors
+
+
+def _batch_rows(datas: List[bytes]) -> List[Optional[Dict[str, Any]]]:
+    """Decode ``datas`` as one batch and split it back into per-message dicts."""
+    batch = decode_joint_state_batch(datas)
+    rows: List[Optional[Dict[str, Any]]] = []
+    row = 0
+    for valid in batch.valid:
+        if not valid:
+            rows.append(None)
+            continue
+        rows.append({
+            'stamp': int(batch.stamps[row]),
+            'position': batch.position[row, :batch.joint_counts[row]],
+            'velocity': batch.velocity[row, :batch.velocity_counts[row]],
+            'effort': batch.effort[row, :batch.effort_counts[row]],
+        })
+        row += 1
+    return rows
+
+
+def verify_corpus() -> List[str]:
+    """Check every decoder against the corpus. Returns the mismatches."""
+    cases = build_corpus()
+    # Decode the corpus twice in one batch so layouts are also reused
+    datas = [case['data'] for case in cases] * 2
+    rows = _batch_rows(datas)
+    errors = []
+    for i, case in enumerate(cases * 2):
+        errors += _check_message(case['name'], case['data'], case['expected'], rows[i])
+    return errors
+
+
+def verify_file(path: str) -> Dict[str, Any]:
+    """
+    Decode every JointState message of an MCAP file with all decoders.
+
+    The list decoder is the reference; a message counts as a mismatch if
+    the array or batch decoder reports anything else.
+
+    Returns:
+        Dict with 'messages', 'rejected' and 'errors' (first 20 mismatches).
+    """
+    from mcap.reader import make_reader
+
+    datas = []
+    with open(path, 'rb') as f:
+        for schema, channel, message in make_reader(f).iter_messages():
+            if schema is not None and 'jointstate' in schema.name.lower():
+                datas.append(message.data)
+
+    rows = _batch_rows(datas)
+    errors = []
+    rejected = 0
+    for i, data in enumerate(datas):
+        expected = decode_joint_state(data)
+        rejected += expected is None
+        errors += _check_message(f"message {i}", data, expected, rows[i])
+    return {'messages': len(datas), 'rejected': rejected, 'errors': errors[:20]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the CDR decoders against the corpus")
+    parser.add_argument('files', nargs='*', help="MCAP files whose JointState messages are cross-checked")
+    args = parser.parse_args()
+
+    failed = False
+    errors = verify_corpus()
+    print(f"Corpus: {len(build_corpus())} cases, {len(errors)} mismatch(es)")
+    for error in errors:
+        print(f"  ✗ {error}")
+    failed |= bool(errors)
+
+    errors = verify_ros2msg_corpus()
+    print(f"ros2msg corpus: {len(build_ros2msg_corpus())} cases, {len(errors)} mismatch(es)")
+    for error in errors:
+        print(f"  ✗ {error}")
+    failed |= bool(errors)
+
+    for path in args.files:
+        result = verify_file(path)
+        print(f"{path}: {result['messages']} JointState messages, {result['rejected']} rejected, "
+              f"{len(result['errors'])} mismatch(es)")
+        for error in result['errors']:
+            print(f"  ✗ {error}")
+        failed |= bool(result['errors'])
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+sensor_msgs/msg/JointState CDR decoders.
+
+One CDR walk (``_walk_joint_state``) locates the header stamp, the joint
+names and the three float64 sequences. Its result is cached as a byte
+layout (``_JointStateLayout``): the messages of a channel share one, so
+the walk runs once per channel rather than once per message. Three front
+ends build on it:
+
+- decode_joint_state: plain lists, unpacked with one precompiled
+  ``struct.Struct`` call per message;
+- decode_joint_state_arrays: zero-copy NumPy views of one message;
+- decode_joint_state_batch: N messages stacked into (N, dof) matrices.
+
+All of them accept little- and big-endian encapsulations, align float64
+sequences to 8 bytes and reject truncated messages, so they report the
+same values for the same bytes (see corpus.py).
+"""
+
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+_UINT32_LE = struct.Struct('<I')
+_UINT32_BE = struct.Struct('>I')
+_STAMP_LE = struct.Struct('<iI')
+_STAMP_BE = struct.Struct('>iI')
+
+
+class JointStateArrays:
+    """
+    Zero-copy view of a sensor_msgs/msg/JointState message.
+
+    ``position``, ``velocity`` and ``effort`` are ``np.frombuffer`` views
+    over the original message buffer (read-only, the buffer stays alive
+    as long as the views do). Exposes the same accessors as
+    MessageWrapper.
+    """
+
+    __slots__ = ('stamp', 'name', 'position', 'velocity', 'effort')
+
+    def __init__(self, stamp: int, name: List[str], position: np.ndarray,
+                 velocity: np.ndarray, effort: np.ndarray):
+        self.stamp = stamp          # header stamp in ns
+        self.name = name
+        self.position = position
+        self.velocity = velocity
+        self.effort = effort
+
+    def is_valid(self) -> bool:
+        """Return True if decoded message has positions."""
+        return len(self.position) > 0
+
+
+def _walk_joint_state(data: bytes, with_names: bool):
+    """
+    Walk the CDR layout of a JointState message.
+
+    CDR aligns 8-byte primitives to 8 relative to the end of the 4-byte
+    encapsulation header; empty sequences carry no padding.
+
+    Returns:
+        (little_endian, stamp_ns, names, [(count_offset, data_offset,
+        count)] for position / velocity / effort), or None if the message
+        is truncated. Missing trailing sequences have count_offset None.
+    """
+    size = len(data)
+    if size < 16:
+        return None
+    
+    # Encapsulation header: 0x00 0x01 = CDR little-endian, 0x00 0x00 = big-endian
+    little = bool(data[1] & 1)
+    u32 = _UINT32_LE if little else _UINT32_BE
+    
+    try:
+        # Header.stamp
+        sec, nanosec = (_STAMP_LE if little else _STAMP_BE).unpack_from(data, 4)
+        stamp = sec * 1_000_000_000 + nanosec
+        
+        # Header.frame_id
+        pos = 12
+        length = u32.unpack_from(data, pos)[0]
+        pos += 4 + length
+        pos += -(pos - 4) & 3
+        
+        # name[]
+        count = u32.unpack_from(data, pos)[0]
+        pos += 4
+        names = []
+        for _ in range(count):
+            length = u32.unpack_from(data, pos)[0]
+            pos += 4
+            if pos + length > size:
+                return None
+            if with_names:
+                names.append(data[pos:pos + length].decode('utf-8', errors='ignore').rstrip('\x00'))
+            pos += length
+            pos += -(pos - 4) & 3
+        
+        # position[], velocity[], effort[] (velocity / effort may be missing)
+        fields = []
+        for _ in range(3):
+            if pos + 4 > size:
+                fields.append((None, pos, 0))
+                continue
+            count_offset = pos
+            count = u32.unpack_from(data, pos)[0]
+            pos += 4
+            if count:
+                pos += -(pos - 4) & 7
+                if pos + 8 * count > size:
+                    return None
+            fields.append((count_offset, pos, count))
+            pos += 8 * count
+    
+    except struct.error:
+        return None
+    
+    return little, stamp, names, fields
+
+
+# Layouts remembered per message size, and message sizes remembered by
+# the single-message decoders
+_MAX_LAYOUTS_PER_SIZE = 8
+_MAX_LAYOUT_SIZES = 1024
+
+
+class _JointStateLayout:
+    """
+    Byte layout shared by JointState messages with the same size, frame_id,
+    joint names and sequence lengths (typically every message of a
+    channel). Such messages can be decoded as one strided byte matrix, or
+    one at a time with a single precompiled struct.Struct.
+    """
+
+    __slots__ = ('size', 'little', 'prefix_end', 'prefix', 'count_checks', 'fields', 'names', 'values')
+
+    def __init__(self, data: bytes, walked):
+        little, _, names, fields = walked
+        self.size = len(data)
+        self.little = little
+        self.names = names
+        # frame_id, names and the position count are covered by the prefix
+        self.prefix_end = fields[0][0] + 4 if fields[0][0] is not None else fields[0][1]
+        self.prefix = data[:2] + data[12:self.prefix_end]
+        self.count_checks = [(o, data[o:o + 4]) for o, _, _ in fields[1:] if o is not None]
+        self.fields = [(offset, count) for _, offset, count in fields]
+        
+        # Header stamp followed by the three float64 sequences
+        fmt = ['<' if little else '>', '4xiI']
+        pos = 12
+        for offset, count in self.fields:
+            if count:
+                fmt.append(f'{offset - pos}x{count}d')
+                pos = offset + 8 * count
+        self.values = struct.Struct(''.join(fmt))
+
+    def matches(self, data: bytes) -> bool:
+        if data[:2] + data[12:self.prefix_end] != self.prefix:
+            return False
+        for offset, expected in self.count_checks:
+            if data[offset:offset + 4] != expected:
+                return False
+        return True
+
+
+def _find_layout(layouts: Dict[int, List[_JointStateLayout]], data: bytes) -> Optional[_JointStateLayout]:
+    """
+    Layout of ``data`` from ``layouts`` (size -> recent layouts), walking
+    and remembering it on a miss. Returns None for malformed messages.
+    """
+    candidates = layouts.get(len(data))
+    if candidates is None:
+        if len(layouts) >= _MAX_LAYOUT_SIZES:
+            layouts.clear()
+        candidates = layouts[len(data)] = []
+    for layout in candidates:
+        if layout.matches(data):
+            return layout
+    
+    walked = _walk_joint_state(data, with_names=True)
+    if walked is None:
+        return None
+    layout = _JointStateLayout(data, walked)
+    if len(candidates) >= _MAX_LAYOUTS_PER_SIZE:
+        candidates.pop(0)
+    candidates.append(layout)
+    return layout
+
+
+# Layout cache of decode_joint_state / decode_joint_state_arrays
+_LAYOUTS: Dict[int, List[_JointStateLayout]] = {}
+
+
+def decode_joint_state(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode a sensor_msgs/msg/JointState message into lists.
+
+    JointState structure:
+    - std_msgs/Header header
+    - string[] name
+    - float64[] position
+    - float64[] velocity (may be missing)
+    - float64[] effort (may be missing)
+
+    The CDR walk runs once per byte layout (cached); every further
+    message with that layout is a prefix comparison and one call of the
+    layout's precompiled struct.Struct.
+
+    Returns:
+        Dict with 'stamp' (header stamp in ns), 'name', 'position',
+        'velocity' and 'effort' (missing sequences are empty), or None on
+        truncated / malformed data.
+    """
+    layout = _find_layout(_LAYOUTS, data)
+    if layout is None:
+        return None
+    values = layout.values.unpack_from(data)
+    (_, n_pos), (_, n_vel), (_, n_eff) = layout.fields
+    return {
+        'stamp': values[0] * 1_000_000_000 + values[1],
+        'name': list(layout.names),
+        'position': list(values[2:2 + n_pos]),
+        'velocity': list(values[2 + n_pos:2 + n_pos + n_vel]),
+        'effort': list(values[2 + n_pos + n_vel:]),
+    }
+
+
+def decode_joint_state_arrays(data: bytes, with_names: bool = True) -> Optional[JointStateArrays]:
+    """
+    Decode a sensor_msgs/msg/JointState message into NumPy views.
+
+    Unlike decode_joint_state, float64 sequences are not unpacked into
+    lists: each one becomes a single ``np.frombuffer`` view over ``data``.
+
+    Args:
+        data: Raw CDR message bytes.
+        with_names: Return the joint names (an empty list if False).
+
+    Returns:
+        JointStateArrays, or None on truncated / malformed data.
+    """
+    layout = _find_layout(_LAYOUTS, data)
+    if layout is None:
+        return None
+    sec, nanosec = (_STAMP_LE if layout.little else _STAMP_BE).unpack_from(data, 4)
+    f8 = '<f8' if layout.little else '>f8'
+    arrays = [np.frombuffer(data, dtype=f8, count=count, offset=offset)
+              for offset, count in layout.fields]
+    names = list(layout.names) if with_names else []
+    return JointStateArrays(sec * 1_000_000_000 + nanosec, names, arrays[0], arrays[1], arrays[2])
+
+
+class JointStateBatch:
+    """
+    Stacked JointState values for N messages.
+
+    Attributes:
+        valid: (len(inputs),) bool mask of inputs that decoded with
+            positions; all other arrays have one row per valid input.
+        position: (N, dof) float64.
+        velocity: (N, n_vel) float64, n_vel may be 0.
+        effort: (N, n_eff) float64, n_eff may be 0.
+        joint_counts: (N,) int64 number of positions per message.
+        velocity_counts: (N,) int64 number of velocities per message.
+        effort_counts: (N,) int64 number of efforts per message.
+        stamps: (N,) int64 header stamps in ns.
+
+    If messages disagree on a length, the matrix is as wide as the longest
+    row and shorter rows are NaN-padded; the ``*_counts`` arrays tell the
+    real lengths.
+    """
+
+    def __init__(self, valid: np.ndarray, position: np.ndarray, velocity: np.ndarray,
+                 effort: np.ndarray, joint_counts: np.ndarray, velocity_counts: np.ndarray,
+                 effort_counts: np.ndarray, stamps: np.ndarray):
+        self.valid = valid
+        self.position = position
+        self.velocity = velocity
+        self.effort = effort
+        self.joint_counts = joint_counts
+        self.velocity_counts = velocity_counts
+        self.effort_counts = effort_counts
+        self.stamps = stamps
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    @staticmethod
+    def concatenate(batches: List['JointStateBatch']) -> 'JointStateBatch':
+        """Join batches row-wise (NaN-padding to the widest matrix)."""
+        def join(arrays: List[np.ndarray]) -> np.ndarray:
+            width = max((a.shape[1] for a in arrays), default=0)
+            out = np.full((sum(len(a) for a in arrays), width), np.nan)
+            row = 0
+            for a in arrays:
+                out[row:row + len(a), :a.shape[1]] = a
+                row += len(a)
+            return out
+        
+        def cat(arrays: List[np.ndarray], dtype: Any) -> np.ndarray:
+            return np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+        
+        return JointStateBatch(
+            cat([b.valid for b in batches], bool),
+            join([b.position for b in batches]),
+            join([b.velocity for b in batches]),
+            join([b.effort for b in batches]),
+            cat([b.joint_counts for b in batches], np.int64),
+            cat([b.velocity_counts for b in batches], np.int64),
+            cat([b.effort_counts for b in batches], np.int64),
+            cat([b.stamps for b in batches], np.int64),
+        )
+
+
+def decode_joint_state_batch(datas: List[bytes]) -> JointStateBatch:
+    """
+    Decode N JointState messages and stack them into (N, dof) arrays.
+
+    Messages are grouped by byte layout; each group is decoded with one
+    ``np.frombuffer`` over the concatenated messages, so the per-message
+    cost is a layout comparison rather than a CDR walk. The stacked arrays
+    are copies, so the original message buffers can be released.
+
+    Args:
+        datas: Raw CDR message bytes, one per message.
+
+    Returns:
+        JointStateBatch.
+    """
+    # Size -> layouts seen with that size (interleaved topics often share
+    # a size but differ in frame_id / names)
+    layouts: Dict[int, List[_JointStateLayout]] = {}
+    groups: Dict[_JointStateLayout, List[int]] = {}
+    valid = np.zeros(len(datas), dtype=bool)
+    
+    for i, data in enumerate(datas):
+        layout = _find_layout(layouts, data)
+        if layout is None or layout.fields[0][1] == 0:
+            continue
+        valid[i] = True
+        groups.setdefault(layout, []).append(i)
+    
+    n = int(valid.sum())
+    rank = np.cumsum(valid) - 1
+    widths = [max((layout.fields[k][1] for layout in groups), default=0) for k in range(3)]
+    matrices = [np.full((n, w), np.nan) for w in widths]
+    counts = [np.zeros(n, dtype=np.int64) for _ in range(3)]
+    stamps = np.zeros(n, dtype=np.int64)
+    
+    for layout, indices in groups.items():
+        rows = rank[indices]
+        raw = np.frombuffer(b''.join([datas[i] for i in indices]), dtype=np.uint8)
+        raw = raw.reshape(len(indices), layout.size)
+        
+        order = '<' if layout.little else '>'
+        header = np.ascontiguousarray(raw[:, 4:12])
+        stamps[rows] = (header[:, :4].copy().view(order + 'i4')[:, 0].astype(np.int64) * 1_000_000_000
+                        + header[:, 4:].copy().view(order + 'u4')[:, 0])
+        
+        for k, (offset, count) in enumerate(layout.fields):
+            counts[k][rows] = count
+            if count:
+                block = np.ascontiguousarray(raw[:, offset:offset + 8 * count])
+                matrices[k][rows, :count] = block.view(order + 'f8')
+    
+    return JointStateBatch(valid, matrices[0], matrices[1], matrices[2],
+                           counts[0], counts[1], counts[2], stamps)
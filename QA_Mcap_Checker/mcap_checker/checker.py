@@ -10,26 +10,298 @@ Usage:
 import sys
 import argparse
 from pathlib import Path
+from typing import Iterable, Optional
 
 from mcap.reader import make_reader
 
+from .profiling import ProfiledFile
+from .registry import RULE_ORDER, RuleScheduler, select_rules
 from .report import CheckReport
 from .rules import structure, timing, values, metadata
+from .scan import scan_messages
+from .timestore import TimestampStore
 from . import config
 
 
-def run_checks(mcap_path: str, strict_mode: bool = False) -> CheckReport:
+class _CheckRun:
+    """
+    Rule steps of one run_checks call and the state they share (topic
+    timestamps, scan visitors, joint statistics).
+    """
+    
+    def __init__(self, report: CheckReport, scheduler: RuleScheduler, mcap_path: str,
+                 f, reader, summary, chunk_workers: int):
+        self.report = report
+        self.scheduler = scheduler
+        self.mcap_path = mcap_path
+        self.f = f
+        self.reader = reader
+        self.summary = summary
+        self.chunk_workers = chunk_workers
+        self.topic_ts = None
+        self.merged = None
+        self.visitors = []
+        self.ts_visitor = None
+        self.joint_visitor = None
+        self.joint_source = None
+        self.joint_stats = None
+        self.vision_visitors = []
+    
+    def execute(self):
+        run = self.scheduler.run
+        
+        # Summary-only rules first: they do not read any chunk
+        run("A", self.check_structure)
+        if self.report.unreadable:
+            return
+        run("I", self.check_metadata)
+        run("B1", self.check_timestamps_indexed)
+        
+        # Single message pass: every message-level rule is a visitor
+        if not self.scheduler.aborted:
+            self.scan()
+        
+        run("B1", self.finish_timestamps)
+        run("B2", self.check_episode_range)
+        run("C", self.check_frequencies)
+        run("D", self.check_sync)
+        run("E1", self.check_joint_validity)
+        run("E2", self.check_motion_smoothness)
+        run("F", self.check_timing_stability)
+        run("F1-F2", self.check_advanced)
+        run("G", self.finish_vision)
+    
+    # ============================================
+    # A. File & structural integrity (Hard Fail)
+    # ============================================
+    def check_structure(self):
+        failures = self.report.fail_count
+        structure.check_readable(self.summary, self.report)
+        
+        # If file is not readable (A1 failed), nothing else can run
+        if self.report.fail_count > failures:
+            self.report.unreadable = True
+            return
+        
+        structure.check_required_topics(self.summary.channels, self.report)
+        structure.check_schemas(self.summary.channels, self.summary.schemas, self.report)
+    
+    # ============================================
+    # I. Metadata integrity
+    # ============================================
+    def check_metadata(self):
+        # Metadata records are located through the summary index,
+        # so this does not touch any chunk.
+        try:
+            metadata.check_metadata(self.reader, self.report)
+        except Exception as e:
+            self.report.warn("I: Metadata check error", str(e))
+    
+    # ============================================
+    # Message scan
+    # ============================================
+    def check_timestamps_indexed(self):
+        # B1 fast path: timestamps straight from the message index
+        # (bounded memory: running statistics, one chunk at a time)
+        if config.USE_MESSAGE_INDEX:
+            check = timing.check_timestamps_indexed
+            if config.BOUNDED_MEMORY_TIMING:
+                check = timing.check_timestamps_streaming
+            try:
+                self.topic_ts = check(self.f, self.summary, self.report)
+            except Exception:
+                # Unreadable index: fall back to the full scan
+                self.topic_ts = None
+    
+    def scan(self):
+        wants = self.scheduler.wants
+        scan_b1 = wants("B1") and self.topic_ts is None
+        scan_joints = wants("E1") or wants("E2")
+        
+        # Large files: B1/E1/E2 partial reductions over chunk ranges in
+        # worker processes, merged in file order
+        if self.chunk_workers and self.chunk_workers > 1 and (scan_b1 or scan_joints):
+            self.report.profile_section("scan")
+            try:
+                from .parallel import scan_chunks_parallel
+                self.merged = scan_chunks_parallel(self.mcap_path, self.summary, self.chunk_workers,
+                                                   keep_times=scan_b1)
+            except Exception:
+                # Fall back to the single pass below
+                self.merged = None
+        
+        if self.merged is None:
+            if scan_b1:
+                self.scheduler.run("B1", self.prepare_timestamps)
+            if scan_joints:
+                self.scheduler.run("E1" if wants("E1") else "E2", self.prepare_joints)
+        self.scheduler.run("F1-F2", self.prepare_advanced)
+        self.scheduler.run("G", self.prepare_vision)
+        
+        self.report.profile_section("scan")
+        try:
+            scan_messages(self.reader, self.visitors, profiler=self.report.profiler,
+                          pushdown=self.report.pushdown)
+        except Exception as e:
+            # The pass itself broke (e.g. corrupt chunk); rules still
+            # finalize on whatever they have seen so far.
+            self.report.begin_rule(None)
+            self.report.warn("Message scan error", str(e))
+    
+    def prepare_timestamps(self):
+        self.ts_visitor = timing.TimestampVisitor(self.report)
+        self.visitors.append(self.ts_visitor)
+    
+    def prepare_joints(self):
+        # E1 and E2 share one decode and one joint analysis
+        self.joint_visitor = values.JointAnalysisVisitor(self.report, self.summary.schemas)
+        self.visitors.append(self.joint_visitor)
+    
+    def prepare_advanced(self):
+        # F1/F2 reuse the joint arrays decoded for E1/E2 (own collector if
+        # those run elsewhere or are disabled)
+        self.joint_source = self.joint_visitor
+        if self.joint_source is None:
+            self.joint_source = values.JointBatchVisitor(self.report, self.summary.schemas)
+            self.visitors.append(self.joint_source)
+    
+    def prepare_vision(self):
+        try:
+            from .rules import vision
+            self.vision_visitors = [vision.ImageIntegrityVisitor(self.report, summary=self.summary),
+                                    vision.IlluminationVisitor(self.report)]
+            self.visitors.extend(self.vision_visitors)
+        except Exception as e:
+            self.report.warn("G: Vision check error", str(e))
+    
+    # ============================================
+    # B/C/D. Time, frequency & synchronization (Hard + Soft)
+    # ============================================
+    def finish_timestamps(self):
+        # B1: Timestamp checks (also collect topic_ts)
+        merged = self.merged
+        if self.ts_visitor is not None:
+            self.ts_visitor.close()
+            self.topic_ts = self.ts_visitor.topic_ts if self.ts_visitor.error is None else {}
+        elif merged is not None and self.topic_ts is None:
+            if merged.b1_failure:
+                self.report.fail(*merged.b1_failure)
+                self.topic_ts = TimestampStore()
+            else:
+                self.topic_ts = merged.topic_ts(self.summary.channels)
+                self.report.ok("B1: Timestamps monotonic", "All timestamps valid and ordered")
+    
+    def check_episode_range(self):
+        # B2: Episode range check
+        if self.topic_ts:
+            try:
+                timing.check_episode_range(self.topic_ts, self.summary, self.report)
+            except Exception as e:
+                self.report.warn("B2: Episode range check error", str(e))
+    
+    def check_frequencies(self):
+        # C1-C3: Frequency checks
+        if self.topic_ts:
+            try:
+                timing.check_frequencies(self.topic_ts, self.report)
+                timing.check_gaps(self.topic_ts, self.report)
+            except Exception as e:
+                self.report.warn("C: Frequency check error", str(e))
+    
+    def check_sync(self):
+        # D1-D2: Synchronization checks
+        if self.topic_ts:
+            try:
+                timing.check_sync(self.topic_ts, self.report)
+                timing.check_action_alignment(self.topic_ts, self.report)
+            except Exception as e:
+                self.report.warn("D: Sync check error", str(e))
+    
+    # ============================================
+    # E/F. Numerical values & trajectory (Hard + Soft)
+    # ============================================
+    def joint_analysis(self) -> Optional[dict]:
+        """E1/E2 joint statistics, computed once for both groups."""
+        if self.joint_stats is None:
+            if self.merged is not None:
+                self.joint_stats = self.merged.joint_stats
+            elif self.joint_visitor is not None:
+                self.joint_visitor.close()
+                self.joint_stats = self.joint_visitor.stats
+        return self.joint_stats
+    
+    def check_joint_validity(self):
+        joint_stats = self.joint_analysis()
+        if joint_stats is not None:
+            values.report_joint_validity(self.report, joint_stats)
+    
+    def check_motion_smoothness(self):
+        joint_stats = self.joint_analysis()
+        if joint_stats is not None:
+            values.report_motion_smoothness(self.report, joint_stats)
+    
+    def check_timing_stability(self):
+        # F: Timing stability
+        if self.topic_ts:
+            try:
+                values.check_timing_stability(self.topic_ts, self.report)
+            except Exception as e:
+                self.report.warn("F: Timing stability check error", str(e))
+    
+    def check_advanced(self):
+        # F1-F2: Trajectory continuity and vibration
+        if self.joint_source is None:
+            return
+        try:
+            values.check_trajectory_continuity(self.joint_source, self.report)
+            values.check_vibration(self.joint_source, self.report)
+        except Exception as e:
+            self.report.warn("F: Advanced check error", str(e))
+    
+    # ============================================
+    # G. Vision quality (if enabled)
+    # ============================================
+    def finish_vision(self):
+        for visitor in self.vision_visitors:
+            visitor.close()
+
+
+def run_checks(mcap_path: str, strict_mode: bool = False,
+               chunk_workers: Optional[int] = None,
+               rules: Optional[Iterable[str]] = None,
+               profile: bool = False,
+               fail_fast: bool = False) -> CheckReport:
     """
     Run all MCAP checks.
 
+    Rules are scheduled from the registry (registry.RULES): summary-only
+    rules (A, I) run first without reading any chunk, then message-level
+    rules (B1, E1, E2, F1-F2, G) share a single pass over the file, and
+    the remaining rules work on the collected timestamps. A rule whose
+    dependency failed is skipped (``report.skipped``). Items are reported
+    in registry order.
+
     Args:
         mcap_path: Path to MCAP file.
         strict_mode: Whether to enable strict mode.
-
+        chunk_workers: Split B1/E1/E2 over this many processes, each
+            handling a range of chunks (default: config.CHUNK_WORKERS;
+            0 or 1 = single pass in this process).
+        rules: Only run these rule groups (see registry.RULES, e.g.
+            {"C", "D"}); None runs everything. Groups that need B1
+            timestamps must be run together with "B1".
+        profile: Record per-rule wall / CPU time, bytes read, messages
+            and peak RSS growth (``report.to_dict()['profile']``).
+        fail_fast: Stop at the first FAIL item: the remaining rules (and
+            the message scan, if it has not run yet) are skipped.
+    
     Returns:
         CheckReport instance.
     """
     report = CheckReport(mcap_path)
+    if profile:
+        report.enable_profiling()
+        report.profile_section("open")
     
     # Try to open file
     try:
@@ -43,127 +315,27 @@ def run_checks(mcap_path: str, strict_mode: bool = False) -> CheckReport:
         report.finalize()
         return report
     
+    if report.profiler is not None:
+        f = ProfiledFile(f, report.profiler)
+    
+    if chunk_workers is None:
+        chunk_workers = config.CHUNK_WORKERS
+    
     with f:
         try:
             reader = make_reader(f)
             summary = reader.get_summary()
         except Exception as e:
             report.fail("Cannot read MCAP", str(e))
+            report.unreadable = True
             report.finalize()
             return report
         
-        channels = summary.channels
-        schemas = summary.schemas
-        
-        # ============================================
-        # A. File & structural integrity (Hard Fail)
-        # ============================================
-        structure.check_readable(summary, report)
-        
-        # If file is not readable, return immediately
-        if report.hard_fail:
-            report.finalize()
-            return report
-        
-        structure.check_required_topics(channels, report)
-        structure.check_schemas(channels, schemas, report)
-        
-        # Remember whether structural checks failed (but continue with other checks)
-        structure_failed = report.hard_fail
-        
-        # ============================================
-        # B/C/D. Time, frequency & synchronization (Hard + Soft)
-        # ============================================
-        # B1: Timestamp checks (also collect topic_ts)
-        topic_ts = {}
-        try:
-            topic_ts = timing.check_timestamps(reader, report)
-        except Exception as e:
-            report.warn("B1: Timestamp check error", str(e))
-        
-        # B2: Episode range check
-        if topic_ts:
-            try:
-                timing.check_episode_range(topic_ts, summary, report)
-            except Exception as e:
-                report.warn("B2: Episode range check error", str(e))
-        
-        # C1-C3: Frequency checks
-        if topic_ts:
-            try:
-                timing.check_frequencies(topic_ts, report)
-                timing.check_gaps(topic_ts, report)
-            except Exception as e:
-                report.warn("C: Frequency check error", str(e))
-        
-        # D1-D2: Synchronization checks
-        if topic_ts:
-            try:
-                timing.check_sync(topic_ts, report)
-                timing.check_action_alignment(topic_ts, report)
-            except Exception as e:
-                report.warn("D: Sync check error", str(e))
-        
-        # ============================================
-        # E/F. Numerical values & trajectory (Hard + Soft)
-        # ============================================
-        # E1-E2: Joint numerical checks (needs schemas)
-        try:
-            with open(mcap_path, "rb") as f2:
-                reader2 = make_reader(f2)
-                summary2 = reader2.get_summary()
-                values.check_joint_states(reader2, report, summary2.schemas)
-        except Exception as e:
-            report.warn("E1: Joint states check error", str(e))
-        
-        # Motion continuity check
-        try:
-            with open(mcap_path, "rb") as f3:
-                reader3 = make_reader(f3)
-                summary3 = reader3.get_summary()
-                values.check_motion_smoothness(reader3, report, summary3.schemas)
-        except Exception as e:
-            report.warn("E2: Motion smoothness check error", str(e))
-        
-        # F: Timing stability
-        if topic_ts:
-            try:
-                values.check_timing_stability(topic_ts, report)
-            except Exception as e:
-                report.warn("F: Timing stability check error", str(e))
-        
-        # F1-F2: Advanced checks (if enabled)
-        if config.ENABLE_ADVANCED_CHECKS:
-            try:
-                with open(mcap_path, "rb") as f4:
-                    reader4 = make_reader(f4)
-                    values.check_trajectory_continuity(reader4, report)
-                values.check_vibration(topic_ts, report)
-            except Exception as e:
-                report.warn("F: Advanced check error", str(e))
-        
-        # ============================================
-        # G. Vision quality (if enabled)
-        # ============================================
-        if config.ENABLE_VISION_CHECKS:
-            try:
-                from .rules import vision
-                with open(mcap_path, "rb") as f5:
-                    reader5 = make_reader(f5)
-                    vision.check_image_integrity(reader5, report)
-                    vision.check_illumination(reader5, report)
-            except Exception as e:
-                report.warn("G: Vision check error", str(e))
-        
-        # ============================================
-        # I. Metadata integrity
-        # ============================================
-        try:
-            with open(mcap_path, "rb") as f6:
-                reader6 = make_reader(f6)
-                metadata.check_metadata(reader6, report)
-        except Exception as e:
-            report.warn("I: Metadata check error", str(e))
+        scheduler = RuleScheduler(report, select_rules(rules), fail_fast=fail_fast)
+        _CheckRun(report, scheduler, mcap_path, f, reader, summary, chunk_workers).execute()
+    
+    report.begin_rule(None)
+    report.sort_items(RULE_ORDER)
     
     # ============================================
     # J. Final grading
@@ -182,10 +354,12 @@ Examples:
   python -m mcap_checker.checker demo.mcap
   python -m mcap_checker.checker demo.mcap --json report.json
   python -m mcap_checker.checker demo.mcap --strict
+  python -m mcap_checker.checker demo.mcap --fail-fast
+  python -m mcap_checker.checker recording.mcap --follow
         """
     )
     
-    parser.add_argument("mcap_file", help="Path to MCAP file")
+    parser.add_argument("mcap_file", help="Path to MCAP file (or directory of split files with --follow)")
     parser.add_argument("--json", "-j", 
                        help="Output JSON report to file")
     parser.add_argument("--strict", "-s", action="store_true",
@@ -194,6 +368,29 @@ Examples:
                        help="Enable vision quality checks (slow)")
     parser.add_argument("--enable-advanced", action="store_true",
                        help="Enable advanced checks (trajectory, vibration)")
+    parser.add_argument("--no-index", action="store_true",
+                       help="Always scan messages for B1 timestamps instead of reading the message index")
+    parser.add_argument("--low-memory", action="store_true",
+                       help="Keep running per-topic timing statistics instead of every timestamp (O(channels) memory)")
+    parser.add_argument("--chunk-workers", type=int, default=None,
+                       help="Split the message scan over N processes by chunk range (large files)")
+    parser.add_argument("--cache", action="store_true",
+                       help="Reuse cached results of unchanged files (re-run only changed rules)")
+    parser.add_argument("--cache-dir",
+                       help="Result cache directory (implies --cache)")
+    parser.add_argument("--follow", "-f", action="store_true",
+                       help="Tail mode: follow a file still being recorded and report problems as they appear")
+    parser.add_argument("--events",
+                       help="With --follow: also write events to this JSONL file")
+    parser.add_argument("--poll", type=float, default=None,
+                       help="With --follow: seconds between polls")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                       help="With --follow: stop after N seconds without new data")
+    parser.add_argument("--profile", action="store_true",
+                       help="Print and save per-rule wall/CPU time, bytes read, messages and peak RSS "
+                            "(runs all rules, bypassing the result cache)")
+    parser.add_argument("--fail-fast", action="store_true",
+                       help="Stop at the first FAIL and skip the remaining rules (bypasses the result cache)")
     
     args = parser.parse_args()
     
@@ -204,6 +401,14 @@ Examples:
         config.ENABLE_VISION_CHECKS = True
     if args.enable_advanced:
         config.ENABLE_ADVANCED_CHECKS = True
+    if args.no_index:
+        config.USE_MESSAGE_INDEX = False
+    if args.low_memory:
+        config.BOUNDED_MEMORY_TIMING = True
+    if args.cache or args.cache_dir:
+        config.USE_RESULT_CACHE = True
+    if args.cache_dir:
+        config.RESULT_CACHE_DIR = args.cache_dir
     
     # Check file exists
     mcap_path = Path(args.mcap_file)
@@ -211,11 +416,24 @@ Examples:
         print(f"Error: File not found: {mcap_path}")
         sys.exit(1)
     
+    # Tail mode: the file is still being written
+    if args.follow:
+        from .tail import main_follow
+        sys.exit(main_follow(str(mcap_path), events_path=args.events,
+                             poll_interval=args.poll, idle_timeout=args.idle_timeout))
+
     # Run checks
-    report = run_checks(str(mcap_path), strict_mode=args.strict)
+    if config.USE_RESULT_CACHE and not (args.profile or args.fail_fast):
+        from .cache import run_checks_cached
+        report = run_checks_cached(str(mcap_path), strict_mode=args.strict,
+                                   chunk_workers=args.chunk_workers)
+    else:
+        report = run_checks(str(mcap_path), strict_mode=args.strict,
+                            chunk_workers=args.chunk_workers, profile=args.profile,
+                            fail_fast=args.fail_fast)
     
     # Print summary
-    report.print_summary()
+    report.print_summary(profile=args.profile)
     
     # Save JSON report
     if args.json:
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Chunk-level readers.
+
+Reads and decompresses individual chunks located through the summary's
+chunk indexes, and walks their message records directly. Used by the
+scan engine (file-order iteration one chunk at a time) and by the
+chunk-parallel checker (workers that each own a range of chunks).
+"""
+
+import struct
+from typing import AbstractSet, Any, BinaryIO, Iterator, List, Optional, Tuple
+
+from mcap.data_stream import ReadDataStream
+from mcap.records import Chunk, Message
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+MESSAGE_OPCODE = 0x05
+
+# opcode (1) + record length (8)
+_RECORD_PREFIX = struct.Struct('<BQ')
+# channel_id (2) + sequence (4) + log_time (8) + publish_time (8)
+_MESSAGE_HEADER = struct.Struct('<HIQQ')
+
+
+def sorted_chunk_indexes(summary: Any, channel_ids: Optional[AbstractSet[int]] = None) -> List[Any]:
+    """
+    Chunk indexes of the summary in file (offset) order.
+
+    Args:
+        summary: Summary from ``reader.get_summary()``.
+        channel_ids: Only chunks holding messages of these channels
+            (None: all chunks).
+    """
+    if summary is None or not summary.chunk_indexes:
+        return []
+    chunk_indexes = sorted(summary.chunk_indexes, key=lambda ci: ci.chunk_start_offset)
+    if channel_ids is not None:
+        chunk_indexes = [ci for ci in chunk_indexes if chunk_has_channels(ci, channel_ids)]
+    return chunk_indexes
+
+
+def chunk_has_channels(chunk_index: Any, channel_ids: AbstractSet[int]) -> bool:
+    """
+    True if a chunk may hold messages of ``channel_ids``.
+
+    The message index offsets of a ChunkIndex list the channels present
+    in the chunk; a chunk without them (no message index) may hold
+    anything.
+    """
+    if not chunk_index.message_index_offsets:
+        return True
+    return not channel_ids.isdisjoint(chunk_index.message_index_offsets)
+
+
+def read_chunk(stream: BinaryIO, chunk_start_offset: int) -> bytes:
+    """
+    Read and decompress one chunk.
+
+    Args:
+        stream: Seekable binary stream of the MCAP file.
+        chunk_start_offset: File offset of the Chunk record (from its
+            ChunkIndex).
+
+    Returns:
+        Uncompressed chunk records.
+    """
+    # Skip opcode (1) + record length (8)
+    stream.seek(chunk_start_offset + _RECORD_PREFIX.size)
+    return decompress_chunk(Chunk.read(ReadDataStream(stream)))
+
+
+def decompress_chunk(chunk: Chunk) -> bytes:
+    """Uncompressed records of a Chunk record."""
+    if chunk.compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd chunks")
+        return zstandard.decompress(chunk.data, chunk.uncompressed_size)
+    if chunk.compression == "lz4":
+        if lz4 is None:
+            raise RuntimeError("lz4 is required to read lz4 chunks")
+        return lz4.decompress(chunk.data)
+    if chunk.compression:
+        raise RuntimeError(f"Unsupported chunk compression: {chunk.compression}")
+    return chunk.data
+
+
+def iter_records(data: bytes, pos: int = 0) -> Iterator[Tuple[int, int, int]]:
+    """
+    Walk complete records in a buffer.
+
+    Stops at the first incomplete record, so it can be used on the
+    readable part of a file that is still being written.
+
+    Yields:
+        (opcode, body_start, body_end) per record.
+    """
+    end = len(data)
+    prefix = _RECORD_PREFIX.unpack_from
+    while pos + _RECORD_PREFIX.size <= end:
+        opcode, length = prefix(data, pos)
+        body = pos + _RECORD_PREFIX.size
+        if body + length > end:
+            return
+        pos = body + length
+        yield opcode, body, pos
+
+
+def parse_message(data: bytes, body: int, body_end: int) -> Message:
+    """Build a Message from the body of a Message record."""
+    channel_id, sequence, log_time, publish_time = _MESSAGE_HEADER.unpack_from(data, body)
+    return Message(
+        channel_id=channel_id,
+        log_time=log_time,
+        data=data[body + _MESSAGE_HEADER.size:body_end],
+        publish_time=publish_time,
+        sequence=sequence,
+    )
+
+
+def iter_chunk_messages(data: bytes) -> Iterator[Tuple[int, int, int, int, int, int]]:
+    """
+    Walk the message records of an uncompressed chunk.
+
+    Yields:
+        (channel_id, sequence, log_time, publish_time, data_start, data_end)
+        per message, in record order. Payloads are ``data[data_start:data_end]``.
+    """
+    pos = 0
+    end = len(data)
+    prefix = _RECORD_PREFIX.unpack_from
+    header = _MESSAGE_HEADER.unpack_from
+
+    while pos + _RECORD_PREFIX.size <= end:
+        opcode, length = prefix(data, pos)
+        body = pos + _RECORD_PREFIX.size
+        pos = body + length
+        if pos > end:
+            raise ValueError("Truncated record in chunk")
+        if opcode == MESSAGE_OPCODE:
+            channel_id, sequence, log_time, publish_time = header(data, body)
+            yield channel_id, sequence, log_time, publish_time, body + _MESSAGE_HEADER.size, pos
+
+
+def iter_messages_file_order(reader: Any, channel_ids: Optional[AbstractSet[int]] = None
+                             ) -> Iterator[Tuple[Optional[Any], Any, Message]]:
+    """
+    Iterate (schema, channel, message) in file order, one chunk at a time.
+
+    ``SeekingReader.iter_messages(log_time_order=False)`` queues every
+    chunk before yielding the first message, which keeps the whole
+    decompressed file in memory. Reading chunk by chunk bounds memory to a
+    single chunk. Falls back to the reader when the file has no chunk
+    index or the reader is not seekable.
+
+    Args:
+        reader: MCAP reader.
+        channel_ids: Only yield messages of these channels (None: all).
+            Chunks without any of them are not read at all, and the
+            payloads of other messages are never sliced out.
+    """
+    summary = reader.get_summary()
+    stream = getattr(reader, '_stream', None)
+    chunk_indexes = sorted_chunk_indexes(summary)
+    if stream is None or not chunk_indexes:
+        if channel_ids is None or summary is None:
+            yield from reader.iter_messages(log_time_order=False)
+        elif channel_ids:
+            topics = sorted({summary.channels[channel_id].topic for channel_id in channel_ids})
+            for schema, channel, message in reader.iter_messages(topics=topics, log_time_order=False):
+                if channel.id in channel_ids:
+                    yield schema, channel, message
+        return
+
+    channels = summary.channels
+    schemas = summary.schemas
+    for chunk_index in chunk_indexes:
+        if channel_ids is not None and not chunk_has_channels(chunk_index, channel_ids):
+            continue
+        data = read_chunk(stream, chunk_index.chunk_start_offset)
+        for channel_id, sequence, log_time, publish_time, start, stop in iter_chunk_messages(data):
+            if channel_ids is not None and channel_id not in channel_ids:
+                continue
+            channel = channels[channel_id]
+            schema = schemas.get(channel.schema_id) if channel.schema_id else None
+            yield schema, channel, Message(
+                channel_id=channel_id,
+                log_time=log_time,
+                data=data[start:stop],
+                publish_time=publish_time,
+                sequence=sequence,
+            )
+
+
+def plan_chunk_ranges(summary: Any, parts: int,
+                      channel_ids: Optional[AbstractSet[int]] = None) -> List[List[Tuple[int, int]]]:
+    """
+    Split the chunks into contiguous ranges of similar uncompressed size.
+
+    Ranges keep file order, so partial results can be merged left to
+    right with fix-ups only at range edges.
+
+    Args:
+        summary: Summary from ``reader.get_summary()``.
+        parts: Desired number of ranges.
+        channel_ids: Only chunks holding messages of these channels
+            (None: all chunks).
+
+    Returns:
+        List of ranges; each range is a list of (chunk_start_offset,
+        uncompressed_size) in file order.
+    """
+    chunk_indexes = sorted_chunk_indexes(summary, channel_ids)
+    if not chunk_indexes:
+        return []
+    parts = max(1, min(parts, len(chunk_indexes)))
+
+    total = sum(ci.uncompressed_size for ci in chunk_indexes)
+    target = total / parts
+    ranges: List[List[Tuple[int, int]]] = [[]]
+    filled = 0
+    for ci in chunk_indexes:
+        if ranges[-1] and filled >= target * len(ranges) and len(ranges) < parts:
+            ranges.append([])
+        ranges[-1].append((ci.chunk_start_offset, ci.uncompressed_size))
+        filled += ci.uncompressed_size
+    return ranges
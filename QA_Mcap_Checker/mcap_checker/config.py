@@ -32,12 +32,44 @@ MAX_TIME_GAP_MS = 200.0      # C1: Maximum time gap (ms), for drop-frame detecti
 # =========================
 MAX_SYNC_MS = 34.0           # D1: Max camera–joint sync error (ms)
 MAX_DESYNC_RATIO = 0.05      # Allow up to 5% frames beyond sync threshold
+SYNC_HISTOGRAM_BINS_MS = [0.0, 5.0, 10.0, 20.0, 34.0, 50.0, 100.0, float("inf")]  # D1: |Δt| histogram edges
+SYNC_WORST_FRAMES = 5        # D1: Number of worst frames reported per camera
 
 # =========================
 # E. Numerical validity
 # =========================
 MAX_JOINT_JUMP = 0.5         # E2: Maximum joint jump (rad)
+MAX_JOINT_VELOCITY = 20.0    # E2: Joint speed spike, |Δposition| / Δt between consecutive samples (rad/s)
+MAX_JOINT_ACCELERATION = 1500.0  # E2: Joint acceleration spike (rad/s²)
+JOINT_POSITION_LIMITS = None # E1: [[min, max], ...] position limits by joint index (rad); None = no check
 MAX_TIMING_JITTER = 0.02     # F: Timestamp jitter threshold (seconds)
+FK_MODEL = "airbot_play"     # F1: Kinematic model (built-in name or JSON/YAML file, see kinematics.py)
+MAX_EE_STEP_M = 0.05         # F1: EE translation between consecutive samples counted as a teleport (m)...
+MAX_EE_ROTATION_STEP_RAD = 0.35  # F1: ...and EE rotation counted as an orientation discontinuity (rad)...
+EE_STEP_OUTLIER_RATIO = 5.0  # F1: ...when also this many times the median step around it (not a fast move)
+VIBRATION_SEGMENT = 256      # F2: Welch segment length (samples)
+VIBRATION_HF_CUTOFF_HZ = 8.0 # F2: Start of the vibration band (Hz); teleoperated motion stays below
+MAX_VIBRATION_ENERGY_RATIO = 0.05  # F2: Max share of joint motion energy above the cutoff
+VIBRATION_MIN_RMS = 0.002    # F2: High-band rms below this (rad) is treated as sensor noise
+VIBRATION_PEAK_RATIO = 20.0  # F2: Spectral peak vs. median high-band power that counts as resonance
+
+# =========================
+# G. Vision quality
+# =========================
+VISION_SAMPLES_PER_TOPIC = 50  # G1: Frames decoded per camera topic (stratified over the episode)
+VISION_DECODE_THREADS = 4      # G1: Decode thread pool size (JPEG/PNG decoders release the GIL)
+VISION_MAX_DIM = 160           # G1: Frames are analysed downscaled to this longest side (pixels)
+VISION_BLACK_LEVEL = 16.0      # G1: Mean gray level below which a flat frame is black
+VISION_WHITE_LEVEL = 239.0     # G1: Mean gray level above which a flat frame is white
+VISION_FLAT_STD = 4.0          # G1: Gray level std below which a frame is flat
+VISION_TEAR_RATIO = 8.0        # G1: Row discontinuity vs. median row difference that counts as tearing
+VISION_TEAR_MIN_DIFF = 40.0    # G1: Minimum gray level jump across a torn row
+ILLUMINATION_THUMB_DIM = 32    # G2: Thumbnail longest side for per-frame brightness (pixels)
+ILLUMINATION_MAINS_HZ = [50.0, 60.0]  # G2: Mains frequencies; lights flicker at 1x and 2x (aliased by the frame rate)
+ILLUMINATION_FFT_SEGMENT = 256 # G2: Frames per FFT segment (segment spectra are averaged)
+ILLUMINATION_FLICKER_RATIO = 6.0      # G2: Peak vs. median spectrum magnitude that counts as flicker
+ILLUMINATION_FLICKER_MIN_AMPLITUDE = 2.0  # G2: Minimum flicker amplitude (gray levels; above rounding noise)
+ILLUMINATION_MAX_JUMP = 30.0   # G2: Maximum brightness change between consecutive frames (gray levels)
 
 # =========================
 # I. Metadata
@@ -56,3 +88,30 @@ REQUIRED_METADATA_FIELDS = [
 ENABLE_STRICT_MODE = False     # Strict mode: more checks treated as Hard Fail
 ENABLE_VISION_CHECKS = False   # Enable vision quality checks (requires image decoding)
 ENABLE_ADVANCED_CHECKS = False # Enable advanced checks (trajectory, vibration, etc.)
+USE_MESSAGE_INDEX = True       # B1: Read timestamps from the message index (no payload decoding) when present
+BOUNDED_MEMORY_TIMING = False  # B-F: Keep running per-topic statistics instead of every timestamp (needs the message index)
+STREAMING_BATCH_EVENTS = 65536  # B-F: Message index entries per batch in bounded-memory mode
+CHUNK_WORKERS = 0              # B1/E1/E2: Processes for chunk-parallel scanning of one file (0 = single pass)
+
+# =========================
+# Batch checking
+# =========================
+BATCH_WORKERS = None           # Worker processes for `mcap_checker batch` (None = CPU count)
+BATCH_FILE_TIMEOUT_S = 600.0   # Per-file timeout in batch mode (seconds, 0 = no limit)
+
+# =========================
+# Tail mode (--follow)
+# =========================
+TAIL_POLL_INTERVAL_S = 0.5     # Seconds between polls of a growing file
+TAIL_RATE_WINDOW_S = 2.0       # C1/C2: Rolling window for the live rate (seconds of log time)
+TAIL_RATE_TOLERANCE = 0.05     # C1/C2: Warn below (1 - tolerance) x minimum rate, recover at the minimum
+TAIL_SYNC_WINDOW_FRAMES = 100  # D1: Camera frames in the rolling desync ratio
+TAIL_IDLE_WARN_S = 10.0        # Warn when the file has not grown for this long (seconds)
+TAIL_READ_BYTES = 2**20         # Bytes read per poll (about one chunk; a larger record is read whole)
+
+# =========================
+# Result cache
+# =========================
+USE_RESULT_CACHE = False       # Reuse cached reports of unchanged files (--cache)
+RESULT_CACHE_DIR = None        # Cache directory (None = .mcap_cache in the project root)
+RESULT_CACHE_MAX_ENTRIES = 10000  # LRU capacity (files)
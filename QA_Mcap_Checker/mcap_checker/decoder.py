@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 """
 Message decoder - supports ROS2 message formats.
+
+JointState decoders live in the shared ``cdr`` package and are
+re-exported here.
 """
 
 import struct
 from typing import Optional, Dict, Any, List
 
+from .cdr import (JointStateArrays, JointStateBatch, decode_joint_state,
+                  decode_joint_state_arrays, decode_joint_state_batch)
+from .ros2msg import SchemaError, compile_schema
+
 
 class CDRDecoder:
     """
@@ -53,85 +60,18 @@ class CDRDecoder:
         return self.read_uint32()
 
 
-def decode_joint_state(data: bytes) -> Optional[Dict[str, Any]]:
-    """
-    Decode a sensor_msgs/msg/JointState message.
-
-    JointState structure:
-    - std_msgs/Header header
-    - string[] name
-    - float64[] position
-    - float64[] velocity
-    - float64[] effort
-    """
-    try:
-        decoder = CDRDecoder(data)
-        
-        result = {}
-        
-        # Read Header
-        # Header.stamp: int32 sec + uint32 nanosec = 8 bytes
-        decoder.pos += 8
-        
-        # Header.frame_id: string (length + data + padding)
-        frame_id_len = decoder.read_uint32()
-        if frame_id_len > 0:
-            decoder.pos += frame_id_len
-            # Align to 4-byte boundary
-            decoder.pos = (decoder.pos + 3) & ~3
-        
-        # Read name[] (string array)
-        name_count = decoder.read_sequence_header()
-        names = []
-        for _ in range(name_count):
-            name_len = decoder.read_uint32()
-            if name_len > 0 and decoder.pos + name_len <= len(data):
-                name = data[decoder.pos:decoder.pos + name_len].decode('utf-8', errors='ignore').rstrip('\x00')
-                decoder.pos += name_len
-                decoder.pos = (decoder.pos + 3) & ~3
-                names.append(name)
-        result['name'] = names
-        
-        # Read position[] (float64 array)
-        pos_count = decoder.read_sequence_header()
-        positions = []
-        for _ in range(pos_count):
-            if decoder.pos + 8 <= len(data):
-                positions.append(decoder.read_float64())
-        result['position'] = positions
-        
-        # Read velocity[] (float64 array)
-        if decoder.pos + 4 <= len(data):
-            vel_count = decoder.read_sequence_header()
-            velocities = []
-            for _ in range(vel_count):
-                if decoder.pos + 8 <= len(data):
-                    velocities.append(decoder.read_float64())
-            result['velocity'] = velocities
-        
-        # Read effort[] (float64 array) - optional
-        if decoder.pos + 4 <= len(data):
-            effort_count = decoder.read_sequence_header()
-            efforts = []
-            for _ in range(effort_count):
-                if decoder.pos + 8 <= len(data):
-                    efforts.append(decoder.read_float64())
-            result['effort'] = efforts
-        
-        return result
-    
-    except Exception as e:
-        # On decode failure, return None
-        return None
-
-
-def decode_message(schema_name: str, data: bytes) -> Optional[Dict[str, Any]]:
+def decode_message(schema_name: str, data: bytes, schema: Any = None) -> Optional[Dict[str, Any]]:
     """
     Decode a message according to its schema name.
 
+    JointState keeps its dedicated list-based decoder; any other type is
+    decoded with the compiled decoder of its ``ros2msg`` schema when the
+    Schema record is given.
+
     Args:
         schema_name: Schema name (e.g. \"sensor_msgs/msg/JointState\").
         data: Raw message bytes.
+        schema: Optional MCAP Schema record.
 
     Returns:
         Decoded message dict, or None on failure.
@@ -142,9 +82,11 @@ def decode_message(schema_name: str, data: bytes) -> Optional[Dict[str, Any]]:
     if 'jointstate' in schema_name_lower:
         return decode_joint_state(data)
     
-    # Additional message types can be added here
-    # elif 'image' in schema_name_lower:
-    #     return decode_image(data)
+    if schema is not None and getattr(schema, 'encoding', '') == 'ros2msg':
+        try:
+            return compile_schema(schema.name, schema.data)(data)
+        except SchemaError:
+            return None
     
     return None
 
@@ -177,6 +119,10 @@ class MessageWrapper:
         """Get joint names."""
         return self._data.get('name', [])
     
+    def get(self, field: str, default: Any = None) -> Any:
+        """Get any decoded field (e.g. 'header', 'data', 'format')."""
+        return self._data.get(field, default)
+    
     def is_valid(self) -> bool:
         """Return True if decoded message is valid."""
         return bool(self._data and self.position)
@@ -196,10 +142,12 @@ def decode_mcap_message(channel: Any, message: Any, schemas: Optional[Dict] = No
     """
     # Determine schema name
     schema_name = ''
+    schema = None
     
     # Try to get schema from channel
     if hasattr(channel, 'schema') and channel.schema:
-        schema_name = getattr(channel.schema, 'name', '')
+        schema = channel.schema
+        schema_name = getattr(schema, 'name', '')
     
     # If not found, try to get from schemas dict
     if not schema_name and schemas and hasattr(channel, 'schema_id'):
@@ -208,6 +156,6 @@ def decode_mcap_message(channel: Any, message: Any, schemas: Optional[Dict] = No
             schema_name = getattr(schema, 'name', '')
     
     # Decode message
-    decoded = decode_message(schema_name, message.data)
+    decoded = decode_message(schema_name, message.data, schema)
     
     return MessageWrapper(decoded)
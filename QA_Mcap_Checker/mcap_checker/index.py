@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Summary-index helpers.
+
+Reads the Message Index records that follow each chunk, giving per-channel
+``log_time`` arrays without decompressing any chunk or touching message
+payloads: for the whole file at once, or one chunk at a time (in file or
+in log-time order) when memory must stay bounded.
+"""
+
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MESSAGE_INDEX_OPCODE = 0x07
+
+# opcode (1) + record length (8)
+_RECORD_PREFIX = struct.Struct('<BQ')
+# channel_id (2) + records byte length (4)
+_MESSAGE_INDEX_HEADER = struct.Struct('<HI')
+
+
+def has_message_index(summary: Any) -> bool:
+    """
+    True if every chunk in the summary carries message index records.
+    """
+    if summary is None or not summary.chunk_indexes:
+        return False
+    return all(ci.message_index_offsets for ci in summary.chunk_indexes)
+
+
+def parse_message_index_block(buf: bytes) -> Dict[int, np.ndarray]:
+    """
+    Parse a run of Message Index records.
+
+    Args:
+        buf: Raw bytes of the message index section of one chunk.
+
+    Returns:
+        Dict of channel_id -> (K, 2) uint64 array of (log_time, offset)
+        pairs. The arrays are views over ``buf``.
+    """
+    entries = {}
+    pos = 0
+    end = len(buf)
+
+    while pos + _RECORD_PREFIX.size <= end:
+        opcode, length = _RECORD_PREFIX.unpack_from(buf, pos)
+        body = pos + _RECORD_PREFIX.size
+        pos = body + length
+
+        if opcode != MESSAGE_INDEX_OPCODE:
+            continue
+
+        channel_id, records_len = _MESSAGE_INDEX_HEADER.unpack_from(buf, body)
+        count = records_len // 16
+        entries[channel_id] = np.frombuffer(
+            buf, dtype='<u8', count=count * 2,
+            offset=body + _MESSAGE_INDEX_HEADER.size
+        ).reshape(count, 2)
+
+    return entries
+
+
+def read_index_timestamps(stream: BinaryIO, summary: Any) -> Optional[Dict[int, np.ndarray]]:
+    """
+    Collect per-channel log times from the message index.
+
+    Timestamps are returned in file (recording) order: chunks are visited
+    by offset and entries within a chunk are ordered by message offset.
+
+    Args:
+        stream: Seekable binary stream of the MCAP file.
+        summary: Summary from ``reader.get_summary()``.
+
+    Returns:
+        Dict of channel_id -> int64 log_time array, or None if the file
+        has no (complete) message index.
+    """
+    if not has_message_index(summary):
+        return None
+
+    parts: Dict[int, List[np.ndarray]] = {}
+    for chunk_index in sorted(summary.chunk_indexes, key=lambda ci: ci.chunk_start_offset):
+        chunk_times = read_chunk_index_times(stream, chunk_index)
+        if chunk_times is None:
+            return None
+        for channel_id, values in chunk_times.items():
+            parts.setdefault(channel_id, []).append(values)
+
+    times = {channel_id: np.concatenate(arrays) if len(arrays) > 1 else arrays[0]
+             for channel_id, arrays in parts.items()}
+
+    # The index must account for every message, otherwise it is not usable
+    statistics = summary.statistics
+    if statistics is not None and statistics.message_count:
+        indexed = sum(len(t) for t in times.values())
+        if indexed != statistics.message_count:
+            return None
+
+    return times
+
+
+def read_chunk_index_times(stream: BinaryIO, chunk_index: Any) -> Optional[Dict[int, np.ndarray]]:
+    """
+    Per-channel log times of one chunk, from its message index.
+
+    Args:
+        stream: Seekable binary stream of the MCAP file.
+        chunk_index: ChunkIndex record of the chunk.
+
+    Returns:
+        Dict of channel_id -> int64 log_time array in message offset
+        (recording) order, or None if the index is truncated.
+    """
+    stream.seek(chunk_index.chunk_start_offset + chunk_index.chunk_length)
+    buf = stream.read(chunk_index.message_index_length)
+    if len(buf) != chunk_index.message_index_length:
+        return None
+
+    times = {}
+    for channel_id, records in parse_message_index_block(buf).items():
+        if len(records) == 0:
+            continue
+        order = np.argsort(records[:, 1], kind='stable')
+        times[channel_id] = records[order, 0].astype(np.int64)
+    return times
+
+
+def iter_index_time_order(stream: BinaryIO, summary: Any,
+                          batch_size: int = 1 << 16) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield the message index of the whole file in log-time order, in batches.
+
+    Chunks are read in ``message_start_time`` order. Once about
+    ``batch_size`` entries are buffered, the entries older than the next
+    chunk's start time can no longer be preceded by anything and are
+    yielded; the rest wait for the next chunks. Memory is bounded by
+    ``batch_size`` plus the index of the chunks overlapping in time.
+
+    Args:
+        stream: Seekable binary stream of the MCAP file.
+        summary: Summary with a complete message index (see
+            has_message_index).
+        batch_size: Entries to buffer before sorting and yielding.
+
+    Yields:
+        (log_times int64, channel_ids uint16) arrays of equal length,
+        sorted by log time (ties keep channel order).
+
+    Raises:
+        ValueError: If a chunk's message index is truncated.
+    """
+    chunk_indexes = sorted(summary.chunk_indexes,
+                           key=lambda ci: (ci.message_start_time, ci.chunk_start_offset))
+    times_parts = [np.empty(0, dtype=np.int64)]
+    channel_parts = [np.empty(0, dtype=np.uint16)]
+    buffered = 0
+
+    for i, chunk_index in enumerate(chunk_indexes):
+        chunk_times = read_chunk_index_times(stream, chunk_index)
+        if chunk_times is None:
+            raise ValueError(f"Truncated message index at offset {chunk_index.chunk_start_offset}")
+
+        for channel_id, values in chunk_times.items():
+            times_parts.append(values)
+            channel_parts.append(np.full(len(values), channel_id, dtype=np.uint16))
+            buffered += len(values)
+        if buffered < batch_size and i + 1 < len(chunk_indexes):
+            continue
+
+        times = np.concatenate(times_parts)
+        channels = np.concatenate(channel_parts)
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        channels = channels[order]
+
+        if i + 1 < len(chunk_indexes):
+            cut = int(np.searchsorted(times, chunk_indexes[i + 1].message_start_time, side='left'))
+        else:
+            cut = len(times)
+        if cut:
+            yield times[:cut], channels[:cut]
+        times_parts = [times[cut:]]
+        channel_parts = [channels[cut:]]
+        buffered = len(times) - cut
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Vectorized forward kinematics for F1 (end-effector trajectory checks).
+
+A robot model is a serial chain of revolute joints in standard DH form
+(a, alpha, d, theta offset), plus optional fixed base / tool transforms.
+Loading a chain precomputes the constant part of every joint transform
+(translation along z and x, rotation about x); per sample only the
+rotation about z changes, so the poses of a whole episode are computed
+joint by joint as batched (N, 4, 4) matrix products.
+
+Models are either built in (``BUILTIN_MODELS``) or loaded from a JSON or
+YAML file (YAML needs PyYAML) with the same layout::
+
+    {"name": "my_arm",
+     "joints": [{"name": "joint1", "a": 0.0, "alpha": -1.5708, "d": 0.12, "offset": 0.0}, ...],
+     "base": [[...4x4...]], "tool": [[...4x4...]]}
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+# Nominal AIRBOT Play geometry (6 revolute arm joints, gripper excluded).
+# Link lengths follow the published arm dimensions; replace with calibrated
+# DH parameters through config.FK_MODEL when absolute poses matter. F1 only
+# looks at the continuity of the EE trajectory, which does not depend on
+# small geometry errors.
+BUILTIN_MODELS: Dict[str, Dict[str, Any]] = {
+    "airbot_play": {
+        "name": "airbot_play",
+        "joints": [
+            {"name": "shoulder_pan", "a": 0.0, "alpha": -math.pi / 2, "d": 0.1172, "offset": 0.0},
+            {"name": "shoulder_lift", "a": 0.27009, "alpha": 0.0, "d": 0.0, "offset": -2.7549},
+            {"name": "elbow_flex", "a": 0.0, "alpha": math.pi / 2, "d": 0.0, "offset": 2.7549 - math.pi / 2},
+            {"name": "wrist_flex", "a": 0.0, "alpha": -math.pi / 2, "d": 0.29015, "offset": 0.0},
+            {"name": "wrist_roll", "a": 0.0, "alpha": math.pi / 2, "d": 0.0, "offset": 0.0},
+            {"name": "wrist_roll_2", "a": 0.0, "alpha": 0.0, "d": 0.0865, "offset": 0.0},
+        ],
+        "tool": [[1.0, 0.0, 0.0, 0.0],
+                 [0.0, 1.0, 0.0, 0.0],
+                 [0.0, 0.0, 1.0, 0.1],
+                 [0.0, 0.0, 0.0, 1.0]],
+    },
+}
+
+_CHAINS: Dict[str, 'KinematicChain'] = {}
+
+
+class KinematicChain:
+    """
+    Serial chain of revolute joints (standard DH convention).
+
+    Attributes:
+        name: Model name.
+        joint_names: Joint names in chain order.
+        constants: (n, 4, 4) constant part Tz(d) Tx(a) Rx(alpha) per joint.
+        offsets: (n,) joint angle offsets.
+        base, tool: Fixed 4x4 transforms before / after the chain.
+    """
+
+    def __init__(self, model: Dict[str, Any]):
+        joints = model["joints"]
+        if not joints:
+            raise ValueError(f"Kinematic model '{model.get('name')}' has no joints")
+        self.name = model.get("name", "robot")
+        self.joint_names = [joint.get("name", f"joint{i + 1}") for i, joint in enumerate(joints)]
+        self.offsets = np.array([float(joint.get("offset", 0.0)) for joint in joints])
+        self.constants = np.stack([_dh_constant(float(joint.get("a", 0.0)),
+                                                float(joint.get("alpha", 0.0)),
+                                                float(joint.get("d", 0.0)))
+                                   for joint in joints])
+        self.base = np.asarray(model.get("base", np.eye(4)), dtype=np.float64)
+        self.tool = np.asarray(model.get("tool", np.eye(4)), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.joint_names)
+
+    def forward(self, positions: np.ndarray) -> np.ndarray:
+        """
+        End-effector poses for a batch of joint configurations.
+
+        Args:
+            positions: (N, n) joint angles in chain order (extra columns,
+                e.g. gripper fingers, are ignored).
+
+        Returns:
+            (N, 4, 4) homogeneous EE poses in the base frame.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if positions.ndim != 2 or positions.shape[1] < len(self):
+            raise ValueError(f"Expected (N, >={len(self)}) joint positions, got {positions.shape}")
+        theta = positions[:, :len(self)] + self.offsets
+        cos, sin = np.cos(theta), np.sin(theta)
+
+        poses = np.broadcast_to(self.base, (len(positions), 4, 4)).copy()
+        for j, constant in enumerate(self.constants):
+            # Rz(theta) @ constant, only rows 0 and 1 depend on theta
+            c, s = cos[:, j, None], sin[:, j, None]
+            joint = np.empty_like(poses)
+            joint[:, 0] = c * constant[0] - s * constant[1]
+            joint[:, 1] = s * constant[0] + c * constant[1]
+            joint[:, 2] = constant[2]
+            joint[:, 3] = constant[3]
+            poses = poses @ joint
+        return poses @ self.tool
+
+
+def _dh_constant(a: float, alpha: float, d: float) -> np.ndarray:
+    """Tz(d) @ Tx(a) @ Rx(alpha)."""
+    ca, sa = math.cos(alpha), math.sin(alpha)
+    return np.array([
+        [1.0, 0.0, 0.0, a],
+        [0.0, ca, -sa, 0.0],
+        [0.0, sa, ca, d],
+        [0.0, 0.0, 0.0, 1.0],
+    ])
+
+
+def load_chain(model: str) -> KinematicChain:
+    """
+    Load a kinematic chain once and cache it.
+
+    Args:
+        model: Built-in model name (see BUILTIN_MODELS) or path to a
+            JSON / YAML model file.
+
+    Returns:
+        KinematicChain.
+    """
+    chain = _CHAINS.get(model)
+    if chain is not None:
+        return chain
+
+    if model in BUILTIN_MODELS:
+        data = BUILTIN_MODELS[model]
+    else:
+        path = Path(model)
+        if not path.exists():
+            raise ValueError(f"Unknown kinematic model: {model}")
+        text = path.read_text(encoding="utf-8")
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("PyYAML is required for YAML kinematic models")
+            data = yaml.safe_load(text)
+        else:
+            data = json.loads(text)
+
+    chain = KinematicChain(data)
+    _CHAINS[model] = chain
+    return chain
+
+
+def rotation_to_quaternion(rotations: np.ndarray) -> np.ndarray:
+    """
+    (N, 3, 3) rotation matrices to (N, 4) unit quaternions (w, x, y, z).
+
+    Each row uses the numerically stable branch (largest of |w|, |x|,
+    |y|, |z|); the result has w >= 0.
+    """
+    m = rotations
+    d0, d1, d2 = m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]
+    wx = m[:, 2, 1] - m[:, 1, 2]
+    wy = m[:, 0, 2] - m[:, 2, 0]
+    wz = m[:, 1, 0] - m[:, 0, 1]
+    xy = m[:, 0, 1] + m[:, 1, 0]
+    xz = m[:, 0, 2] + m[:, 2, 0]
+    yz = m[:, 1, 2] + m[:, 2, 1]
+    # Row b holds 4 * q_b * (w, x, y, z); the diagonal is 4 * q_b^2
+    terms = np.stack([
+        np.stack([1.0 + d0 + d1 + d2, wx, wy, wz], axis=1),
+        np.stack([wx, 1.0 + d0 - d1 - d2, xy, xz], axis=1),
+        np.stack([wy, xy, 1.0 - d0 + d1 - d2, yz], axis=1),
+        np.stack([wz, xz, yz, 1.0 - d0 - d1 + d2], axis=1),
+    ], axis=1)
+    rows = np.arange(len(m))
+    diagonal = np.einsum('nii->ni', terms)
+    branch = diagonal.argmax(axis=1)
+    q = terms[rows, branch] / (2.0 * np.sqrt(np.maximum(diagonal[rows, branch], 1e-12)))[:, None]
+    q[q[:, 0] < 0] *= -1.0
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def trajectory_steps(times: np.ndarray, poses: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-sample EE motion between consecutive poses.
+
+    Args:
+        times: (N,) log times (ns).
+        poses: (N, 4, 4) EE poses.
+
+    Returns:
+        Dict with ``translation`` (N-1,) step length in m, ``rotation``
+        (N-1,) rotation angle in rad between consecutive quaternions,
+        ``dt`` (N-1,) in s and ``quaternions`` (N, 4).
+    """
+    quaternions = rotation_to_quaternion(poses[:, :3, :3])
+    translation = np.linalg.norm(np.diff(poses[:, :3, 3], axis=0), axis=1)
+    # q and -q are the same rotation: compare with |dot|
+    dots = np.abs(np.einsum('ij,ij->i', quaternions[1:], quaternions[:-1]))
+    rotation = 2.0 * np.arccos(np.clip(dots, 0.0, 1.0))
+    return {
+        'translation': translation,
+        'rotation': rotation,
+        'dt': np.diff(times) * 1e-9,
+        'quaternions': quaternions,
+    }
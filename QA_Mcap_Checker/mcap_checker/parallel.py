@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Intra-file chunk-parallel checking.
+
+MCAP chunks are compressed independently, so a large episode can be split
+into contiguous chunk ranges handled by separate processes. Each worker
+decompresses its range and returns partial reductions:
+
+- per channel: message count, min / max / first / last timestamp and the
+  first null timestamp or rollback inside the range;
+- the E1/E2 joint analysis (values.joint_analysis_stats): counts, maxima
+  and the first / last two joint rows of every joint_states topic.
+
+Partials are merged left to right. Fix-ups at range edges compare the
+last timestamp of each channel with its first timestamp in the next
+range (monotonicity), and the last joint rows of each topic with its
+first rows in the next range (E2 jumps and spikes), so the merged result
+equals a sequential scan.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chunks import iter_chunk_messages, plan_chunk_ranges, read_chunk
+from .decoder import JointStateBatch, decode_joint_state_batch
+from .rules.values import JOINT_DECODE_BATCH, empty_joint_stats, joint_analysis_stats, merge_joint_stats
+from .timestore import TimestampStore
+
+
+class RangePartial:
+    """Partial reductions of one contiguous chunk range."""
+
+    __slots__ = ('messages', 'channels', 'b1_failure', 'channel_times', 'joint_stats')
+
+    def __init__(self):
+        self.messages = 0
+        # channel_id -> dict(count, min, max, first, first_ordinal, last)
+        self.channels: Dict[int, Dict[str, int]] = {}
+        # (ordinal, kind, channel_id, log_time) of the first B1 failure
+        self.b1_failure: Optional[Tuple[int, str, int, int]] = None
+        # channel_id -> int64 log times in file order (for the B2/C/D/F rules)
+        self.channel_times: Dict[int, np.ndarray] = {}
+        self.joint_stats: Dict[str, Any] = {}
+
+
+def _reduce_timestamps(partial: RangePartial, channel_ids: np.ndarray,
+                       log_times: np.ndarray, keep_times: bool) -> None:
+    """Per-channel timestamp partials of one range (vectorized)."""
+    failures = []
+    nulls = np.flatnonzero(log_times == 0)
+    if len(nulls):
+        failures.append((int(nulls[0]), 'null', int(channel_ids[nulls[0]]), 0))
+
+    # Visit channels in order of first appearance, like the sequential scan
+    unique_ids, first_seen = np.unique(channel_ids, return_index=True)
+    for channel_id in unique_ids[np.argsort(first_seen)]:
+        ordinals = np.flatnonzero(channel_ids == channel_id)
+        times = log_times[ordinals]
+        valid = times != 0
+        ordinals, times = ordinals[valid], times[valid]
+        if len(times) == 0:
+            continue
+
+        rollback = np.flatnonzero(np.diff(times) < 0)
+        if len(rollback):
+            i = rollback[0] + 1
+            failures.append((int(ordinals[i]), 'rollback', int(channel_id), int(times[i])))
+
+        partial.channels[int(channel_id)] = {
+            'count': len(times),
+            'min': int(times.min()),
+            'max': int(times.max()),
+            'first': int(times[0]),
+            'first_ordinal': int(ordinals[0]),
+            'last': int(times[-1]),
+        }
+        if keep_times:
+            partial.channel_times[int(channel_id)] = times
+
+    if failures:
+        partial.b1_failure = min(failures)
+
+
+def reduce_chunk_range(path: str, chunk_offsets: List[int], joint_channels: Dict[int, bool],
+                       channel_topics: Dict[int, str], keep_times: bool = True) -> RangePartial:
+    """
+    Worker: decompress a chunk range and compute its partials.
+
+    Args:
+        path: MCAP file path.
+        chunk_offsets: Chunk record offsets of the range, in file order.
+        joint_channels: channel_id -> True if the channel carries
+            JointState messages (False: joint_states topic with another
+            schema, counted as a decode error). Other channels are absent.
+        channel_topics: channel_id -> topic of the joint_channels.
+        keep_times: Return the per-channel timestamp arrays.
+
+    Returns:
+        RangePartial of the range.
+    """
+    partial = RangePartial()
+    channel_ids = []
+    log_times = []
+    pending: List[bytes] = []
+    pending_rows: List[Tuple[int, int]] = []
+    batches: List[JointStateBatch] = []
+    row_times: List[np.ndarray] = []
+    row_channels: List[np.ndarray] = []
+    decode_errors = 0
+    
+    def flush():
+        nonlocal decode_errors, pending, pending_rows
+        if pending:
+            batch = decode_joint_state_batch(pending)
+            decode_errors += len(pending) - int(batch.valid.sum())
+            batches.append(batch)
+            rows = np.array(pending_rows, dtype=np.int64).reshape(-1, 2)[batch.valid]
+            row_channels.append(rows[:, 0])
+            row_times.append(rows[:, 1])
+            pending = []
+            pending_rows = []
+
+    with open(path, "rb") as f:
+        for offset in chunk_offsets:
+            data = read_chunk(f, offset)
+            for channel_id, _, log_time, _, start, stop in iter_chunk_messages(data):
+                channel_ids.append(channel_id)
+                log_times.append(log_time)
+
+                is_joint_state = joint_channels.get(channel_id)
+                if is_joint_state is None:
+                    continue
+                if not is_joint_state:
+                    decode_errors += 1
+                    continue
+                pending.append(data[start:stop])
+                pending_rows.append((channel_id, log_time))
+                if len(pending) >= JOINT_DECODE_BATCH:
+                    flush()
+    flush()
+
+    partial.messages = len(log_times)
+    _reduce_timestamps(partial, np.array(channel_ids, dtype=np.int64),
+                       np.array(log_times, dtype=np.int64), keep_times)
+
+    def cat(arrays: List[np.ndarray]) -> np.ndarray:
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int64)
+    
+    partial.joint_stats = joint_analysis_stats(JointStateBatch.concatenate(batches), cat(row_times),
+                                               cat(row_channels), channel_topics, decode_errors)
+    return partial
+
+
+class MergedScan:
+    """Result of merging the range partials of one file."""
+
+    def __init__(self):
+        self.messages = 0
+        self.b1_failure: Optional[Tuple[str, str]] = None
+        self.channel_stats: Dict[int, Dict[str, int]] = {}
+        self.channel_times: Dict[int, List[np.ndarray]] = {}
+        self.joint_stats: Dict[str, Any] = {}
+
+    def topic_ts(self, channels: Dict[int, Any]) -> TimestampStore:
+        """Per-topic timestamp store (same layout as the B1 scan)."""
+        by_topic: Dict[str, List[np.ndarray]] = {}
+        for channel_id, parts in self.channel_times.items():
+            by_topic.setdefault(channels[channel_id].topic, []).extend(parts)
+
+        channels_per_topic: Dict[str, int] = {}
+        for channel_id in self.channel_times:
+            topic = channels[channel_id].topic
+            channels_per_topic[topic] = channels_per_topic.get(topic, 0) + 1
+
+        store = TimestampStore()
+        for topic, parts in by_topic.items():
+            values = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            # A topic fed by several channels is put in log-time order
+            if channels_per_topic[topic] > 1:
+                values = np.sort(values)
+            store.put_array(topic, values)
+        return store
+
+
+def merge_partials(partials: List[RangePartial], channels: Dict[int, Any]) -> MergedScan:
+    """
+    Merge range partials in file order, with fix-ups at range edges.
+
+    Args:
+        partials: RangePartial per chunk range, in file order.
+        channels: Summary channels (for topic names).
+
+    Returns:
+        MergedScan.
+    """
+    merged = MergedScan()
+    joint_stats = empty_joint_stats()
+    b1_failed = False
+
+    for partial in partials:
+        merged.messages += partial.messages
+
+        # B1: earliest failure inside the range or at its left edge
+        if not b1_failed:
+            failures = [partial.b1_failure] if partial.b1_failure else []
+            for channel_id, stats in partial.channels.items():
+                previous = merged.channel_stats.get(channel_id)
+                if previous is not None and stats['first'] < previous['last']:
+                    failures.append((stats['first_ordinal'], 'rollback', channel_id, stats['first']))
+            if failures:
+                _, kind, channel_id, log_time = min(failures)
+                topic = channels[channel_id].topic
+                if kind == 'null':
+                    merged.b1_failure = ("B1: Null timestamp", f"{topic}")
+                else:
+                    merged.b1_failure = ("B1: Timestamp rollback", f"{topic} at {log_time}")
+                merged.channel_times = {}
+                b1_failed = True
+
+        for channel_id, stats in partial.channels.items():
+            previous = merged.channel_stats.get(channel_id)
+            if previous is None:
+                merged.channel_stats[channel_id] = dict(stats)
+            else:
+                previous['count'] += stats['count']
+                previous['min'] = min(previous['min'], stats['min'])
+                previous['max'] = max(previous['max'], stats['max'])
+                previous['last'] = stats['last']
+        if not b1_failed:
+            for channel_id, times in partial.channel_times.items():
+                merged.channel_times.setdefault(channel_id, []).append(times)
+
+        # E1/E2: additive counts and maxima, plus the steps across the left edge
+        merge_joint_stats(joint_stats, partial.joint_stats)
+    
+    merged.joint_stats = joint_stats
+    return merged
+
+
+def scan_chunks_parallel(path: str, summary: Any, workers: int,
+                         keep_times: bool = True, ranges_per_worker: int = 2) -> Optional[MergedScan]:
+    """
+    Run the B1 / E1 / E2 reductions over chunk ranges in worker processes.
+
+    Args:
+        path: MCAP file path.
+        summary: Summary from ``reader.get_summary()``.
+        workers: Number of worker processes.
+        keep_times: Collect per-topic timestamps (not needed when B1
+            already ran from the message index).
+        ranges_per_worker: Ranges per worker, for load balancing.
+
+    Returns:
+        MergedScan, or None if the file has no chunk index.
+    """
+    joint_channels = {}
+    channel_topics = {}
+    for channel_id, channel in summary.channels.items():
+        if 'joint_states' in channel.topic.lower():
+            schema = summary.schemas.get(channel.schema_id)
+            joint_channels[channel_id] = 'jointstate' in getattr(schema, 'name', '').lower()
+            channel_topics[channel_id] = channel.topic
+
+    # Without timestamps to collect, chunks without joint messages are not needed
+    ranges = plan_chunk_ranges(summary, workers * ranges_per_worker,
+                               channel_ids=None if keep_times else set(joint_channels))
+    if not ranges:
+        return None
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        futures = [pool.submit(reduce_chunk_range, path, [offset for offset, _ in chunk_range],
+                               joint_channels, channel_topics, keep_times)
+                   for chunk_range in ranges]
+        partials = [future.result() for future in futures]
+
+    return merge_partials(partials, summary.channels)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Per-rule profiling for run_checks.
+
+The profiler charges resource usage to the active section. The report
+switches sections on every ``begin_rule``; run_checks adds an "open"
+section (reading the summary) and a "scan" section (the shared message
+pass). For each section it records:
+
+- wall and CPU time (this process only: chunk-parallel workers are not
+  included);
+- bytes read from the MCAP file (through ProfiledFile);
+- messages visited;
+- growth of the peak RSS.
+
+Visitors run inside the scan. scan_messages times each visitor's
+``visit`` calls and moves that time out of "scan" into the visitor's
+rule. A visitor's messages / bytes are the messages and payload bytes
+it consumed.
+"""
+
+import sys
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_FIELDS = ('wall_s', 'cpu_s', 'bytes_read', 'messages', 'peak_rss_delta_kb')
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process (KiB, 0 if unknown)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class RuleProfiler:
+    """Resource usage per rule group / section, in first-seen order."""
+
+    def __init__(self):
+        self.sections: Dict[str, Dict[str, float]] = {}
+        self.section: Optional[str] = None
+        self._start = None
+
+    def _entry(self, section: str) -> Dict[str, float]:
+        entry = self.sections.get(section)
+        if entry is None:
+            entry = self.sections[section] = dict.fromkeys(PROFILE_FIELDS, 0)
+        return entry
+
+    def switch(self, section: Optional[str]) -> None:
+        """Close the active section and start ``section`` (None: untracked)."""
+        now = (time.perf_counter(), time.process_time(), peak_rss_kb())
+        if self.section is not None and self._start is not None:
+            entry = self._entry(self.section)
+            entry['wall_s'] += now[0] - self._start[0]
+            entry['cpu_s'] += now[1] - self._start[1]
+            entry['peak_rss_delta_kb'] += now[2] - self._start[2]
+        self.section = section
+        self._start = now
+
+    def add(self, section: str, **amounts: float) -> None:
+        """Charge extra usage (e.g. visitor time measured inside the scan)."""
+        entry = self._entry(section)
+        for field, amount in amounts.items():
+            entry[field] += amount
+
+    def count_bytes(self, size: int) -> None:
+        """Charge bytes read from the file to the active section."""
+        if self.section is not None:
+            self._entry(self.section)['bytes_read'] += size
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            section: {
+                'wall_s': round(entry['wall_s'], 6),
+                'cpu_s': round(entry['cpu_s'], 6),
+                'bytes_read': int(entry['bytes_read']),
+                'messages': int(entry['messages']),
+                'peak_rss_delta_kb': int(entry['peak_rss_delta_kb']),
+            }
+            for section, entry in self.sections.items()
+        }
+
+
+class ProfiledFile:
+    """Binary file wrapper that reports every read to a RuleProfiler."""
+
+    def __init__(self, f: Any, profiler: RuleProfiler):
+        self._f = f
+        self._profiler = profiler
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._profiler.count_bytes(len(data))
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        size = self._f.readinto(buffer)
+        self._profiler.count_bytes(size or 0)
+        return size
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._f, name)
+
+    def __enter__(self) -> 'ProfiledFile':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._f.close()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Declarative rule registry and scheduler.
+
+Every rule group is declared once in ``RULES``, with:
+
+- its cache version and the config names it depends on (result cache);
+- the rule groups it depends on: it is skipped when one of them failed
+  or was skipped (C needs the B1 timestamps, and so on);
+- the resources it consumes ("topic_ts", "joints", "images");
+- its phase: "summary" rules only read summary-section records and run
+  before any message is read; "scan" and "post" rules run around the
+  shared message scan;
+- the config switch that enables it, if any.
+
+run_checks drives a RuleScheduler over this table. The scheduler
+handles dependency skips and ``fail_fast``: after the first FAIL, every
+remaining rule is skipped, including the message scan if it has not
+started yet. Report items keep the registry order whatever the
+execution order.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import config
+
+SUMMARY, SCAN, POST = "summary", "scan", "post"
+
+
+class Rule:
+    """
+    One rule group.
+
+    Attributes:
+        name: Group name used in reports and the cache (e.g. "C").
+        version: Bump whenever the group's logic or report text changes.
+        config: Config names whose values affect its results.
+        depends: Groups whose failure (or skip) skips this one.
+        needs: Resources consumed: "topic_ts", "joints", "images".
+        phase: SUMMARY, SCAN (reads messages) or POST (after the scan).
+        switch: Config flag that must be true for the group to run.
+    """
+
+    __slots__ = ('name', 'version', 'config', 'depends', 'needs', 'phase', 'switch')
+
+    def __init__(self, name: str, version: int, config: Tuple[str, ...] = (),
+                 depends: Tuple[str, ...] = (), needs: Tuple[str, ...] = (),
+                 phase: str = POST, switch: Optional[str] = None):
+        self.name = name
+        self.version = version
+        self.config = config
+        self.depends = depends
+        self.needs = needs
+        self.phase = phase
+        self.switch = switch
+
+    def active(self) -> bool:
+        """Whether the group is switched on in the current config."""
+        return self.switch is None or bool(getattr(config, self.switch, False))
+
+
+# Report order
+RULES: List[Rule] = [
+    Rule("A", 1, ("REQUIRED_TOPICS", "MIN_CAMERA_COUNT"), phase=SUMMARY),
+    Rule("B1", 1, ("USE_MESSAGE_INDEX",), phase=SCAN),
+    Rule("B2", 1, (), depends=("B1",), needs=("topic_ts",)),
+    Rule("C", 1, ("MIN_JOINT_HZ", "MIN_CAMERA_FPS", "MAX_TIME_GAP_MS"),
+         depends=("B1",), needs=("topic_ts",)),
+    Rule("D", 1, ("MAX_SYNC_MS", "MAX_DESYNC_RATIO", "SYNC_HISTOGRAM_BINS_MS", "SYNC_WORST_FRAMES"),
+         depends=("B1",), needs=("topic_ts",)),
+    Rule("E1", 2, ("JOINT_POSITION_LIMITS",), needs=("joints",), phase=SCAN),
+    Rule("E2", 2, ("MAX_JOINT_JUMP", "MAX_JOINT_VELOCITY", "MAX_JOINT_ACCELERATION"),
+         needs=("joints",), phase=SCAN),
+    Rule("F", 2, ("MAX_TIMING_JITTER",), depends=("B1",), needs=("topic_ts",)),
+    Rule("F1-F2", 4, ("FK_MODEL", "MAX_EE_STEP_M", "MAX_EE_ROTATION_STEP_RAD", "EE_STEP_OUTLIER_RATIO",
+                      "VIBRATION_SEGMENT", "VIBRATION_HF_CUTOFF_HZ", "MAX_VIBRATION_ENERGY_RATIO",
+                      "VIBRATION_MIN_RMS", "VIBRATION_PEAK_RATIO"),
+         needs=("joints",), phase=SCAN, switch="ENABLE_ADVANCED_CHECKS"),
+    Rule("G", 4, ("VISION_SAMPLES_PER_TOPIC", "VISION_MAX_DIM", "VISION_BLACK_LEVEL", "VISION_WHITE_LEVEL",
+                  "VISION_FLAT_STD", "VISION_TEAR_RATIO", "VISION_TEAR_MIN_DIFF",
+                  "ILLUMINATION_THUMB_DIM", "ILLUMINATION_MAINS_HZ", "ILLUMINATION_FFT_SEGMENT",
+                  "ILLUMINATION_FLICKER_RATIO", "ILLUMINATION_FLICKER_MIN_AMPLITUDE", "ILLUMINATION_MAX_JUMP"),
+         needs=("images",), phase=SCAN, switch="ENABLE_VISION_CHECKS"),
+    Rule("I", 1, ("REQUIRED_METADATA_FIELDS",), phase=SUMMARY),
+]
+
+RULES_BY_NAME: Dict[str, Rule] = {rule.name: rule for rule in RULES}
+RULE_ORDER: List[str] = [rule.name for rule in RULES]
+
+
+def select_rules(names: Optional[Iterable[str]] = None) -> List[Rule]:
+    """Active rules (switches on), optionally limited to ``names``, in report order."""
+    names = None if names is None else set(names)
+    return [rule for rule in RULES if rule.active() and (names is None or rule.name in names)]
+
+
+class RuleScheduler:
+    """
+    Runs rule steps with dependency skips and fail-fast.
+
+    A rule can have several steps (e.g. preparing scan visitors, then
+    reporting after the scan); each ``run`` call executes one of them
+    with the report attributed to the rule.
+
+    Args:
+        report: CheckReport.
+        rules: Selected rules (see select_rules).
+        fail_fast: Skip everything after the first FAIL.
+    """
+
+    def __init__(self, report: Any, rules: List[Rule], fail_fast: bool = False):
+        self.report = report
+        self.selected = {rule.name for rule in rules}
+        self.fail_fast = fail_fast
+        self.started: set = set()
+        self.failed: set = set()
+        self.aborted = False
+
+    def wants(self, name: str) -> bool:
+        """Whether a rule is selected and not skipped so far."""
+        return self.blocker(name) is None
+
+    def blocker(self, name: str) -> Optional[str]:
+        """Reason why a rule cannot run, or None."""
+        if name not in self.selected:
+            return "not selected"
+        if name in self.report.skipped:
+            return self.report.skipped[name]
+        for dependency in RULES_BY_NAME[name].depends:
+            if dependency in self.failed:
+                return f"{dependency} failed"
+            if dependency in self.report.skipped:
+                return f"{dependency} skipped"
+        if self.aborted:
+            return "fail-fast"
+        return None
+
+    def run(self, name: str, step: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run one step of a rule, unless the rule is skipped.
+
+        Selected rules skipped before their first step are recorded in
+        ``report.skipped``. A FAIL item added by the step marks the rule
+        as failed (and aborts the run in fail-fast mode).
+        """
+        reason = self.blocker(name)
+        if reason is not None:
+            if reason != "not selected" and name not in self.started:
+                self.report.skip_rule(name, reason)
+            return None
+
+        self.started.add(name)
+        self.report.begin_rule(name)
+        failures = self.report.fail_count
+        result = step(*args)
+        if self.report.fail_count > failures:
+            self.failed.add(name)
+            if self.fail_fast:
+                self.aborted = True
+        return result
@@ -5,9 +5,11 @@ Corresponds to section J (automatic grading) in Instruction.md.
 """
 
 from enum import Enum
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, Optional, List, Tuple
 import json
 
+from .profiling import RuleProfiler
+
 
 class Level(Enum):
     """Check result level."""
@@ -24,22 +26,76 @@ class CheckReport:
         self.items: List[Tuple[str, str, Optional[str]]] = []
         self.hard_fail = False
         self.level = None
+        # Rule group that produced each item (parallel to ``items``)
+        self.rule: Optional[str] = None
+        self.item_rules: List[Optional[str]] = []
+        # Rule groups that did not run -> reason (e.g. "B1 failed")
+        self.skipped: Dict[str, str] = {}
+        self.fail_count = 0
+        # A1 failed: the file could not be read, no other rule ran
+        self.unreadable = False
+        # Per-rule resource usage (None unless profiling is enabled)
+        self.profiler: Optional[RuleProfiler] = None
+        # Chunks / bytes / messages each rule did not read (scan.pushdown_stats)
+        self.pushdown: Dict[str, Dict[str, int]] = {}
+    
+    def enable_profiling(self):
+        """Record wall / CPU time, bytes read, messages and peak RSS per rule."""
+        self.profiler = RuleProfiler()
+    
+    def profile_section(self, section: Optional[str]):
+        """Charge the following work to ``section`` (no effect on items)."""
+        if self.profiler is not None:
+            self.profiler.switch(section)
+    
+    def begin_rule(self, rule: Optional[str]):
+        """Attribute the following items to a rule group (e.g. "B1")."""
+        self.rule = rule
+        self.profile_section(rule)
     
     def ok(self, name: str, info: Optional[str] = None):
         """Add a passed item."""
         self.items.append(("PASS", name, info))
+        self.item_rules.append(self.rule)
     
     def warn(self, name: str, info: Optional[str] = None):
         """Add a warning item (Soft Fail)."""
         self.items.append(("WARN", name, info))
+        self.item_rules.append(self.rule)
     
     def fail(self, name: str, info: Optional[str] = None):
         """Add a failed item (Hard Fail)."""
         self.items.append(("FAIL", name, info))
+        self.item_rules.append(self.rule)
         self.hard_fail = True
+        self.fail_count += 1
+    
+    def skip_rule(self, rule: str, reason: str):
+        """Record that a rule group was skipped (the first reason is kept)."""
+        self.skipped.setdefault(rule, reason)
+    
+    def sort_items(self, order: Iterable[str]):
+        """
+        Stable-sort items by rule group, following ``order``.
+        
+        Untagged items stay behind the tagged item that preceded them.
+        Skipped groups are sorted the same way.
+        """
+        rank = {rule: i for i, rule in enumerate(order)}
+        self.skipped = dict(sorted(self.skipped.items(), key=lambda entry: rank.get(entry[0], len(rank))))
+        keys = []
+        current = -1
+        for rule in self.item_rules:
+            if rule is not None:
+                current = rank.get(rule, current)
+            keys.append(current)
+        permutation = sorted(range(len(self.items)), key=keys.__getitem__)
+        self.items = [self.items[i] for i in permutation]
+        self.item_rules = [self.item_rules[i] for i in permutation]
     
     def finalize(self):
         """Finalize the report and compute overall level."""
+        self.profile_section(None)
         if self.hard_fail:
             self.level = "FAIL"
         elif any(i[0] == "WARN" for i in self.items):
@@ -47,8 +103,8 @@ class CheckReport:
         else:
             self.level = "PASS"
     
-    def print_summary(self):
-        """Print a human-readable summary to stdout."""
+    def print_summary(self, profile: bool = False):
+        """Print a human-readable summary to stdout (``profile``: plus the per-rule profile)."""
         print(f"\n{'='*60}")
         print(f"MCAP CHECK RESULT: {self.level}")
         print(f"{'='*60}")
@@ -65,11 +121,37 @@ class CheckReport:
         print(f"Summary: {len([i for i in self.items if i[0] == 'PASS'])} passed, "
               f"{len([i for i in self.items if i[0] == 'WARN'])} warnings, "
               f"{len([i for i in self.items if i[0] == 'FAIL'])} failed")
+        if self.skipped:
+            print("Skipped: " + ", ".join(f"{rule} ({reason})" for rule, reason in self.skipped.items()))
         print(f"{'='*60}\n")
+        
+        if profile and self.profiler is not None:
+            self.print_profile()
+        if profile and self.pushdown:
+            self.print_pushdown()
+    
+    def print_profile(self):
+        """Print the per-rule profile as a table."""
+        print(f"{'Rule':<8} {'Wall s':>9} {'CPU s':>9} {'Read MiB':>9} {'Messages':>9} {'RSS +MiB':>9}")
+        for rule, entry in self.profiler.to_dict().items():
+            print(f"{rule:<8} {entry['wall_s']:>9.3f} {entry['cpu_s']:>9.3f} "
+                  f"{entry['bytes_read'] / 2**20:>9.1f} {entry['messages']:>9} "
+                  f"{entry['peak_rss_delta_kb'] / 1024:>9.1f}")
+        print()
+    
+    def print_pushdown(self):
+        """Print what each rule skipped thanks to topic pushdown."""
+        scan = self.pushdown.get("scan", {})
+        print(f"Topic pushdown ({scan.get('chunks', 0)} chunks in file)")
+        print(f"{'Rule':<8} {'Chunks':>9} {'Skip MiB':>9} {'Messages':>9}")
+        for rule, entry in self.pushdown.items():
+            print(f"{rule:<8} {entry['chunks_skipped']:>9} "
+                  f"{entry['bytes_skipped'] / 2**20:>9.1f} {entry['messages_skipped']:>9}")
+        print()
     
     def to_dict(self) -> dict:
         """Convert report to a dictionary (for JSON output)."""
-        return {
+        result = {
             "file": self.file,
             "level": self.level,
             "summary": {
@@ -86,6 +168,13 @@ class CheckReport:
                 for lvl, name, info in self.items
             ]
         }
+        if self.skipped:
+            result["skipped"] = dict(self.skipped)
+        if self.pushdown:
+            result["pushdown"] = self.pushdown
+        if self.profiler is not None:
+            result["profile"] = self.profiler.to_dict()
+        return result
     
     def to_json(self, indent: int = 2) -> str:
         """Export report as a JSON string."""
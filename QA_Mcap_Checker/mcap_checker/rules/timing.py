@@ -4,15 +4,89 @@ Category B/C/D rules: time, frequency and synchronization (Hard + Soft Fail).
 Corresponds to B1–B2, C1–C3 and D1–D2 checks in Instruction.md.
 """
 
-from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
 from ..config import (
     MIN_JOINT_HZ, MIN_CAMERA_FPS, MAX_TIME_GAP_MS,
-    MAX_SYNC_MS, MAX_DESYNC_RATIO
+    MAX_SYNC_MS, MAX_DESYNC_RATIO,
+    SYNC_HISTOGRAM_BINS_MS, SYNC_WORST_FRAMES, STREAMING_BATCH_EVENTS
 )
+from ..scan import MessageVisitor, run_visitor
+from ..index import (
+    has_message_index, iter_index_time_order, read_chunk_index_times, read_index_timestamps
+)
+from ..timestore import RunningTimestampStore, TimestampStore, as_column
+
+
+class TimestampVisitor(MessageVisitor):
+    """
+    B1: Timestamp validity check (streaming).
+    - timestamp is not null.
+    - Monotonically increasing within each topic.
+    - No rollback / wrap.
+
+    After the scan, ``topic_ts`` is a TimestampStore with the per-topic
+    timestamps for subsequent checks (empty if B1 failed).
+    """
+
+    error_label = "B1: Timestamp check error"
+    rule = "B1"
+
+    def __init__(self, report: Any):
+        super().__init__(report)
+        self.last_ts_per_channel = {}
+        self.append_per_channel = {}
+        self.channel_topics = {}
+        self.topic_ts = TimestampStore()
+        self.failure = None
+
+    def visit(self, schema: Any, channel: Any, message: Any) -> None:
+        ts = message.log_time
+        
+        # Check timestamp not null
+        if ts is None or ts == 0:
+            self.failure = ("B1: Null timestamp", f"{channel.topic}")
+            self.done = True
+            return
+        
+        # Check monotonicity
+        last_ts = self.last_ts_per_channel.get(channel.id)
+        if last_ts is not None and ts < last_ts:
+            self.failure = ("B1: Timestamp rollback", f"{channel.topic} at {ts}")
+            self.done = True
+            return
+        
+        self.last_ts_per_channel[channel.id] = ts
+        
+        append = self.append_per_channel.get(channel.id)
+        if append is None:
+            append = self.topic_ts.column(channel.topic).append
+            self.append_per_channel[channel.id] = append
+            self.channel_topics[channel.id] = channel.topic
+        append(ts)
 
+    def finalize(self) -> None:
+        if self.failure:
+            self.report.fail(*self.failure)
+            self.topic_ts = TimestampStore()
+            return
+        
+        # Messages arrive in file order; a topic fed by several channels
+        # is only monotonic per channel, so put it in log-time order.
+        channels_per_topic = {}
+        for channel_id in self.last_ts_per_channel:
+            topic = self.channel_topics[channel_id]
+            channels_per_topic[topic] = channels_per_topic.get(topic, 0) + 1
+        for topic, n_channels in channels_per_topic.items():
+            if n_channels > 1:
+                self.topic_ts.put_array(topic, np.sort(self.topic_ts[topic].values))
+        
+        self.report.ok("B1: Timestamps monotonic", "All timestamps valid and ordered")
 
-def check_timestamps(reader: Any, report: Any) -> Dict[str, List[int]]:
+
+def check_timestamps(reader: Any, report: Any) -> TimestampStore:
     """
     B1: Timestamp validity check.
     - timestamp is not null.
@@ -20,34 +94,167 @@ def check_timestamps(reader: Any, report: Any) -> Dict[str, List[int]]:
     - No rollback / wrap.
 
     Returns:
-        topic_ts dict for subsequent checks.
+        topic_ts store for subsequent checks.
     """
-    last_ts_per_channel = {}
-    topic_ts = defaultdict(list)
+    visitor = run_visitor(reader, TimestampVisitor(report))
+    return visitor.topic_ts if visitor.error is None else TimestampStore()
+
+
+def check_timestamps_indexed(stream: Any, summary: Any, report: Any) -> Optional[TimestampStore]:
+    """
+    B1: Timestamp validity check from the message index only.
+
+    Reads the Message Index records after each chunk instead of decoding
+    messages, so chunks (and image payloads) are never decompressed.
+    Same checks as check_timestamps, applied in recording order.
+
+    Args:
+        stream: Seekable binary stream of the MCAP file.
+        summary: Summary from ``reader.get_summary()``.
+        report: CheckReport instance.
+
+    Returns:
+        topic_ts store, or None if the file has no usable index (the
+        caller should fall back to check_timestamps). Nothing is reported
+        in that case.
+    """
+    channel_times = read_index_timestamps(stream, summary)
+    if channel_times is None:
+        return None
     
-    for _, channel, message in reader.iter_messages():
-        ts = message.log_time
+    channels = summary.channels
+    by_topic = {}
+    
+    for channel_id in sorted(channel_times):
+        times = channel_times[channel_id]
+        topic = channels[channel_id].topic
         
         # Check timestamp not null
-        if ts is None or ts == 0:
-            report.fail("B1: Null timestamp", f"{channel.topic}")
-            return {}
+        if np.any(times == 0):
+            report.fail("B1: Null timestamp", f"{topic}")
+            return TimestampStore()
         
         # Check monotonicity
-        if channel.id in last_ts_per_channel:
-            if ts < last_ts_per_channel[channel.id]:
-                report.fail("B1: Timestamp rollback", 
-                          f"{channel.topic} at {ts}")
-                return {}
+        rollback = np.flatnonzero(np.diff(times) < 0)
+        if len(rollback):
+            report.fail("B1: Timestamp rollback", 
+                      f"{topic} at {int(times[rollback[0] + 1])}")
+            return TimestampStore()
         
-        last_ts_per_channel[channel.id] = ts
-        topic_ts[channel.topic].append(ts)
+        by_topic.setdefault(topic, []).append(times)
     
-    report.ok("B1: Timestamps monotonic", "All timestamps valid and ordered")
+    topic_ts = TimestampStore()
+    for topic, arrays in by_topic.items():
+        if len(arrays) == 1:
+            values = arrays[0]
+        else:
+            # Several channels on one topic: merge in log-time order
+            values = np.sort(np.concatenate(arrays), kind='stable')
+        topic_ts.put_array(topic, values)
+    
+    report.ok("B1: Timestamps monotonic", "All timestamps valid and ordered (message index)")
     return topic_ts
 
 
-def check_episode_range(topic_ts: Dict[str, List[int]], summary: Any, report: Any) -> None:
+def check_timestamps_streaming(stream: Any, summary: Any, report: Any) -> Optional[RunningTimestampStore]:
+    """
+    B1: Timestamp validity check with bounded memory.
+
+    Two passes over the message index, one chunk at a time:
+
+    1. file order: the B1 checks, keeping the last timestamp per channel;
+    2. log-time order (see iter_index_time_order): per-topic running
+       statistics for B2/C/F, the D1 two-pointer sync and the D2 counter
+       (see OnlineSync).
+
+    Memory is O(channels + cameras), plus the index of the chunks that
+    overlap in time, instead of O(messages).
+
+    Args:
+        stream: Seekable binary stream of the MCAP file.
+        summary: Summary from ``reader.get_summary()``.
+        report: CheckReport instance.
+
+    Returns:
+        RunningTimestampStore (empty if B1 failed), or None if the file
+        has no usable index (nothing is reported in that case).
+    """
+    if not has_message_index(summary):
+        return None
+    
+    channels = summary.channels
+    last_ts = {}
+    counts = {}
+    chunk_indexes = sorted(summary.chunk_indexes, key=lambda ci: ci.chunk_start_offset)
+    buffered = {}
+    n_buffered = 0
+    for i, chunk_index in enumerate(chunk_indexes):
+        chunk_times = read_chunk_index_times(stream, chunk_index)
+        if chunk_times is None:
+            return None
+        for channel_id, times in chunk_times.items():
+            buffered.setdefault(channel_id, []).append(times)
+            n_buffered += len(times)
+        if n_buffered < STREAMING_BATCH_EVENTS and i + 1 < len(chunk_indexes):
+            continue
+        
+        for channel_id, parts in buffered.items():
+            topic = channels[channel_id].topic
+            times = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            
+            # Check timestamp not null
+            if np.any(times == 0):
+                report.fail("B1: Null timestamp", f"{topic}")
+                return RunningTimestampStore()
+            
+            # Check monotonicity (within the batch and against the last one)
+            previous = last_ts.get(channel_id)
+            if previous is not None and times[0] < previous:
+                report.fail("B1: Timestamp rollback", f"{topic} at {int(times[0])}")
+                return RunningTimestampStore()
+            rollback = np.flatnonzero(np.diff(times) < 0)
+            if len(rollback):
+                report.fail("B1: Timestamp rollback", 
+                          f"{topic} at {int(times[rollback[0] + 1])}")
+                return RunningTimestampStore()
+            
+            last_ts[channel_id] = int(times[-1])
+            counts[channel_id] = counts.get(channel_id, 0) + len(times)
+        buffered = {}
+        n_buffered = 0
+    
+    # The index must account for every message, otherwise it is not usable
+    statistics = summary.statistics
+    if statistics is not None and statistics.message_count:
+        if sum(counts.values()) != statistics.message_count:
+            return None
+    
+    # Topics in channel order, like check_timestamps_indexed
+    topic_ids = {}
+    topic_of_channel = np.zeros(max(counts, default=0) + 1, dtype=np.int64)
+    for channel_id in sorted(counts):
+        topic_of_channel[channel_id] = topic_ids.setdefault(channels[channel_id].topic, len(topic_ids))
+    topics = list(topic_ids)
+    topic_ts = RunningTimestampStore()
+    columns = [topic_ts.column(topic) for topic in topics]
+    sync = OnlineSync(topics)
+    
+    for times, channel_ids in iter_index_time_order(stream, summary, STREAMING_BATCH_EVENTS):
+        topic_ids = topic_of_channel[channel_ids]
+        order = np.argsort(topic_ids, kind='stable')
+        bounds = np.searchsorted(topic_ids[order], np.arange(len(topics) + 1))
+        for k in np.flatnonzero(np.diff(bounds)):
+            columns[k].add(times[order[bounds[k]:bounds[k + 1]]])
+        sync.add(times, topic_ids)
+    
+    topic_ts.camera_sync = sync.camera_stats()
+    topic_ts.future_actions = sync.future_actions
+    
+    report.ok("B1: Timestamps monotonic", "All timestamps valid and ordered (message index)")
+    return topic_ts
+
+
+def check_episode_range(topic_ts: TimestampStore, summary: Any, report: Any) -> None:
     """
     B2: Episode time range check.
     - episode_start < episode_end.
@@ -79,7 +286,7 @@ def check_episode_range(topic_ts: Dict[str, List[int]], summary: Any, report: An
         report.warn("B2: No episode metadata", "Skip episode range check")
 
 
-def check_frequencies(topic_ts: Dict[str, List[int]], report: Any) -> None:
+def check_frequencies(topic_ts: TimestampStore, report: Any) -> None:
     """
     C1–C3: Frequency and coverage checks.
     - C1: Joint state frequency ≥ 45 Hz.
@@ -87,16 +294,15 @@ def check_frequencies(topic_ts: Dict[str, List[int]], report: Any) -> None:
     - C3: Action frequency check.
     """
     for topic, ts in topic_ts.items():
+        ts = as_column(ts)
         if len(ts) < 2:
             continue
         
         # Compute frequency
-        duration_sec = (ts[-1] - ts[0]) * 1e-9
-        if duration_sec == 0:
+        rate = ts.rate()
+        if rate == 0:
             continue
         
-        rate = len(ts) / duration_sec
-        
         # C1: Joint states frequency check
         if "joint_states" in topic:
             if rate < MIN_JOINT_HZ:
@@ -123,7 +329,7 @@ def check_frequencies(topic_ts: Dict[str, List[int]], report: Any) -> None:
                          f"{topic}: {rate:.1f} Hz, {len(ts)} messages")
 
 
-def check_gaps(topic_ts: Dict[str, List[int]], report: Any) -> None:
+def check_gaps(topic_ts: TimestampStore, report: Any) -> None:
     """
     C1: Drop-frame detection (time gap check).
     - No long gaps (> 200 ms).
@@ -139,9 +345,8 @@ def check_gaps(topic_ts: Dict[str, List[int]], report: Any) -> None:
         if not ('joint_states' in topic.lower() or 'image' in topic.lower()):
             continue
         
-        # Compute time gaps (convert to ms)
-        gaps = [(ts[i+1] - ts[i]) * 1e-6 for i in range(len(ts) - 1)]
-        max_gap = max(gaps)
+        # Largest time gap (convert to ms)
+        max_gap = as_column(ts).max_gap_ns() * 1e-6
         
         if max_gap > MAX_TIME_GAP_MS:
             gap_issues.append(f"{topic}: {max_gap:.1f} ms")
@@ -153,85 +358,295 @@ def check_gaps(topic_ts: Dict[str, List[int]], report: Any) -> None:
         report.ok("C1: No large gaps in key topics", f"All gaps < {MAX_TIME_GAP_MS} ms")
 
 
-def check_sync(topic_ts: Dict[str, List[int]], report: Any) -> None:
+def nearest_offsets_ns(ref_ts: np.ndarray, query_ts: np.ndarray) -> np.ndarray:
+    """
+    Absolute distance from each query timestamp to its nearest reference
+    timestamp, in ns.
+
+    Uses a binary search over the sorted reference array, so the cost is
+    O(N log M) instead of O(N × M).
+
+    Args:
+        ref_ts: Sorted int64 reference timestamps (M,), M >= 1.
+        query_ts: int64 query timestamps (N,).
+
+    Returns:
+        int64 array (N,) of |Δt| in ns.
+    """
+    idx = np.searchsorted(ref_ts, query_ts)
+    right = ref_ts[np.minimum(idx, len(ref_ts) - 1)]
+    left = ref_ts[np.maximum(idx - 1, 0)]
+    return np.minimum(np.abs(right - query_ts), np.abs(query_ts - left))
+
+
+def sync_stats(joint_ts: np.ndarray, cam_ts: np.ndarray) -> Dict[str, Any]:
+    """
+    Camera ↔ joint sync statistics for one camera.
+
+    Args:
+        joint_ts: Sorted int64 joint_states timestamps.
+        cam_ts: int64 camera frame timestamps (frame order).
+
+    Returns:
+        Dict with frame/desync counts, desync ratio, max error, a |Δt|
+        histogram over SYNC_HISTOGRAM_BINS_MS and the worst frames as
+        (frame_index, dt_ms) pairs.
+    """
+    dt_ms = nearest_offsets_ns(joint_ts, cam_ts) * 1e-6
+    desync_count = int(np.count_nonzero(dt_ms > MAX_SYNC_MS))
+    
+    counts, _ = np.histogram(dt_ms, bins=SYNC_HISTOGRAM_BINS_MS)
+    
+    # Worst offenders, largest error first
+    n_worst = min(SYNC_WORST_FRAMES, len(dt_ms))
+    worst = np.argpartition(dt_ms, len(dt_ms) - n_worst)[len(dt_ms) - n_worst:]
+    worst = worst[np.argsort(dt_ms[worst])[::-1]]
+    
+    return {
+        'frames': len(dt_ms),
+        'desync_count': desync_count,
+        'desync_ratio': desync_count / len(dt_ms),
+        'max_ms': float(dt_ms.max()),
+        'histogram': {
+            'bins_ms': list(SYNC_HISTOGRAM_BINS_MS),
+            'counts': counts.tolist(),
+        },
+        'worst_frames': [(int(i), float(dt_ms[i])) for i in worst],
+    }
+
+
+class _CameraSyncStats:
+    """Running D1 statistics of one camera (same result as sync_stats)."""
+
+    def __init__(self):
+        self.frames = 0
+        self.desync_count = 0
+        self.max_ms = 0.0
+        self.counts = np.zeros(len(SYNC_HISTOGRAM_BINS_MS) - 1, dtype=np.int64)
+        self.worst_index = np.empty(0, dtype=np.int64)
+        self.worst_ms = np.empty(0, dtype=np.float64)
+
+    def add(self, frame_index: np.ndarray, dt_ms: np.ndarray) -> None:
+        if len(dt_ms) == 0:
+            return
+        self.frames += len(dt_ms)
+        self.desync_count += int(np.count_nonzero(dt_ms > MAX_SYNC_MS))
+        self.max_ms = max(self.max_ms, float(dt_ms.max()))
+        self.counts += np.histogram(dt_ms, bins=SYNC_HISTOGRAM_BINS_MS)[0]
+        
+        # Keep the worst frames seen so far, largest error first
+        index = np.concatenate([self.worst_index, frame_index])
+        dt = np.concatenate([self.worst_ms, dt_ms])
+        keep = np.argsort(dt, kind='stable')[::-1][:SYNC_WORST_FRAMES]
+        self.worst_index = index[keep]
+        self.worst_ms = dt[keep]
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'frames': self.frames,
+            'desync_count': self.desync_count,
+            'desync_ratio': self.desync_count / self.frames if self.frames else 0.0,
+            'max_ms': self.max_ms,
+            'histogram': {
+                'bins_ms': list(SYNC_HISTOGRAM_BINS_MS),
+                'counts': self.counts.tolist(),
+            },
+            'worst_frames': [(int(i), float(dt)) for i, dt in zip(self.worst_index, self.worst_ms)],
+        }
+
+
+class OnlineSync:
+    """
+    D1/D2 statistics over a log-time ordered stream (two-pointer merge).
+
+    A camera frame is matched against the joint_states message right
+    before it and the one right after it, which is the nearest joint
+    message overall. Frames whose next joint message has not arrived yet
+    wait in a small buffer until it does. D2 counts the actions newer
+    than the latest joint message.
+
+    Args:
+        topics: Topic names; ``add`` receives indices into this list.
+    """
+
+    def __init__(self, topics: List[str]):
+        self.cameras = [topic for topic in topics if "image" in topic]
+        camera_ids = {topic: i for i, topic in enumerate(self.cameras)}
+        self.is_joint = np.array([('joint_states' in t.lower()) for t in topics] + [False])
+        self.is_action = np.array([("action" in t or "command" in t) for t in topics] + [False])
+        self.camera_of = np.array([camera_ids.get(t, -1) for t in topics] + [-1], dtype=np.int64)
+        self.stats = [_CameraSyncStats() for _ in self.cameras]
+        self.frame_counts = np.zeros(len(self.cameras), dtype=np.int64)
+        self.last_joint: Optional[int] = None
+        self.future_actions = 0
+        # Frames waiting for their next joint message
+        self.pending = None
+
+    def add(self, times: np.ndarray, topic_ids: np.ndarray) -> None:
+        """Add a batch of (log time, topic index) events, sorted by time."""
+        joint_pos = np.flatnonzero(self.is_joint[topic_ids])
+        joint_ts = times[joint_pos]
+        
+        # D2: actions after the latest joint message
+        action_ts = times[self.is_action[topic_ids]]
+        if len(joint_pos):
+            self.future_actions = int(np.count_nonzero(action_ts > joint_ts[-1]))
+        elif self.last_joint is None:
+            self.future_actions += len(action_ts)
+        else:
+            self.future_actions += int(np.count_nonzero(action_ts > self.last_joint))
+        
+        if self.pending is not None and len(joint_pos):
+            self._resolve(joint_ts[0])
+        
+        camera_pos = np.flatnonzero(self.camera_of[topic_ids] >= 0)
+        if len(camera_pos):
+            cam = self.camera_of[topic_ids[camera_pos]]
+            cam_ts = times[camera_pos]
+            
+            # Frame number within its camera
+            frame_index = np.empty(len(cam), dtype=np.int64)
+            for c in np.unique(cam):
+                mask = cam == c
+                n = int(np.count_nonzero(mask))
+                frame_index[mask] = self.frame_counts[c] + np.arange(n)
+                self.frame_counts[c] += n
+            
+            # Joint messages before each frame in this batch
+            before = np.searchsorted(joint_pos, camera_pos)
+            prev_ts = joint_ts[np.maximum(before - 1, 0)] if len(joint_ts) else np.zeros(len(cam_ts), np.int64)
+            prev_dt = (cam_ts - prev_ts).astype(np.float64)
+            no_prev = before == 0
+            if self.last_joint is None:
+                prev_dt[no_prev] = np.inf
+            else:
+                prev_dt[no_prev] = (cam_ts[no_prev] - self.last_joint).astype(np.float64)
+            
+            has_next = before < len(joint_pos)
+            next_dt = np.full(len(cam_ts), np.inf)
+            next_dt[has_next] = joint_ts[before[has_next]] - cam_ts[has_next]
+            
+            self._record(cam[has_next], frame_index[has_next],
+                         np.minimum(prev_dt[has_next], next_dt[has_next]))
+            waiting = ~has_next
+            if np.any(waiting):
+                pending = (cam[waiting], frame_index[waiting], cam_ts[waiting], prev_dt[waiting])
+                if self.pending is not None:
+                    pending = tuple(np.concatenate(pair) for pair in zip(self.pending, pending))
+                self.pending = pending
+        
+        if len(joint_pos):
+            self.last_joint = int(joint_ts[-1])
+
+    def _resolve(self, next_joint: int) -> None:
+        cam, frame_index, cam_ts, prev_dt = self.pending
+        self.pending = None
+        self._record(cam, frame_index, np.minimum(prev_dt, (next_joint - cam_ts).astype(np.float64)))
+
+    def _record(self, cam: np.ndarray, frame_index: np.ndarray, dt_ns: np.ndarray) -> None:
+        dt_ms = dt_ns * 1e-6
+        for c in np.unique(cam):
+            mask = cam == c
+            self.stats[c].add(frame_index[mask], dt_ms[mask])
+
+    def camera_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-camera sync statistics (see sync_stats), keyed by topic."""
+        if self.pending is not None:
+            # No joint message after these frames
+            cam, frame_index, _, prev_dt = self.pending
+            self.pending = None
+            self._record(cam, frame_index, prev_dt)
+        return {topic: stats.result() for topic, stats in zip(self.cameras, self.stats)
+                if stats.frames}
+
+
+def check_sync(topic_ts: TimestampStore, report: Any) -> Dict[str, Dict[str, Any]]:
     """
     D1: Camera ↔ joint synchronization check.
     - Every image frame should match a nearest joint_state.
     - |Δt| ≤ 34 ms.
+
+    Returns:
+        Per-camera sync statistics (see sync_stats), keyed by topic.
     """
-    # Collect all joint_states timestamps
-    joint_ts = []
-    for topic, ts in topic_ts.items():
-        if 'joint_states' in topic.lower():
-            joint_ts.extend(ts)
+    # Collect joint_states topics
+    joint_topics = [topic for topic, ts in topic_ts.items()
+                    if 'joint_states' in topic.lower() and len(ts)]
     
-    if not joint_ts:
+    if not joint_topics:
         report.warn("D1: Skip sync check", "No joint_states topics found")
-        return
+        return {}
     
-    # Collect all camera timestamps
-    cam_ts = []
-    camera_topics = [t for t in topic_ts.keys() if "image" in t]
-    for topic in camera_topics:
-        cam_ts.extend(topic_ts[topic])
+    # Collect camera topics
+    camera_topics = [t for t in topic_ts.keys() if "image" in t and len(topic_ts[t])]
     
-    if not cam_ts:
+    if not camera_topics:
         report.warn("D1: Skip sync check", "No camera topics")
-        return
-    
-    # Sort timestamps
-    joint_ts = sorted(joint_ts)
-    cam_ts = sorted(cam_ts)
+        return {}
     
-    # Check synchronization
-    desync_count = 0
-    for img_t in cam_ts:
-        # Find nearest joint_state timestamp
-        nearest_joint_t = min(joint_ts, key=lambda x: abs(x - img_t))
-        dt_ms = abs(nearest_joint_t - img_t) * 1e-6
+    if isinstance(topic_ts, RunningTimestampStore):
+        # Matched during the streaming pass
+        per_camera = {topic: topic_ts.camera_sync[topic] for topic in camera_topics}
+    else:
+        joint_ts = np.sort(np.concatenate([np.asarray(topic_ts[topic], dtype=np.int64)
+                                           for topic in joint_topics]))
         
-        if dt_ms > MAX_SYNC_MS:
-            desync_count += 1
+        # Nearest-neighbour match per camera
+        per_camera = {}
+        for topic in camera_topics:
+            cam_ts = np.asarray(topic_ts[topic], dtype=np.int64)
+            per_camera[topic] = sync_stats(joint_ts, cam_ts)
     
-    desync_ratio = desync_count / len(cam_ts)
+    total_frames = sum(s['frames'] for s in per_camera.values())
+    desync_count = sum(s['desync_count'] for s in per_camera.values())
+    desync_ratio = desync_count / total_frames
     
     if desync_ratio > MAX_DESYNC_RATIO:
         report.warn("D1: Camera-joint desync", 
                    f"{desync_ratio*100:.1f}% frames > {MAX_SYNC_MS} ms")
+        
+        # Point at the cameras (and frames) responsible
+        for topic, stats in per_camera.items():
+            if stats['desync_ratio'] <= MAX_DESYNC_RATIO:
+                continue
+            worst = ", ".join(f"#{i} ({dt:.1f} ms)" for i, dt in stats['worst_frames'][:3])
+            report.warn("D1: Camera desync detail", 
+                       f"{topic}: {stats['desync_ratio']*100:.1f}% frames > {MAX_SYNC_MS} ms, "
+                       f"worst frames {worst}")
     else:
         report.ok("D1: Camera-joint sync OK", 
                  f"{(1-desync_ratio)*100:.1f}% frames within {MAX_SYNC_MS} ms")
+    
+    return per_camera
 
 
-def check_action_alignment(topic_ts: Dict[str, List[int]], report: Any) -> None:
+def check_action_alignment(topic_ts: TimestampStore, report: Any) -> None:
     """
     D2: Action ↔ state alignment check.
     - Action time ≤ state time (no future information).
     - States can respond to actions (non-static).
     """
-    # Collect all joint_states timestamps
-    joint_ts = []
-    for topic, ts in topic_ts.items():
-        if 'joint_states' in topic.lower():
-            joint_ts.extend(ts)
+    # Collect joint_states and action/command timestamps
+    joint_columns = [as_column(ts) for topic, ts in topic_ts.items()
+                     if 'joint_states' in topic.lower() and len(ts)]
+    action_columns = [as_column(ts) for topic, ts in topic_ts.items()
+                      if ("action" in topic or "command" in topic) and len(ts)]
     
-    # Collect action/command timestamps
-    action_ts = []
-    for topic, ts in topic_ts.items():
-        if "action" in topic or "command" in topic:
-            action_ts.extend(ts)
-    
-    if not action_ts or not joint_ts:
+    if not action_columns or not joint_columns:
         report.warn("D2: Skip action alignment", "Missing action or joint_states")
         return
     
-    action_ts = sorted(action_ts)
-    joint_ts = sorted(joint_ts)
+    action_total = sum(len(c) for c in action_columns)
     
     # Check if there are actions after the last joint state (future information)
-    future_actions = sum(1 for at in action_ts if at > joint_ts[-1])
+    if isinstance(topic_ts, RunningTimestampStore):
+        future_actions = topic_ts.future_actions
+    else:
+        last_joint_ts = max(int(np.max(c.values)) for c in joint_columns)
+        future_actions = sum(int(np.count_nonzero(c.values > last_joint_ts))
+                             for c in action_columns)
     
-    if future_actions > len(action_ts) * 0.1:  # more than 10% of actions are in the future
+    if future_actions > action_total * 0.1:  # more than 10% of actions are in the future
         report.warn("D2: Action-state misalignment", 
                    f"{future_actions} actions after last joint state")
     else:
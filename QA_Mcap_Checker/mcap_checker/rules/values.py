@@ -4,178 +4,490 @@ Category E/F rules: numerical validity and trajectory stability (Hard + Soft Fai
 Corresponds to E1–E2 and F1–F2 checks in Instruction.md.
 """
 
-import math
-import statistics
-from typing import Dict, List, Any
-from ..config import MAX_JOINT_JUMP, MAX_TIMING_JITTER
-from ..decoder import decode_mcap_message
+from typing import Dict, List, Any, Tuple
 
+import numpy as np
 
-def check_joint_states(reader: Any, report: Any, schemas: Dict = None) -> None:
+from ..config import (
+    MAX_JOINT_JUMP, MAX_JOINT_VELOCITY, MAX_JOINT_ACCELERATION, JOINT_POSITION_LIMITS, MAX_TIMING_JITTER,
+    FK_MODEL, MAX_EE_STEP_M, MAX_EE_ROTATION_STEP_RAD, EE_STEP_OUTLIER_RATIO,
+    VIBRATION_SEGMENT, VIBRATION_HF_CUTOFF_HZ, MAX_VIBRATION_ENERGY_RATIO,
+    VIBRATION_MIN_RMS, VIBRATION_PEAK_RATIO
+)
+from ..decoder import JointStateBatch, decode_joint_state_batch
+from ..kinematics import load_chain, trajectory_steps
+from ..scan import MessageVisitor, run_visitor
+from ..timestore import TimestampStore, as_column
+
+
+# Number of joint_states payloads decoded per batch
+JOINT_DECODE_BATCH = 4096
+
+# Floor for the log-time step used in E2 derivatives, so two messages
+# logged back to back do not read as a speed spike (s)
+_MIN_DERIVATIVE_DT = 1e-3
+
+
+class JointBatchVisitor(MessageVisitor):
     """
-    E1: Joint numerical validity check (Hard Fail).
-    - position is not NaN / Inf.
-    - velocity is not NaN.
-    - Joint count is constant.
+    Base visitor for whole-episode joint checks.
+
+    Collects joint_states payloads and decodes them in batches into
+    stacked (N, dof) arrays, so the rule itself runs vectorized in
+    ``finalize`` on ``self.joints``. The log time and topic of every
+    decoded row are kept too (``log_times``, ``row_channels``), so later
+    rules (F1, F2) can reuse the decoded arrays per topic.
     """
-    joint_count = None
-    nan_count = 0
-    inf_count = 0
-    message_count = 0
-    decode_error_count = 0
+
+    rule = "F1-F2"
     
-    for _, channel, message in reader.iter_messages():
-        if 'joint_states' not in channel.topic.lower():
-            continue
+    def __init__(self, report: Any, schemas: Dict = None):
+        super().__init__(report)
+        self.schemas = schemas
+        self.pending: List[bytes] = []
+        self.pending_times: List[int] = []
+        self.pending_channels: List[int] = []
+        self.batches: List[JointStateBatch] = []
+        self.batch_times: List[np.ndarray] = []
+        self.batch_channels: List[np.ndarray] = []
+        self.decode_error_count = 0
+        self.joint_state_channels = {}
+        self.channel_topics: Dict[int, str] = {}
+        self._joints = None
+        self.log_times = None
+        self.row_channels = None
+
+    def wants(self, channel: Any) -> bool:
+        return 'joint_states' in channel.topic.lower()
+
+    def visit(self, schema: Any, channel: Any, message: Any) -> None:
+        is_joint_state = self.joint_state_channels.get(channel.id)
+        if is_joint_state is None:
+            if schema is None and self.schemas:
+                schema = self.schemas.get(channel.schema_id)
+            is_joint_state = 'jointstate' in getattr(schema, 'name', '').lower()
+            self.joint_state_channels[channel.id] = is_joint_state
         
-        # Decode message using custom decoder
-        try:
-            decoded_msg = decode_mcap_message(channel, message, schemas)
-            
-            if not decoded_msg.is_valid():
-                decode_error_count += 1
-                continue
-            
-            message_count += 1
-            positions = decoded_msg.position
-            
-            # Check joint count consistency
-            if joint_count is None:
-                joint_count = len(positions)
-            elif len(positions) != joint_count:
-                report.fail("E1: Inconsistent joint count", 
-                           f"Expected {joint_count}, got {len(positions)}")
-                return
-            
-            # Check NaN and Inf in positions
-            for pos in positions:
-                if math.isnan(pos):
-                    nan_count += 1
-                    break
-                if math.isinf(pos):
-                    inf_count += 1
-                    break
-            
-            # Check velocity values
-            velocities = decoded_msg.velocity
-            if velocities:
-                for vel in velocities:
-                    if math.isnan(vel):
-                        nan_count += 1
-                        break
+            self.channel_topics[channel.id] = channel.topic
         
-        except Exception as e:
-            decode_error_count += 1
-            continue
+        if not is_joint_state:
+            self.decode_error_count += 1
+            return
+        
+        self.pending.append(message.data)
+        self.pending_times.append(message.log_time)
+        self.pending_channels.append(channel.id)
+        if len(self.pending) >= JOINT_DECODE_BATCH:
+            self._flush()
     
-    # If all messages failed to decode
-    if message_count == 0 and decode_error_count > 0:
-        report.warn("E1: Cannot decode joint_states", 
-                   f"Failed to decode {decode_error_count} messages")
-        return
+    def _flush(self) -> None:
+        if not self.pending:
+            return
+        batch = decode_joint_state_batch(self.pending)
+        self.decode_error_count += len(self.pending) - int(batch.valid.sum())
+        self.batches.append(batch)
+        self.batch_times.append(np.array(self.pending_times, dtype=np.int64)[batch.valid])
+        self.batch_channels.append(np.array(self.pending_channels, dtype=np.int64)[batch.valid])
+        self.pending = []
+        self.pending_times = []
+        self.pending_channels = []
     
-    if nan_count > 0:
-        report.fail("E1: NaN in joint values", f"{nan_count} messages affected")
-        return
+    @property
+    def joints(self) -> JointStateBatch:
+        """All decoded joint_states messages, in scan order."""
+        if self._joints is None:
+            self._flush()
+            self._joints = JointStateBatch.concatenate(self.batches)
+            self.log_times = np.concatenate(self.batch_times) if self.batch_times else np.zeros(0, np.int64)
+            self.row_channels = np.concatenate(self.batch_channels) if self.batch_channels else np.zeros(0, np.int64)
+            self.batches = []
+            self.batch_times = []
+            self.batch_channels = []
+        return self._joints
     
-    if inf_count > 0:
-        report.fail("E1: Inf in joint values", f"{inf_count} messages affected")
-        return
-    
-    if joint_count:
-        report.ok("E1: Joint values valid", 
-                 f"{message_count} messages, {joint_count} joints")
-    else:
-        report.warn("E1: No joint_states data", "Cannot verify joint values")
+    def topic_positions(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Decoded positions per topic, in log-time order.
+        
+        Returns:
+            topic -> (log_times (N,), positions (N, dof)); rows whose joint
+            count differs from the topic's first row are left out.
+        """
+        joints = self.joints
+        result = {}
+        topics: Dict[str, List[int]] = {}
+        for channel_id, topic in self.channel_topics.items():
+            topics.setdefault(topic, []).append(channel_id)
+        for topic, channel_ids in topics.items():
+            rows = np.flatnonzero(np.isin(self.row_channels, channel_ids))
+            if not len(rows):
+                continue
+            dof = int(joints.joint_counts[rows[0]])
+            rows = rows[joints.joint_counts[rows] == dof]
+            rows = rows[np.argsort(self.log_times[rows], kind='stable')]
+            result[topic] = (self.log_times[rows], joints.position[rows, :dof])
+        return result
 
 
-def check_motion_smoothness(reader: Any, report: Any, schemas: Dict = None) -> None:
+class JointAnalysisVisitor(JointBatchVisitor):
     """
-    E2: Motion continuity check (Soft Fail).
+    E1 + E2: one joint analysis over the decoded joint_states arrays.
+
+    ``finalize`` only computes ``self.stats`` (see joint_analysis_stats);
+    the caller emits E1 and E2 from it with report_joint_validity and
+    report_motion_smoothness, so each message is decoded once for both.
+    """
+
+    error_label = "E: Joint analysis error"
+    rule = "E1"
+
+    def __init__(self, report: Any, schemas: Dict = None):
+        super().__init__(report, schemas)
+        self.stats = None
+
+    def finalize(self) -> None:
+        joints = self.joints
+        self.stats = joint_analysis_stats(joints, self.log_times, self.row_channels,
+                                          self.channel_topics, self.decode_error_count)
+
+
+class JointStatesVisitor(JointAnalysisVisitor):
+    """
+    E1: Joint numerical validity check (Hard Fail), vectorized.
+    - position is not NaN / Inf.
+    - velocity is not NaN.
+    - Joint count is constant.
+    - Positions within config.JOINT_POSITION_LIMITS.
+    """
+
+    error_label = "E1: Joint states check error"
+
+    def finalize(self) -> None:
+        super().finalize()
+        report_joint_validity(self.report, self.stats)
+
+
+class MotionSmoothnessVisitor(JointAnalysisVisitor):
+    """
+    E2: Motion continuity check (Soft Fail), vectorized.
     - Adjacent joint position jumps < threshold.
     - No spikes in velocity / acceleration.
     """
-    last_positions = None
-    max_jump = 0.0
-    jump_count = 0
-    message_count = 0
-    decode_error_count = 0
-    
-    for _, channel, message in reader.iter_messages():
-        if 'joint_states' not in channel.topic.lower():
+
+    error_label = "E2: Motion smoothness check error"
+    rule = "E2"
+
+    def finalize(self) -> None:
+        super().finalize()
+        report_motion_smoothness(self.report, self.stats)
+
+
+def _motion_terms(times: np.ndarray, positions: np.ndarray,
+                  counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    E2 terms of one topic's consecutive rows.
+
+    Returns:
+        (jumps, speeds, accelerations): largest |Δposition| (rad) and
+        |Δposition| / Δt (rad/s) per step, largest |Δvelocity| / Δt
+        (rad/s²) per pair of steps. NaN where the rows differ in joint
+        count or hold no comparable values.
+    """
+    if len(times) < 2:
+        empty = np.zeros(0)
+        return empty, empty, empty
+    comparable = counts[1:] == counts[:-1]
+    steps = np.diff(positions, axis=0)
+    dt = np.maximum(np.diff(times) * 1e-9, _MIN_DERIVATIVE_DT)
+    jumps = np.fmax.reduce(np.abs(steps), axis=1)
+    jumps[~comparable] = np.nan
+    speeds = jumps / dt
+    velocity = steps / dt[:, None]
+    accelerations = np.fmax.reduce(np.abs(np.diff(velocity, axis=0)), axis=1) / (0.5 * (dt[1:] + dt[:-1]))
+    accelerations[~(comparable[1:] & comparable[:-1])] = np.nan
+    return jumps, speeds, accelerations
+
+
+def _fold_motion(stats: Dict[str, Any], jumps: np.ndarray, speeds: np.ndarray,
+                 accelerations: np.ndarray) -> None:
+    """Add E2 terms to the running maxima and threshold counts."""
+    for terms, max_key, count_key, threshold in (
+            (jumps, 'max_jump', 'jump_count', MAX_JOINT_JUMP),
+            (speeds, 'max_velocity', 'velocity_spikes', MAX_JOINT_VELOCITY),
+            (accelerations, 'max_acceleration', 'acceleration_spikes', MAX_JOINT_ACCELERATION)):
+        terms = terms[~np.isnan(terms)]
+        if len(terms):
+            stats[max_key] = max(stats[max_key], float(terms.max()))
+            stats[count_key] += int(np.count_nonzero(terms > threshold))
+
+
+def _edge_rows(times: np.ndarray, positions: np.ndarray, counts: np.ndarray,
+               rows: slice) -> Dict[str, np.ndarray]:
+    return {'times': times[rows].copy(), 'positions': positions[rows].copy(), 'counts': counts[rows].copy()}
+
+
+def empty_joint_stats() -> Dict[str, Any]:
+    """joint_analysis_stats of an empty block (start value for merging)."""
+    return {
+        'messages': 0,
+        'decode_errors': 0,
+        'joint_count': None,
+        'count_mismatch': None,
+        'nan_count': 0,
+        'inf_count': 0,
+        'position_min': np.zeros(0),
+        'position_max': np.zeros(0),
+        'max_jump': 0.0,
+        'jump_count': 0,
+        'max_velocity': 0.0,
+        'velocity_spikes': 0,
+        'max_acceleration': 0.0,
+        'acceleration_spikes': 0,
+        'edges': {},
+    }
+
+
+def joint_analysis_stats(joints: JointStateBatch, log_times: np.ndarray, row_channels: np.ndarray,
+                         channel_topics: Dict[int, str], decode_error_count: int = 0) -> Dict[str, Any]:
+    """
+    E1 + E2 reduction over a block of decoded joint_states messages.
+
+    E1 (all rows): joint count consistency, NaN / Inf positions and NaN
+    velocities, per-joint position min / max. E2 (per topic, rows in scan
+    order): position jumps, speed and acceleration spikes from
+    ``np.diff`` over log time.
+
+    The result only holds counts, maxima and the first offending value,
+    plus the first / last two rows of every topic (``edges``), so blocks
+    decoded separately (e.g. chunk ranges) can be merged in order with
+    merge_joint_stats.
+
+    Args:
+        joints: Decoded rows.
+        log_times: (N,) log time per row (ns).
+        row_channels: (N,) channel id per row.
+        channel_topics: channel id -> topic.
+        decode_error_count: Messages that failed to decode.
+    """
+    message_count = len(joints)
+    stats = empty_joint_stats()
+    stats['messages'] = message_count
+    stats['decode_errors'] = decode_error_count
+    if message_count == 0:
+        return stats
+
+    positions = joints.position
+    counts = joints.joint_counts
+    stats['joint_count'] = int(counts[0])
+    stats['position_min'] = np.fmin.reduce(positions, axis=0)
+    stats['position_max'] = np.fmax.reduce(positions, axis=0)
+
+    # E2 per topic: steps between rows of different topics are meaningless
+    topics: Dict[str, List[int]] = {}
+    for channel_id, topic in channel_topics.items():
+        topics.setdefault(topic, []).append(channel_id)
+    for topic, channel_ids in topics.items():
+        rows = np.flatnonzero(np.isin(row_channels, channel_ids))
+        if not len(rows):
             continue
-        
-        try:
-            # Decode message using custom decoder
-            decoded_msg = decode_mcap_message(channel, message, schemas)
-            
-            if not decoded_msg.is_valid():
-                decode_error_count += 1
-                continue
-            
-            positions = decoded_msg.position
-            message_count += 1
-            
-            if last_positions is not None:
-                # Compute maximum position jump
-                if len(positions) == len(last_positions):
-                    diffs = [abs(a - b) for a, b in zip(positions, last_positions)]
-                    current_max_jump = max(diffs)
-                    max_jump = max(max_jump, current_max_jump)
-                    
-                    if current_max_jump > MAX_JOINT_JUMP:
-                        jump_count += 1
-            
-            last_positions = positions
-        
-        except Exception:
-            decode_error_count += 1
+        times, topic_positions, topic_counts = log_times[rows], positions[rows], counts[rows]
+        _fold_motion(stats, *_motion_terms(times, topic_positions, topic_counts))
+        stats['edges'][topic] = {
+            'head': _edge_rows(times, topic_positions, topic_counts, slice(None, 2)),
+            'tail': _edge_rows(times, topic_positions, topic_counts, slice(-2, None)),
+        }
+
+    # Joint count consistency: first message whose count differs
+    mismatch = np.flatnonzero(counts != stats['joint_count'])
+    if len(mismatch):
+        stats['count_mismatch'] = int(counts[mismatch[0]])
+        return stats
+
+    # Positions: the first non-finite value of a message decides NaN vs Inf
+    non_finite = ~np.isfinite(positions)
+    affected = non_finite.any(axis=1)
+    first_bad = positions[np.arange(message_count), non_finite.argmax(axis=1)]
+    stats['nan_count'] = int(np.count_nonzero(affected & np.isnan(first_bad)))
+    stats['inf_count'] = int(np.count_nonzero(affected & np.isinf(first_bad)))
+
+    # Velocities (ignoring NaN padding of shorter / empty rows)
+    velocities = joints.velocity
+    if velocities.shape[1]:
+        present = np.arange(velocities.shape[1]) < joints.velocity_counts[:, None]
+        stats['nan_count'] += int(np.count_nonzero((np.isnan(velocities) & present).any(axis=1)))
+
+    return stats
+
+
+def _extend_limits(a: np.ndarray, b: np.ndarray, combine: Any) -> np.ndarray:
+    """Element-wise fmin / fmax of two per-joint vectors of any widths."""
+    width = max(len(a), len(b))
+    out = np.full(width, np.nan)
+    out[:len(a)] = a
+    out[:len(b)] = combine(out[:len(b)], b)
+    return out
+
+
+def merge_joint_stats(merged: Dict[str, Any], part: Dict[str, Any]) -> None:
+    """
+    Merge the joint_analysis_stats of the next block into ``merged``.
+
+    Counts and maxima add up; E2 terms of steps that cross the block edge
+    are computed from the last two rows of each topic in ``merged`` and
+    the first two rows of that topic in ``part``, so the result equals
+    one joint_analysis_stats over both blocks.
+    """
+    merged['messages'] += part['messages']
+    merged['decode_errors'] += part['decode_errors']
+    merged['nan_count'] += part['nan_count']
+    merged['inf_count'] += part['inf_count']
+    merged['position_min'] = _extend_limits(merged['position_min'], part['position_min'], np.fmin)
+    merged['position_max'] = _extend_limits(merged['position_max'], part['position_max'], np.fmax)
+    for key in ('max_jump', 'max_velocity', 'max_acceleration'):
+        merged[key] = max(merged[key], part[key])
+    for key in ('jump_count', 'velocity_spikes', 'acceleration_spikes'):
+        merged[key] += part[key]
+
+    for topic, edge in part['edges'].items():
+        previous = merged['edges'].get(topic)
+        if previous is None:
+            merged['edges'][topic] = {'head': edge['head'], 'tail': edge['tail']}
             continue
-    
-    if message_count == 0 and decode_error_count > 0:
-        report.warn("E2: Cannot decode joint_states for smoothness check", 
-                   f"Failed to decode {decode_error_count} messages")
+        tail, head = previous['tail'], edge['head']
+        window = {key: np.concatenate([tail[key], head[key]]) for key in tail}
+        jumps, speeds, accelerations = _motion_terms(window['times'], window['positions'], window['counts'])
+        # Only the step from the last tail row to the first head row and
+        # the two accelerations around it cross the edge
+        edge_step = len(tail['times']) - 1
+        crossing = [k for k in (edge_step - 1, edge_step) if 0 <= k < len(accelerations)]
+        _fold_motion(merged, jumps[edge_step:edge_step + 1], speeds[edge_step:edge_step + 1],
+                     accelerations[crossing])
+        previous['tail'] = {key: np.concatenate([tail[key], edge['tail'][key]])[-2:] for key in tail}
+
+    # E1: first joint count mismatch in file order
+    if part['messages'] == 0 or merged['count_mismatch'] is not None:
         return
-    
+    if merged['joint_count'] is None:
+        merged['joint_count'] = part['joint_count']
+    if part['joint_count'] != merged['joint_count']:
+        merged['count_mismatch'] = part['joint_count']
+    elif part['count_mismatch'] is not None:
+        merged['count_mismatch'] = part['count_mismatch']
+
+
+def report_joint_validity(report: Any, stats: Dict[str, Any]) -> None:
+    """Emit the E1 report item from ``joint_analysis_stats``."""
+    message_count = stats['messages']
+
+    # If all messages failed to decode
+    if message_count == 0 and stats['decode_errors'] > 0:
+        report.warn("E1: Cannot decode joint_states",
+                   f"Failed to decode {stats['decode_errors']} messages")
+        return
+
     if message_count == 0:
+        report.warn("E1: No joint_states data", "Cannot verify joint values")
+        return
+
+    if stats['count_mismatch'] is not None:
+        report.fail("E1: Inconsistent joint count",
+                   f"Expected {stats['joint_count']}, got {stats['count_mismatch']}")
+        return
+
+    if stats['nan_count'] > 0:
+        report.fail("E1: NaN in joint values", f"{stats['nan_count']} messages affected")
+        return
+
+    if stats['inf_count'] > 0:
+        report.fail("E1: Inf in joint values", f"{stats['inf_count']} messages affected")
+        return
+
+    if JOINT_POSITION_LIMITS:
+        violations = []
+        for j, (lower, upper) in enumerate(JOINT_POSITION_LIMITS[:len(stats['position_min'])]):
+            low, high = float(stats['position_min'][j]), float(stats['position_max'][j])
+            if low < lower or high > upper:
+                violations.append(f"joint {j}: [{low:.3f}, {high:.3f}] outside [{lower}, {upper}]")
+        if violations:
+            report.fail("E1: Joint position out of limits", "; ".join(violations))
+            return
+
+    report.ok("E1: Joint values valid",
+             f"{message_count} messages, {stats['joint_count']} joints")
+
+
+def check_joint_states(reader: Any, report: Any, schemas: Dict = None) -> None:
+    """
+    E1: Joint numerical validity check (Hard Fail).
+    - position is not NaN / Inf.
+    - velocity is not NaN.
+    - Joint count is constant.
+    - Positions within config.JOINT_POSITION_LIMITS.
+    """
+    run_visitor(reader, JointStatesVisitor(report, schemas))
+
+
+def report_motion_smoothness(report: Any, stats: Dict[str, Any]) -> None:
+    """Emit the E2 report items from ``joint_analysis_stats``."""
+    if stats['messages'] == 0 and stats['decode_errors'] > 0:
+        report.warn("E2: Cannot decode joint_states for smoothness check",
+                   f"Failed to decode {stats['decode_errors']} messages")
+        return
+
+    if stats['messages'] == 0:
         report.warn("E2: No joint_states for smoothness check")
         return
-    
+
+    max_jump = stats['max_jump']
+    jump_count = stats['jump_count']
     if jump_count > 0:
-        jump_ratio = jump_count / message_count
-        report.warn("E2: Joint discontinuity detected", 
+        report.warn("E2: Joint discontinuity detected",
                    f"{jump_count} jumps (max {max_jump:.3f} rad, "
                    f"threshold {MAX_JOINT_JUMP} rad)")
-    else:
-        report.ok("E2: Motion smoothness OK", 
-                 f"Max jump {max_jump:.3f} rad < {MAX_JOINT_JUMP} rad")
+    if stats['velocity_spikes'] > 0:
+        report.warn("E2: Joint velocity spike",
+                   f"{stats['velocity_spikes']} steps (max {stats['max_velocity']:.1f} rad/s, "
+                   f"threshold {MAX_JOINT_VELOCITY} rad/s)")
+    if stats['acceleration_spikes'] > 0:
+        report.warn("E2: Joint acceleration spike",
+                   f"{stats['acceleration_spikes']} steps (max {stats['max_acceleration']:.0f} rad/s², "
+                   f"threshold {MAX_JOINT_ACCELERATION} rad/s²)")
+    if not (jump_count or stats['velocity_spikes'] or stats['acceleration_spikes']):
+        report.ok("E2: Motion smoothness OK",
+                 f"Max jump {max_jump:.3f} rad < {MAX_JOINT_JUMP} rad, "
+                 f"max speed {stats['max_velocity']:.1f} rad/s")
+
+
+def check_motion_smoothness(reader: Any, report: Any, schemas: Dict = None) -> None:
+    """
+    E2: Motion continuity check (Soft Fail).
+    - Adjacent joint position jumps < threshold.
+    - No spikes in velocity / acceleration.
+    """
+    run_visitor(reader, MotionSmoothnessVisitor(report, schemas))
 
 
-def check_timing_stability(topic_ts: Dict[str, List[int]], report: Any) -> None:
+def check_timing_stability(topic_ts: TimestampStore, report: Any) -> None:
     """
     F: Timing stability check (using timestamp jitter as a proxy).
     - Detect high-frequency oscillations.
     - No abnormal time intervals.
     """
-    # Collect all timestamps from joint_states-related topics
-    joint_ts = []
-    for topic, ts in topic_ts.items():
-        if 'joint_states' in topic.lower():
-            joint_ts.extend(ts)
-    
-    if not joint_ts:
-        joint_ts = []
+    # Timestamp columns of joint_states-related topics
+    columns = [as_column(ts) for topic, ts in topic_ts.items()
+               if 'joint_states' in topic.lower() and len(ts)]
     
-    if len(joint_ts) < 10:
+    if sum(len(c) for c in columns) < 10:
         report.warn("F: Insufficient data for timing stability")
         return
     
-    # Compute time intervals
-    intervals = [(joint_ts[i+1] - joint_ts[i]) * 1e-9 
-                 for i in range(len(joint_ts) - 1)]
+    # Intervals within each topic only, measured against that topic's mean
+    # interval: steps between topics or different rates are not jitter
+    intervals = [column.interval_moments() for column in columns]
+    count = sum(moments.count for moments in intervals)
     
-    # Compute jitter (standard deviation)
-    jitter = statistics.pstdev(intervals)
+    # Compute jitter (pooled population standard deviation)
+    jitter = float(np.sqrt(sum(moments.m2 for moments in intervals) / count)) * 1e-9 if count else 0.0
     
     if jitter > MAX_TIMING_JITTER:
         report.warn("F: High timing jitter", 
@@ -184,31 +496,228 @@ def check_timing_stability(topic_ts: Dict[str, List[int]], report: Any) -> None:
         report.ok("F: Timing stability OK", f"Jitter {jitter:.4f}s")
 
 
-def check_trajectory_continuity(reader: Any, report: Any) -> None:
+def _local_median(steps: np.ndarray, half_window: int = 5) -> np.ndarray:
+    """Median of the steps around each step (edges padded by reflection)."""
+    padded = np.pad(steps, half_window, mode='reflect') if len(steps) > half_window else steps
+    if len(padded) < 2 * half_window + 1:
+        return np.full(len(steps), np.median(steps))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half_window + 1)
+    return np.median(windows, axis=1)
+
+
+def check_trajectory_continuity(joint_source: JointBatchVisitor, report: Any) -> None:
     """
     F1: End-effector trajectory continuity check.
     - No pose teleportation.
     - Attitude changes continuously (valid quaternion).
 
-    Note: requires forward kinematics or an EE pose topic.
-    Currently a placeholder; real implementation depends on data structure.
+    EE poses come from forward kinematics (config.FK_MODEL) over the joint
+    positions already decoded by the E1/E2 scan: one batched (N, 4, 4)
+    pose array per joint_states topic, whose first joints are taken in
+    chain order. A teleport / orientation jump is a step above the
+    threshold that also stands out from the steps around it, so fast but
+    smooth motion is not flagged.
     """
-    # This is an advanced feature requiring:
-    # 1. URDF/robot model.
-    # 2. Forward kinematics computation.
-    # 3. Or directly reading an EE pose topic.
-    
-    report.warn("F1: Trajectory continuity check not implemented", 
-               "Requires forward kinematics or EE pose topic")
+    matrices = joint_source.topic_positions()
+    if not matrices:
+        report.warn("F1: No joint_states for trajectory check")
+        return
+
+    try:
+        chain = load_chain(FK_MODEL)
+    except (ValueError, RuntimeError, OSError) as e:
+        report.warn("F1: No kinematic model", str(e))
+        return
+
+    analysed = 0
+    issues = 0
+    max_step = 0.0
+    max_rotation = 0.0
+    for topic, (times, positions) in matrices.items():
+        if positions.shape[1] < len(chain):
+            report.warn("F1: Joint count does not match kinematic model",
+                       f"{topic}: {positions.shape[1]} joints, {chain.name} needs {len(chain)}")
+            continue
+        finite = np.isfinite(positions[:, :len(chain)]).all(axis=1)
+        times, positions = times[finite], positions[finite]
+        if len(times) < 2:
+            continue
+        analysed += 1
+
+        steps = trajectory_steps(times, chain.forward(positions))
+        translation, rotation = steps['translation'], steps['rotation']
+        max_step = max(max_step, float(translation.max()))
+        max_rotation = max(max_rotation, float(rotation.max()))
+
+        teleports = np.flatnonzero((translation > MAX_EE_STEP_M) &
+                                   (translation > EE_STEP_OUTLIER_RATIO * _local_median(translation)))
+        if len(teleports):
+            issues += 1
+            i = int(teleports[translation[teleports].argmax()])
+            report.warn("F1: EE teleport",
+                       f"{topic}: {len(teleports)} steps > {MAX_EE_STEP_M * 1000:.0f} mm "
+                       f"(max {translation[i] * 1000:.1f} mm at {int(times[i + 1])})")
+
+        flips = np.flatnonzero((rotation > MAX_EE_ROTATION_STEP_RAD) &
+                               (rotation > EE_STEP_OUTLIER_RATIO * _local_median(rotation)))
+        if len(flips):
+            issues += 1
+            i = int(flips[rotation[flips].argmax()])
+            report.warn("F1: EE orientation discontinuity",
+                       f"{topic}: {len(flips)} steps > {np.degrees(MAX_EE_ROTATION_STEP_RAD):.0f} deg "
+                       f"(max {np.degrees(rotation[i]):.1f} deg at {int(times[i + 1])})")
 
+    if analysed == 0:
+        report.warn("F1: Insufficient data for trajectory check")
+    elif not issues:
+        report.ok("F1: EE trajectory continuous",
+                 f"{analysed} topics ({chain.name}), max step {max_step * 1000:.1f} mm, "
+                 f"{np.degrees(max_rotation):.1f} deg")
 
-def check_vibration(topic_ts: Dict[str, List[int]], report: Any) -> None:
+
+def vibration_stats(times: np.ndarray, positions: np.ndarray) -> Dict[str, Any]:
+    """
+    F2 spectra of one topic's (N, dof) joint position matrix.
+
+    The matrix is linearly resampled onto a uniform grid at the median
+    sample interval, cut into 50%-overlapping Hann-windowed segments
+    (linear trend removed per segment and joint) and transformed with one
+    ``rfft`` call over all segments and joints (Welch's method).
+
+    Args:
+        times: Log times (ns), ascending.
+        positions: (N, dof) positions.
+
+    Joints with fewer than half of their samples finite are skipped (NaN
+    in the per-joint results); samples where any other joint is NaN / Inf
+    are dropped before resampling, so one bad value cannot spread over the
+    whole spectrum.
+
+    Returns:
+        Dict with fs, hf_ratio (dof,), hf_rms (dof,), peak_hz (dof,),
+        peak_ratio (dof,) and skipped (dof,), or an empty dict if too few
+        finite samples remain or they are sampled too slowly for the cutoff.
+    """
+    finite = np.isfinite(positions)
+    used = finite.sum(axis=0) * 2 >= len(positions)
+    rows = finite[:, used].all(axis=1)
+    times, positions = times[rows], positions[rows][:, used]
+    keep = np.concatenate(([True], np.diff(times) > 0))
+    times, positions = times[keep], positions[keep]
+    if len(times) < 32 or not used.any():
+        return {}
+    dt = float(np.median(np.diff(times)))
+    fs = 1e9 / dt
+    if fs / 2 <= VIBRATION_HF_CUTOFF_HZ:
+        return {}
+
+    # Linear resampling of all joints at once
+    grid = np.arange(times[0], times[-1], dt)
+    right = np.clip(np.searchsorted(times, grid, side='right'), 1, len(times) - 1)
+    left = right - 1
+    weight = ((grid - times[left]) / (times[right] - times[left]))[:, None]
+    uniform = positions[left] * (1.0 - weight) + positions[right] * weight
+
+    nperseg = min(VIBRATION_SEGMENT, len(uniform))
+    # (segments, dof, nperseg) view, 50% overlap
+    segments = np.lib.stride_tricks.sliding_window_view(uniform, nperseg, axis=0)[::max(1, nperseg // 2)]
+    ramp = np.arange(nperseg) - (nperseg - 1) / 2.0
+    segments = segments - segments.mean(axis=2, keepdims=True)
+    segments = segments - (segments @ ramp / (ramp @ ramp))[:, :, None] * ramp
+    window = np.hanning(nperseg)
+    spectra = np.fft.rfft(segments * window, axis=2)
+    # One-sided power spectral density (rad^2 / Hz), averaged over segments
+    psd = (np.abs(spectra) ** 2).mean(axis=0) * 2.0 / (fs * (window @ window))
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+    df = freqs[1]
+
+    band = freqs >= VIBRATION_HF_CUTOFF_HZ
+    total = psd[:, 1:].sum(axis=1)
+    high = psd[:, band].sum(axis=1)
+    hf_psd = psd[:, band]
+    peak = hf_psd.argmax(axis=1)
+    dof = psd.shape[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hf_ratio = np.where(total > 0, high / total, 0.0)
+        # Floor the median so a band that is zero outside the peak (e.g.
+        # quantized or synthetic signals) gives a large finite ratio, not inf
+        floor = np.median(hf_psd, axis=1) + 1e-6 * hf_psd.mean(axis=1)
+        peak_ratio = hf_psd[np.arange(dof), peak] / floor
+
+    def per_joint(values: np.ndarray) -> np.ndarray:
+        full = np.full(len(used), np.nan)
+        full[used] = values
+        return full
+
+    return {
+        'fs': fs,
+        'hf_ratio': per_joint(hf_ratio),
+        'hf_rms': per_joint(np.sqrt(high * df)),
+        'peak_hz': per_joint(freqs[band][peak]),
+        'peak_ratio': per_joint(np.nan_to_num(peak_ratio)),
+        'skipped': ~used,
+    }
+
+
+def check_vibration(joint_source: JointBatchVisitor, report: Any) -> None:
     """
     F2: Vibration detection.
     - High-frequency oscillation energy below threshold.
     - No mechanical resonance characteristics.
 
-    Note: requires FFT analysis; here we only provide a basic placeholder.
+    Works on the joint positions already decoded by the E1/E2 scan
+    (``joint_source``), one (N, dof) matrix per joint_states topic.
     """
-    report.warn("F2: Vibration detection not implemented", 
-               "Requires FFT analysis on joint positions")
+    matrices = joint_source.topic_positions()
+    if not matrices:
+        report.warn("F2: No joint_states for vibration check")
+        return
+
+    analysed = 0
+    issues = 0
+    worst_ratio = 0.0
+    # Joints without enough finite samples are reported, not counted as OK
+    skipped = []
+    for topic, (times, positions) in matrices.items():
+        stats = vibration_stats(times, positions)
+        if not stats:
+            # Only blame the non-finite samples if they left too few rows
+            finite = np.isfinite(positions)
+            used = finite.sum(axis=0) * 2 >= len(positions)
+            if len(positions) >= 32 and (not used.any() or finite[:, used].all(axis=1).sum() < 32):
+                skipped.append(f"{topic} (all joints)")
+            continue
+        analysed += 1
+        if stats['skipped'].any():
+            skipped.append(f"{topic} (joints {', '.join(map(str, np.flatnonzero(stats['skipped'])))})")
+        # Below VIBRATION_MIN_RMS the high band is sensor noise, not motion
+        moving = stats['hf_rms'] > VIBRATION_MIN_RMS
+        ratio = np.where(moving, stats['hf_ratio'], 0.0)
+        worst_ratio = max(worst_ratio, float(ratio.max()))
+
+        vibrating = np.flatnonzero(ratio > MAX_VIBRATION_ENERGY_RATIO)
+        if len(vibrating):
+            issues += 1
+            j = int(vibrating[ratio[vibrating].argmax()])
+            report.warn("F2: High-frequency vibration",
+                       f"{topic}: {len(vibrating)} joints, worst joint {j} "
+                       f"{ratio[j]*100:.1f}% energy > {VIBRATION_HF_CUTOFF_HZ} Hz "
+                       f"(rms {stats['hf_rms'][j]:.4f} rad)")
+
+        resonant = np.flatnonzero(moving & (stats['peak_ratio'] > VIBRATION_PEAK_RATIO))
+        if len(resonant):
+            issues += 1
+            j = int(resonant[stats['peak_ratio'][resonant].argmax()])
+            report.warn("F2: Resonance peak",
+                       f"{topic}: joint {j} at {stats['peak_hz'][j]:.1f} Hz "
+                       f"({stats['peak_ratio'][j]:.0f}x median high-band power)")
+
+    if skipped:
+        issues += 1
+        report.warn("F2: Joints skipped", f"Too few finite samples: {'; '.join(skipped)}")
+    if analysed == 0:
+        report.warn("F2: Insufficient data for vibration check",
+                   f"Need >= 32 samples and a rate above {2 * VIBRATION_HF_CUTOFF_HZ} Hz")
+    elif not issues:
+        report.ok("F2: Vibration OK",
+                 f"{analysed} topics, max high-frequency energy {worst_ratio*100:.1f}%")
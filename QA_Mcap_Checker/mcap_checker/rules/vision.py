@@ -7,61 +7,414 @@ Note: these checks require image decoding and may be slow.
 Enable them only when needed.
 """
 
-from typing import Any
+import struct
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
 import numpy as np
 
+from ..config import (
+    VISION_SAMPLES_PER_TOPIC, VISION_DECODE_THREADS, VISION_MAX_DIM,
+    VISION_BLACK_LEVEL, VISION_WHITE_LEVEL, VISION_FLAT_STD,
+    VISION_TEAR_RATIO, VISION_TEAR_MIN_DIFF,
+    ILLUMINATION_THUMB_DIM, ILLUMINATION_MAINS_HZ, ILLUMINATION_FFT_SEGMENT,
+    ILLUMINATION_FLICKER_RATIO, ILLUMINATION_FLICKER_MIN_AMPLITUDE, ILLUMINATION_MAX_JUMP
+)
+from ..decoder import decode_message
+from ..scan import MessageVisitor, run_visitor
 
-def check_image_integrity(reader: Any, report: Any) -> None:
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Raw encodings: dtype and channel count
+RAW_ENCODINGS = {
+    'rgb8': ('u1', 3), 'bgr8': ('u1', 3), 'rgba8': ('u1', 4), 'bgra8': ('u1', 4),
+    'mono8': ('u1', 1), '8uc1': ('u1', 1), '8uc3': ('u1', 3), '8uc4': ('u1', 4),
+    'mono16': ('u2', 1), '16uc1': ('u2', 1),
+}
+
+IMAGE_SCHEMA = 'sensor_msgs/msg/image'
+COMPRESSED_IMAGE_SCHEMA = 'sensor_msgs/msg/compressedimage'
+
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class ImageSample:
+    """One analysed frame: full resolution and downscaled gray statistics."""
+
+    __slots__ = ('ordinal', 'width', 'height', 'mean', 'std', 'torn')
+
+    def __init__(self, ordinal: int, width: int, height: int, gray: np.ndarray):
+        self.ordinal = ordinal
+        self.width = width
+        self.height = height
+        self.mean = float(gray.mean())
+        self.std = float(gray.std())
+        self.torn = is_torn(gray)
+
+    @property
+    def black(self) -> bool:
+        return self.std < VISION_FLAT_STD and self.mean < VISION_BLACK_LEVEL
+
+    @property
+    def white(self) -> bool:
+        return self.std < VISION_FLAT_STD and self.mean > VISION_WHITE_LEVEL
+
+
+class ImageIntegrityVisitor(MessageVisitor):
     """
-    G1: Image integrity check.
+    G1: Image integrity check (streaming).
     - Not all black / all white.
     - Resolution is constant.
     - No severe tearing.
+
+    Only a stratified sample of frames is decoded: with the per-channel
+    message counts of the summary statistics, ``max_samples`` frames spread
+    evenly over each camera topic; without them, every k-th frame with k
+    doubling as the topic grows. Decoding runs on a thread pool while the
+    scan continues, and all pixel statistics are computed on frames
+    downscaled to VISION_MAX_DIM.
     """
-    image_topics = {}
-    sample_count = 0
-    max_samples = 100  # only sample a subset of images
-    
-    for _, channel, message in reader.iter_messages():
-        if "image" not in channel.topic:
-            continue
+
+    error_label = "G1: Vision check error"
+    rule = "G"
+
+    def __init__(self, report: Any, max_samples: int = VISION_SAMPLES_PER_TOPIC,
+                 summary: Any = None, threads: int = VISION_DECODE_THREADS):
+        super().__init__(report)
+        self.max_samples = max_samples  # frames decoded per topic
+        self.threads = threads
+        self.counts = {}
+        if summary is not None and summary.statistics is not None:
+            self.counts = dict(summary.statistics.channel_message_counts)
+        self.image_channels: Dict[int, bool] = {}
+        # topic -> per-topic sampling state
+        self.image_topics: Dict[str, Dict[str, Any]] = {}
+        self.pool: Optional[ThreadPoolExecutor] = None
+
+    def wants(self, channel: Any) -> bool:
+        return "image" in channel.topic
+
+    def _topic_state(self, channel: Any) -> Dict[str, Any]:
+        info = self.image_topics.get(channel.topic)
+        if info is None:
+            total = self.counts.get(channel.id)
+            targets = None
+            if total:
+                k = min(total, self.max_samples)
+                targets = {int((i + 0.5) * total / k) for i in range(k)}
+            info = {'count': 0, 'stride': 1, 'targets': targets, 'samples': []}
+            self.image_topics[channel.topic] = info
+        return info
+
+    def visit(self, schema: Any, channel: Any, message: Any) -> None:
+        is_image = self.image_channels.get(channel.id)
+        if is_image is None:
+            name = getattr(schema, 'name', '').lower()
+            is_image = name in (IMAGE_SCHEMA, COMPRESSED_IMAGE_SCHEMA)
+            self.image_channels[channel.id] = is_image
+        if not is_image:
+            return
+
+        info = self._topic_state(channel)
+        ordinal = info['count']
+        info['count'] += 1
+
+        targets = info['targets']
+        if targets is not None:
+            if ordinal not in targets:
+                return
+        elif ordinal % info['stride']:
+            return
+
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.threads)
+        samples = info['samples']
+        samples.append((ordinal, self.pool.submit(analyse_image, schema, message.data, ordinal)))
+
+        # Unknown frame count: halve the sample density when the list is full
+        if targets is None and len(samples) >= 2 * self.max_samples:
+            info['stride'] *= 2
+            kept = []
+            for sample_ordinal, future in samples:
+                if sample_ordinal % info['stride']:
+                    future.cancel()
+                else:
+                    kept.append((sample_ordinal, future))
+            info['samples'] = kept
+
+    def finalize(self) -> None:
+        report = self.report
+        try:
+            results = {topic: self._collect(info['samples'])
+                       for topic, info in self.image_topics.items()}
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
         
-        if sample_count >= max_samples:
-            break
+        if not results:
+            report.warn("G1: No images to check")
+            return
         
-        try:
-            # Here we would need to decode according to actual image message format,
-            # usually sensor_msgs/Image or compressed image.
-            #
-            # Placeholder implementation. A real implementation should:
-            # 1. Decode the image according to encoding.
-            # 2. Check image dimensions.
-            # 3. Check pixel value distribution.
+        for topic, (samples, errors) in results.items():
+            if errors:
+                report.warn("G1: Cannot decode image",
+                           f"{topic}: {len(errors)} of {len(samples) + len(errors)} sampled frames ({errors[0]})")
+            if not samples:
+                continue
+            
+            issues = []
+            black = sum(s.black for s in samples)
+            white = sum(s.white for s in samples)
+            if black:
+                issues.append(("G1: Black frames", f"{topic}: {black} of {len(samples)} sampled frames"))
+            if white:
+                issues.append(("G1: White frames", f"{topic}: {white} of {len(samples)} sampled frames"))
             
-            if channel.topic not in image_topics:
-                image_topics[channel.topic] = {
-                    'count': 0,
-                    'width': None,
-                    'height': None
-                }
+            resolutions = []
+            for s in samples:
+                if (s.width, s.height) not in resolutions:
+                    resolutions.append((s.width, s.height))
+            if len(resolutions) > 1:
+                changes = ", ".join(f"{w}x{h}" for w, h in resolutions)
+                issues.append(("G1: Resolution change", f"{topic}: {changes}"))
             
-            image_topics[channel.topic]['count'] += 1
-            sample_count += 1
+            torn = [s.ordinal for s in samples if s.torn]
+            if torn:
+                issues.append(("G1: Image tearing",
+                               f"{topic}: {len(torn)} of {len(samples)} sampled frames (first: frame {torn[0]})"))
             
-        except Exception as e:
-            report.warn("G1: Cannot decode image", f"{channel.topic}: {e}")
+            for name, info in issues:
+                report.warn(name, info)
+            if not issues:
+                width, height = resolutions[0]
+                report.ok("G1: Image integrity OK",
+                         f"{topic}: {len(samples)} sampled frames, {width}x{height}")
+
+    @staticmethod
+    def _collect(samples: List[Tuple[int, Future]]) -> Tuple[List[ImageSample], List[str]]:
+        ok, errors = [], []
+        for _, future in samples:
+            try:
+                ok.append(future.result())
+            except Exception as e:
+                errors.append(str(e) or type(e).__name__)
+        return ok, errors
+
+
+def check_image_integrity(reader: Any, report: Any) -> None:
+    """
+    G1: Image integrity check.
+    - Not all black / all white.
+    - Resolution is constant.
+    - No severe tearing.
+    """
+    run_visitor(reader, ImageIntegrityVisitor(report, summary=reader.get_summary()))
+
+
+class _RawImageLayout:
+    """
+    Header layout shared by raw Image messages with the same frame_id,
+    size, encoding and step (typically every message of a channel). The
+    pixel data of such messages is found without decoding the header.
+    """
+
+    __slots__ = ('prefix_end', 'prefix', 'dtype', 'shape', 'step', 'scale')
+
+    def __init__(self, data: bytes, message: Dict[str, Any]):
+        encoding = message['encoding'].lower()
+        if encoding not in RAW_ENCODINGS:
+            raise ValueError(f"unsupported encoding '{message['encoding']}'")
+        dtype, channels = RAW_ENCODINGS[encoding]
+        height, width, step = message['height'], message['width'], message['step']
+        size = len(message['data'])
+        # uint8[] data is the last field: its u32 length sits right before it
+        little = data[1] == 1
+        fmt = '<I' if little else '>I'
+        start = len(data) - size
+        while start >= 8 and struct.unpack_from(fmt, data, start - 4)[0] != size:
+            start -= 1
+        if start < 8 or size < step * height or step < width * channels * (2 if dtype == 'u2' else 1):
+            raise ValueError(f"truncated {encoding} image")
+        # Everything but the stamp: frame_id, size, encoding, step, data length
+        self.prefix_end = start
+        self.prefix = data[:2] + data[12:start]
+        self.dtype = ('>' if message.get('is_bigendian') else '<') + dtype
+        self.shape = (height, width, channels)
+        self.step = step
+        self.scale = 1.0 / 257.0 if dtype == 'u2' else 1.0
+
+    def matches(self, data: bytes) -> bool:
+        return data[:2] + data[12:self.prefix_end] == self.prefix
+
+    def thumbnail(self, data: bytes, max_dim: int) -> np.ndarray:
+        """Block-mean (height', width', channels) thumbnail of the pixels."""
+        height, width, channels = self.shape
+        itemsize = 2 if self.scale != 1.0 else 1
+        rows = np.frombuffer(data, dtype=np.uint8, count=self.step * height, offset=self.prefix_end)
+        pixels = rows.reshape(height, self.step)[:, :width * channels * itemsize].view(self.dtype)
+        return _downscale(pixels.reshape(height, width, channels), max_dim)
+
+
+class _BrightnessSeries:
+    """Per-camera brightness values; raw thumbnails are reduced in batches."""
+
+    __slots__ = ('times', 'values', 'pending', 'pending_key')
+
+    BATCH = 256
+
+    def __init__(self):
+        self.times: List[int] = []
+        # float or Future per frame (in order), after flush()
+        self.values: List[Any] = []
+        self.pending: List[np.ndarray] = []
+        self.pending_key = None
+
+    def add_thumbnail(self, log_time: int, thumb: np.ndarray, scale: float) -> None:
+        key = (thumb.shape, thumb.dtype, scale)
+        if key != self.pending_key:
+            self.flush()
+            self.pending_key = key
+        self.times.append(log_time)
+        self.pending.append(thumb)
+        if len(self.pending) >= self.BATCH:
+            self.flush()
+
+    def add_value(self, log_time: int, value: Any) -> None:
+        self.flush()
+        self.times.append(log_time)
+        self.values.append(value)
+
+    def flush(self) -> None:
+        if not self.pending:
             return
-    
-    if not image_topics:
-        report.warn("G1: No images to check")
-        return
-    
-    # Simplified version: only report images found
-    for topic, info in image_topics.items():
-        report.ok("G1: Images found", f"{topic}: {info['count']} samples")
-    
-    report.warn("G1: Image quality check not fully implemented", 
-               "Enable ENABLE_VISION_CHECKS for detailed analysis")
+        stacked = np.stack(self.pending).reshape(len(self.pending), -1)
+        # Mean over pixels and color channels (= mean gray level)
+        self.values.extend(stacked.mean(axis=1) * self.pending_key[2])
+        self.pending = []
+
+
+class IlluminationVisitor(MessageVisitor):
+    """
+    G2: Illumination & flicker check (streaming).
+    - No periodic brightness flicker.
+    - Brightness changes smoothly.
+
+    Every frame contributes one mean brightness value, taken from a
+    thumbnail: block means of raw images (reduced 256 frames at a
+    time), or a 1/8-scale JPEG decode (DCT-domain, close to reading the
+    DC coefficients) on a thread pool. The per-camera series are analysed
+    with NumPy after the scan.
+    """
+
+    error_label = "G2: Illumination check error"
+    rule = "G"
+
+    def __init__(self, report: Any, threads: int = VISION_DECODE_THREADS):
+        super().__init__(report)
+        self.threads = threads
+        self.image_channels: Dict[int, bool] = {}
+        self.layouts: Dict[int, _RawImageLayout] = {}
+        self.series: Dict[str, _BrightnessSeries] = {}
+        self.pool: Optional[ThreadPoolExecutor] = None
+
+    def wants(self, channel: Any) -> bool:
+        return "image" in channel.topic
+
+    def visit(self, schema: Any, channel: Any, message: Any) -> None:
+        is_image = self.image_channels.get(channel.id)
+        if is_image is None:
+            name = getattr(schema, 'name', '').lower()
+            is_image = name in (IMAGE_SCHEMA, COMPRESSED_IMAGE_SCHEMA)
+            self.image_channels[channel.id] = is_image
+        if not is_image:
+            return
+
+        series = self.series.get(channel.topic)
+        if series is None:
+            series = self.series[channel.topic] = _BrightnessSeries()
+        data = message.data
+
+        if schema.name.lower() != IMAGE_SCHEMA:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.threads)
+            series.add_value(message.log_time, self.pool.submit(frame_brightness, schema, data))
+            return
+
+        layout = self.layouts.get(channel.id)
+        if layout is None or not layout.matches(data):
+            try:
+                decoded = decode_message(schema.name, data, schema)
+                if decoded is None:
+                    raise ValueError("cannot decode message")
+                layout = _RawImageLayout(data, decoded)
+            except Exception as e:
+                series.add_value(message.log_time, e)
+                return
+            self.layouts[channel.id] = layout
+        series.add_thumbnail(message.log_time, layout.thumbnail(data, ILLUMINATION_THUMB_DIM), layout.scale)
+
+    def finalize(self) -> None:
+        report = self.report
+        try:
+            results = {}
+            for topic, series in self.series.items():
+                series.flush()
+                results[topic] = self._collect(series.times, series.values)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+
+        if not results:
+            report.warn("G2: No images to check")
+            return
+
+        for topic, (times, brightness, errors) in results.items():
+            if errors:
+                report.warn("G2: Cannot decode image",
+                           f"{topic}: {len(errors)} of {len(times) + len(errors)} frames ({errors[0]})")
+            if len(brightness) < 2:
+                continue
+
+            issues = []
+            jumps = np.abs(np.diff(brightness))
+            if jumps.max() > ILLUMINATION_MAX_JUMP:
+                i = int(jumps.argmax()) + 1
+                issues.append(("G2: Sudden brightness change",
+                               f"{topic}: {jumps.max():.1f} gray levels at {int(times[i])}, "
+                               f"{int((jumps > ILLUMINATION_MAX_JUMP).sum())} frames > {ILLUMINATION_MAX_JUMP}"))
+
+            flicker = detect_flicker(times, brightness)
+            if flicker is not None:
+                issues.append(("G2: Illumination flicker",
+                               f"{topic}: {flicker['source_hz']:.0f} Hz light seen at "
+                               f"{flicker['frequency']:.2f} Hz ({flicker['fps']:.1f} FPS), "
+                               f"amplitude {flicker['amplitude']:.1f} gray levels"))
+
+            for name, info in issues:
+                report.warn(name, info)
+            if not issues:
+                report.ok("G2: Illumination stable",
+                         f"{topic}: {len(brightness)} frames, mean brightness {brightness.mean():.1f}")
+
+    @staticmethod
+    def _collect(times: List[int], values: List[Any]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        kept_times, kept, errors = [], [], []
+        for ts, value in zip(times, values):
+            if isinstance(value, Future):
+                try:
+                    value = value.result()
+                except Exception as e:
+                    value = e
+            if isinstance(value, Exception):
+                errors.append(str(value) or type(value).__name__)
+                continue
+            kept_times.append(ts)
+            kept.append(value)
+        return (np.array(kept_times, dtype=np.int64),
+                np.array(kept, dtype=np.float64), errors)
 
 
 def check_illumination(reader: Any, report: Any) -> None:
@@ -70,13 +423,132 @@ def check_illumination(reader: Any, report: Any) -> None:
     - No periodic brightness flicker.
     - Brightness changes smoothly.
     """
-    # Would require:
-    # 1. Computing average image brightness.
-    # 2. Detecting periodic changes (FFT).
-    # 3. Checking brightness gradients.
-    
-    report.warn("G2: Illumination check not implemented", 
-               "Requires image decoding and brightness analysis")
+    run_visitor(reader, IlluminationVisitor(report))
+
+
+def frame_brightness(schema: Any, data: bytes, max_dim: int = ILLUMINATION_THUMB_DIM) -> float:
+    """Mean gray level of an Image / CompressedImage message, from a thumbnail."""
+    message = decode_message(schema.name, data, schema)
+    if message is None:
+        raise ValueError("cannot decode message")
+    if schema.name.lower() == IMAGE_SCHEMA:
+        encoding = message['encoding']
+        if encoding.lower() not in RAW_ENCODINGS:
+            raise ValueError(f"unsupported encoding '{encoding}'")
+    else:
+        encoding = message.get('format', '')
+    _, _, gray = _decode_gray(message, encoding, max_dim)
+    return float(gray.mean())
+
+
+def detect_flicker(times: np.ndarray, brightness: np.ndarray) -> Optional[Dict[str, float]]:
+    """
+    Periodic flicker at the mains frequencies and their aliases.
+
+    The series is resampled onto a uniform grid at the median frame rate,
+    split into ILLUMINATION_FFT_SEGMENT-frame segments whose Hann-windowed
+    spectra are averaged. A light flickering at f (= 1x or 2x mains) shows
+    up at |f - k * fps|; the strongest such peak is reported when it stands
+    out from the median spectrum.
+
+    Args:
+        times: Frame log times (ns), ascending.
+        brightness: Mean gray level per frame.
+
+    Returns:
+        Dict with source_hz, frequency, fps, amplitude and ratio, or None.
+    """
+    if len(times) < 32:
+        return None
+    dt = np.median(np.diff(times)) / 1e9
+    if dt <= 0:
+        return None
+    fps = 1.0 / dt
+    grid = np.arange(times[0], times[-1], dt * 1e9)
+    series = np.interp(grid, times, brightness)
+
+    n = min(ILLUMINATION_FFT_SEGMENT, len(series))
+    segments = series[:len(series) // n * n].reshape(-1, n)
+    segments = segments - segments.mean(axis=1, keepdims=True)
+    window = np.hanning(n)
+    # Amplitude spectrum in gray levels
+    spectrum = np.abs(np.fft.rfft(segments * window, axis=1)).mean(axis=0) * 2.0 / window.sum()
+    freqs = np.fft.rfftfreq(n, dt)
+    df = freqs[1]
+    noise = np.median(spectrum[1:]) + 1e-9
+
+    best = None
+    for mains in ILLUMINATION_MAINS_HZ:
+        # Lamps flicker at twice the mains frequency; listed first so it
+        # wins when both alias onto the same bin
+        for source in (2.0 * mains, mains):
+            alias = abs(source - fps * round(source / fps))
+            # Aliased onto DC (or next to it): indistinguishable from drift
+            if alias < 2 * df:
+                continue
+            b = int(round(alias / df))
+            peak = int(spectrum[b - 1:b + 2].argmax()) + b - 1
+            amplitude = spectrum[peak]
+            ratio = amplitude / noise
+            if ratio < ILLUMINATION_FLICKER_RATIO or amplitude < ILLUMINATION_FLICKER_MIN_AMPLITUDE:
+                continue
+            if best is None or amplitude > best['amplitude']:
+                best = {'source_hz': source, 'frequency': float(freqs[peak]), 'fps': fps,
+                        'amplitude': float(amplitude), 'ratio': float(ratio)}
+    return best
+
+
+def _image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a PNG or JPEG header, without decoding."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        width, height = struct.unpack_from('>II', data, 16)
+        return width, height
+    if data[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            pos += 1 if marker == 0xFF else 2
+            continue
+        length = struct.unpack_from('>H', data, pos + 2)[0]
+        if marker in _JPEG_SOF_MARKERS and pos + 9 <= len(data):
+            height, width = struct.unpack_from('>HH', data, pos + 5)
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def _downscale(image: np.ndarray, max_dim: int) -> np.ndarray:
+    """
+    Block means (float32) with the longest side <= max_dim.
+
+    Unlike every step-th pixel, block means keep the mean level of a
+    moving image constant (no aliasing into brightness changes). Rows and
+    columns past the last full block are dropped.
+    """
+    step = -(-max(image.shape[:2]) // max_dim)
+    if step == 1:
+        return image
+    step_y, step_x = min(step, image.shape[0]), min(step, image.shape[1])
+    height, width = image.shape[0] // step_y, image.shape[1] // step_x
+    # Rows of each block first (contiguous runs), then its columns
+    rows = image[:height * step_y, :width * step_x].reshape(height, step_y, -1).sum(axis=1, dtype=np.uint32)
+    blocks = rows.reshape(height, width, step_x, *image.shape[2:]).sum(axis=2)
+    return (blocks / (step_y * step_x)).astype(np.float32)
+
+
+def _to_gray(image: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """8-bit scale gray levels as float32 (``scale`` = 1/257 for 16-bit images)."""
+    if image.ndim == 3:
+        # Mean of the color channels (alpha ignored); channel order does not matter
+        gray = image[:, :, :3].mean(axis=2, dtype=np.float32)
+    else:
+        gray = image.astype(np.float32)
+    return gray * np.float32(scale) if scale != 1.0 else gray
 
 
 def decode_image(message: Any, encoding: str) -> np.ndarray:
@@ -88,10 +560,103 @@ def decode_image(message: Any, encoding: str) -> np.ndarray:
     - rgb8, bgr8, rgba8, bgra8
     - mono8, mono16
     - compressed (JPEG, PNG)
+
+    Args:
+        message: Decoded sensor_msgs/msg/Image or CompressedImage dict.
+        encoding: Image ``encoding`` or CompressedImage ``format``.
+
+    Returns:
+        (height, width[, channels]) array. Raw images are zero-copy views
+        of the message buffer.
+    """
+    data = message['data']
+    encoding = encoding.lower()
+    if encoding in RAW_ENCODINGS:
+        dtype, channels = RAW_ENCODINGS[encoding]
+        height, width, step = message['height'], message['width'], message['step']
+        itemsize = 2 if dtype == 'u2' else 1
+        if step < width * channels * itemsize or len(data) < step * height:
+            raise ValueError(f"truncated {encoding} image ({len(data)} bytes for {width}x{height})")
+        dtype = ('>' if message.get('is_bigendian') else '<') + dtype
+        rows = np.frombuffer(data, dtype=np.uint8, count=step * height).reshape(height, step)
+        pixels = rows[:, :width * channels * itemsize].view(dtype)
+        return pixels.reshape(height, width, channels) if channels > 1 else pixels
+
+    if cv2 is None:
+        raise RuntimeError("opencv-python is required for compressed images")
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"cannot decode {encoding or 'compressed'} image")
+    return image
+
+
+def _decode_gray(message: Any, encoding: str, max_dim: int) -> Tuple[int, int, np.ndarray]:
+    """(width, height, downscaled gray frame) of an image message."""
+    encoding = encoding.lower()
+    if encoding in RAW_ENCODINGS:
+        image = decode_image(message, encoding)
+        scale = 1.0 / 257.0 if image.dtype == np.uint16 else 1.0
+        return image.shape[1], image.shape[0], _to_gray(_downscale(image, max_dim), scale)
+
+    if cv2 is None:
+        raise RuntimeError("opencv-python is required for compressed images")
+    data = bytes(message['data'])
+    size = _image_size(data)
+    if size is None:
+        raise ValueError(f"unknown compressed image format '{encoding}'")
+    width, height = size
+    # JPEG decodes at 1/2, 1/4 or 1/8 scale directly in the DCT domain
+    reduction = max(width, height) // max_dim
+    if reduction >= 8:
+        flag = cv2.IMREAD_REDUCED_GRAYSCALE_8
+    elif reduction >= 4:
+        flag = cv2.IMREAD_REDUCED_GRAYSCALE_4
+    elif reduction >= 2:
+        flag = cv2.IMREAD_REDUCED_GRAYSCALE_2
+    else:
+        flag = cv2.IMREAD_GRAYSCALE
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if image is None:
+        raise ValueError(f"cannot decode {encoding or 'compressed'} image")
+    return width, height, _to_gray(_downscale(image, max_dim))
+
+
+def analyse_image(schema: Any, data: bytes, ordinal: int = 0,
+                  max_dim: int = VISION_MAX_DIM) -> ImageSample:
+    """
+    Decode one Image / CompressedImage message and analyse it downscaled.
+
+    Runs on the G1 thread pool.
+    """
+    message = decode_message(schema.name, data, schema)
+    if message is None:
+        raise ValueError("cannot decode message")
+    if schema.name.lower() == IMAGE_SCHEMA:
+        encoding = message['encoding']
+        if encoding.lower() not in RAW_ENCODINGS:
+            raise ValueError(f"unsupported encoding '{encoding}'")
+    else:
+        encoding = message.get('format', '')
+    width, height, gray = _decode_gray(message, encoding, max_dim)
+    return ImageSample(ordinal, width, height, gray)
+
+
+def is_torn(gray: np.ndarray) -> bool:
+    """
+    Tearing: one row boundary where the whole width jumps, far above the
+    typical difference between neighbouring rows.
     """
-    # Real implementation must depend on message format.
-    # This is only a placeholder.
-    raise NotImplementedError("Image decoding not implemented")
+    if gray.shape[0] < 3:
+        return False
+    row_diff = np.abs(np.diff(gray, axis=0))
+    profile = row_diff.mean(axis=1)
+    row = int(profile.argmax())
+    if profile[row] < VISION_TEAR_MIN_DIFF:
+        return False
+    if profile[row] < VISION_TEAR_RATIO * (np.median(profile) + 1.0):
+        return False
+    # The jump must span most of the width, unlike an object edge
+    return bool((row_diff[row] > VISION_TEAR_MIN_DIFF / 2).mean() > 0.75)
 
 
 def check_brightness(image: np.ndarray) -> dict:
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Single-pass message scan engine.
+
+Every message-level rule is expressed as a streaming visitor. All visitors
+share one ``reader.iter_messages()`` pass, so each chunk is decompressed
+exactly once per check run; finalization hooks then emit report items in
+the usual rule order.
+
+The channels the visitors want (``MessageVisitor.wants``) are pushed down
+to the reader: chunks that hold none of them are never read or
+decompressed, and messages of other channels are skipped without slicing
+their payloads.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .chunks import chunk_has_channels, iter_messages_file_order
+
+
+class MessageVisitor:
+    """
+    Base class for streaming rule visitors.
+
+    Subclasses override ``wants`` to select channels, ``visit`` to consume
+    messages and ``finalize`` to emit report items once the scan is over.
+    Setting ``done`` stops further messages from being delivered.
+    """
+
+    # Report item name used when the visitor raises during the scan
+    error_label = "Scan error"
+    # Rule group charged with the visit time when profiling
+    rule = None
+
+    def __init__(self, report: Any):
+        self.report = report
+        self.done = False
+        self.error: Optional[Exception] = None
+
+    def wants(self, channel: Any) -> bool:
+        """Return True if messages of this channel should be visited."""
+        return True
+
+    def visit(self, schema: Any, channel: Any, message: Any) -> None:
+        """Consume one message."""
+        raise NotImplementedError
+
+    def finalize(self) -> None:
+        """Emit report items after the scan has finished."""
+
+    def close(self) -> None:
+        """
+        Run the finalization hook, turning a scan or finalize error into
+        a warning (same behaviour as the per-rule try/except blocks).
+        """
+        if self.error is not None:
+            self.report.warn(self.error_label, str(self.error))
+            return
+        try:
+            self.finalize()
+        except Exception as e:
+            self.report.warn(self.error_label, str(e))
+
+
+def scan_messages(reader: Any, visitors: Iterable[MessageVisitor], profiler: Any = None,
+                  pushdown: Optional[Dict[str, Dict[str, int]]] = None) -> int:
+    """
+    Drive all visitors over a single ``iter_messages()`` pass.
+
+    Messages are read in file (recording) order rather than re-sorted by
+    log time, so timestamp rollbacks stay visible to B1 and no merge heap
+    is needed; chunks are decompressed one at a time. Channel routing is
+    resolved once per channel, so the per-message cost is one dict lookup
+    plus the visitors that actually want the message. Channels no visitor
+    wants are not read (see the module docstring). The scan stops early
+    once every visitor is done.
+
+    Args:
+        reader: MCAP reader.
+        visitors: Visitors to feed.
+        profiler: Optional RuleProfiler; the time spent in each visitor
+            (plus its message / payload byte counts) is moved from the
+            active "scan" section to the visitor's ``rule``.
+        pushdown: Optional dict, filled with what the pushdown skipped
+            (see pushdown_stats).
+    
+    Returns:
+        Number of messages read from the file.
+    """
+    visitors = [v for v in visitors if not v.done]
+    if not visitors:
+        return 0
+
+    routes: Dict[int, List[MessageVisitor]] = {}
+    channel_ids = None
+    summary = reader.get_summary()
+    if summary is not None and summary.channels:
+        routes = {channel_id: [v for v in visitors if v.wants(channel)]
+                  for channel_id, channel in summary.channels.items()}
+        channel_ids = {channel_id for channel_id, targets in routes.items() if targets}
+        if pushdown is not None:
+            pushdown.update(pushdown_stats(summary, visitors, routes))
+
+    active = len(visitors)
+    count = 0
+    spent: Dict[MessageVisitor, List[float]] = {}
+
+    try:
+        for schema, channel, message in iter_messages_file_order(reader, channel_ids):
+            count += 1
+
+            targets = routes.get(channel.id)
+            if targets is None:
+                targets = [v for v in visitors if v.wants(channel)]
+                routes[channel.id] = targets
+
+            for visitor in targets:
+                if visitor.done:
+                    continue
+                if profiler is not None:
+                    started = (time.perf_counter(), time.process_time())
+                try:
+                    visitor.visit(schema, channel, message)
+                except Exception as e:
+                    visitor.error = e
+                    visitor.done = True
+                if profiler is not None:
+                    usage = spent.setdefault(visitor, [0.0, 0.0, 0, 0])
+                    usage[0] += time.perf_counter() - started[0]
+                    usage[1] += time.process_time() - started[1]
+                    usage[2] += 1
+                    usage[3] += len(message.data)
+                if visitor.done:
+                    active -= 1
+        
+            if active == 0:
+                break
+    finally:
+        if profiler is not None:
+            _charge_visitors(profiler, spent, count)
+    return count
+
+
+def pushdown_stats(summary: Any, visitors: Iterable[MessageVisitor],
+                   routes: Dict[int, List[MessageVisitor]]) -> Dict[str, Dict[str, int]]:
+    """
+    What each rule does not need to read, from the summary.
+
+    Returns:
+        Dict with a "scan" entry for the shared pass (chunks not read by
+        any rule, plus the total chunk count) and one entry per visitor
+        rule: ``chunks_skipped``, ``bytes_skipped`` (compressed chunk
+        bytes) and ``messages_skipped``.
+    """
+    chunk_indexes = summary.chunk_indexes or []
+    statistics = summary.statistics
+    message_counts = statistics.channel_message_counts if statistics is not None else {}
+
+    rule_channels: Dict[str, Set[int]] = {v.rule or type(v).__name__: set() for v in visitors}
+    for channel_id, targets in routes.items():
+        for visitor in targets:
+            rule_channels[visitor.rule or type(visitor).__name__].add(channel_id)
+
+    def skipped(channel_ids: Set[int]) -> Dict[str, int]:
+        chunks = [ci for ci in chunk_indexes if not chunk_has_channels(ci, channel_ids)]
+        return {
+            'chunks_skipped': len(chunks),
+            'bytes_skipped': sum(ci.compressed_size for ci in chunks),
+            'messages_skipped': sum(n for channel_id, n in message_counts.items()
+                                    if channel_id not in channel_ids),
+        }
+
+    wanted = {channel_id for channel_id, targets in routes.items() if targets}
+    stats = {'scan': dict(chunks=len(chunk_indexes), **skipped(wanted))}
+    for rule, channel_ids in rule_channels.items():
+        stats[rule] = skipped(channel_ids)
+    return stats
+
+
+def _charge_visitors(profiler: Any, spent: Dict[MessageVisitor, List[float]], count: int) -> None:
+    """Move the time measured inside visitors from the scan section to their rules."""
+    scan_section = profiler.section
+    for visitor, (wall, cpu, messages, size) in spent.items():
+        profiler.add(visitor.rule or type(visitor).__name__,
+                     wall_s=wall, cpu_s=cpu, messages=messages, bytes_read=size)
+        if scan_section is not None:
+            profiler.add(scan_section, wall_s=-wall, cpu_s=-cpu)
+    if scan_section is not None:
+        profiler.add(scan_section, messages=count)
+
+
+def run_visitor(reader: Any, visitor: MessageVisitor) -> MessageVisitor:
+    """Scan with a single visitor and finalize it (standalone rule calls)."""
+    scan_messages(reader, [visitor])
+    visitor.close()
+    return visitor
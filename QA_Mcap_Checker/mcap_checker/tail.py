@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Tail mode: check an MCAP while it is still being recorded.
+
+Follows a growing MCAP file (or a directory of split files, in name
+order), parses every record as soon as it is complete on disk and keeps
+rolling rule state per topic, so that problems are reported while the
+recording is running instead of after it:
+
+- B1: null timestamps and rollbacks (FAIL);
+- C1/C2: rolling rate of joint / camera topics below MIN_JOINT_HZ /
+  MIN_CAMERA_FPS, gaps above MAX_TIME_GAP_MS, and key topics that stall
+  while the others keep advancing (WARN);
+- D1: running camera-joint sync error over a window of frames (WARN);
+- E1: NaN / Inf in joint positions (FAIL).
+
+Level changes are emitted as events (rate and sync problems also emit a
+PASS event when they recover). Messages inside a chunk only become
+visible once the writer flushes the chunk, so the detection latency is
+the writer's chunk duration plus the poll interval.
+
+Usage:
+    python -m mcap_checker.checker <file.mcap|dir> --follow [--events events.jsonl]
+"""
+
+import bisect
+import io
+import json
+import struct
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mcap.data_stream import ReadDataStream
+from mcap.records import Channel, Chunk, Message, Schema
+
+from .chunks import decompress_chunk, iter_records, parse_message
+from .config import (
+    MIN_JOINT_HZ, MIN_CAMERA_FPS, MAX_TIME_GAP_MS,
+    MAX_SYNC_MS, MAX_DESYNC_RATIO,
+    TAIL_POLL_INTERVAL_S, TAIL_RATE_WINDOW_S, TAIL_RATE_TOLERANCE,
+    TAIL_SYNC_WINDOW_FRAMES, TAIL_IDLE_WARN_S, TAIL_READ_BYTES
+)
+from .decoder import decode_joint_state_arrays
+
+MCAP_MAGIC = b'\x89MCAP0\r\n'
+
+FOOTER_OPCODE = 0x02
+SCHEMA_OPCODE = 0x03
+CHANNEL_OPCODE = 0x04
+MESSAGE_OPCODE = 0x05
+CHUNK_OPCODE = 0x06
+DATA_END_OPCODE = 0x0F
+
+_NS = 1_000_000_000
+# Camera frames kept while waiting for joint samples (bounds memory when
+# there are no joint_states topics)
+_MAX_PENDING_FRAMES = 10000
+
+
+class GrowingMcapReader:
+    """
+    Incremental reader for an MCAP file that is still being written.
+
+    Each ``poll()`` reads the bytes appended since the previous call, in
+    blocks of TAIL_READ_BYTES, and returns the messages of the records
+    that are now complete; only a partly written record stays buffered
+    until the rest of it arrives. A poll stops after the first block that
+    yields messages, so a large backlog (e.g. following a file that is
+    already gigabytes long) is consumed over several polls.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.schemas: Dict[int, Schema] = {}
+        self.channels: Dict[int, Channel] = {}
+        self.finished = False
+        self.bytes_read = 0
+        self._pending = b""
+
+    def poll(self) -> List[Tuple[Channel, Message]]:
+        """
+        Read newly flushed records.
+
+        Returns:
+            (channel, message) pairs in file order.
+        """
+        if self.finished:
+            return []
+        messages: List[Tuple[Channel, Message]] = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.bytes_read)
+                while not messages and not self.finished:
+                    new = f.read(self._read_size())
+                    if not new:
+                        break
+                    self.bytes_read += len(new)
+                    self._parse(self._pending + new, messages)
+        except OSError:
+            pass
+        return messages
+
+    def _read_size(self) -> int:
+        """One block, or the rest of a buffered record larger than that."""
+        pending = self._pending
+        if self.bytes_read == len(pending) or len(pending) < 9:
+            return TAIL_READ_BYTES
+        # Buffered data starts at a record: opcode (1 byte) + length (8 bytes)
+        length = struct.unpack_from("<Q", pending, 1)[0]
+        return max(TAIL_READ_BYTES, 9 + length - len(pending))
+
+    def _parse(self, data: bytes, messages: List[Tuple[Channel, Message]]) -> None:
+        """Handle the complete records of ``data`` and buffer the rest."""
+        pos = 0
+        if self.bytes_read - len(data) == 0:
+            # Start of the file: wait for the magic
+            if len(data) < len(MCAP_MAGIC):
+                self._pending = data
+                return
+            if data[:len(MCAP_MAGIC)] != MCAP_MAGIC:
+                raise ValueError(f"Not an MCAP file: {self.path}")
+            pos = len(MCAP_MAGIC)
+
+        for opcode, body, end in iter_records(data, pos):
+            pos = end
+            if opcode == CHUNK_OPCODE:
+                chunk = Chunk.read(ReadDataStream(io.BytesIO(data[body:end])))
+                records = decompress_chunk(chunk)
+                for inner_opcode, inner_body, inner_end in iter_records(records):
+                    self._handle(inner_opcode, records, inner_body, inner_end, messages)
+            elif opcode in (DATA_END_OPCODE, FOOTER_OPCODE):
+                self.finished = True
+                break
+            else:
+                self._handle(opcode, data, body, end, messages)
+        self._pending = b"" if self.finished else data[pos:]
+
+    def _handle(self, opcode: int, data: bytes, body: int, end: int,
+                messages: List[Tuple[Channel, Message]]) -> None:
+        if opcode == MESSAGE_OPCODE:
+            message = parse_message(data, body, end)
+            channel = self.channels.get(message.channel_id)
+            if channel is not None:
+                messages.append((channel, message))
+        elif opcode == CHANNEL_OPCODE:
+            channel = Channel.read(ReadDataStream(io.BytesIO(data[body:end])))
+            self.channels[channel.id] = channel
+        elif opcode == SCHEMA_OPCODE:
+            schema = Schema.read(ReadDataStream(io.BytesIO(data[body:end])))
+            self.schemas[schema.id] = schema
+
+
+class _TopicState:
+    """Rolling per-topic state."""
+
+    __slots__ = ('kind', 'count', 'last_ts', 'window', 'low_rate', 'stalled',
+                 'b1_failures', 'gaps', 'nan_count', 'decode_errors')
+
+    def __init__(self, kind: Optional[str]):
+        # 'joint', 'camera' or None
+        self.kind = kind
+        self.count = 0
+        self.last_ts: Optional[int] = None
+        self.window: Deque[int] = deque()
+        self.low_rate = False
+        self.stalled = False
+        self.b1_failures = 0
+        self.gaps = 0
+        self.nan_count = 0
+        self.decode_errors = 0
+
+
+class _SyncState:
+    """Running D1 state of one camera topic."""
+
+    __slots__ = ('frames', 'desync', 'max_ms', 'sum_ms', 'recent', 'warned')
+
+    def __init__(self):
+        self.frames = 0
+        self.desync = 0
+        self.max_ms = 0.0
+        self.sum_ms = 0.0
+        self.recent: Deque[bool] = deque(maxlen=TAIL_SYNC_WINDOW_FRAMES)
+        self.warned = False
+
+
+class LiveMonitor:
+    """
+    Rolling rule state over a live message stream.
+
+    State is keyed by topic, so it carries over from one split file to
+    the next. Events are dicts with wall-clock ``time``, ``level``,
+    ``check``, ``info`` and the ``log_time`` that triggered them.
+
+    Args:
+        on_event: Called with every event as soon as it is raised.
+    """
+
+    def __init__(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.on_event = on_event
+        self.events: List[Dict[str, Any]] = []
+        self.topics: Dict[str, _TopicState] = {}
+        self.messages = 0
+        self.latest_ts = 0
+        # Joint timestamps around the pending camera frames (sorted)
+        self.joint_ts: List[int] = []
+        # (log_time, camera topic) frames waiting for a later joint sample
+        self.pending_frames: Deque[Tuple[int, str]] = deque(maxlen=_MAX_PENDING_FRAMES)
+        self.sync: Dict[str, _SyncState] = {}
+
+    def emit(self, level: str, check: str, info: str = "", log_time: Optional[int] = None) -> None:
+        event = {"time": time.time(), "level": level, "check": check,
+                 "info": info, "log_time": log_time}
+        self.events.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of events per level."""
+        counts = {"PASS": 0, "WARN": 0, "FAIL": 0}
+        for event in self.events:
+            counts[event["level"]] += 1
+        return counts
+
+    @property
+    def level(self) -> str:
+        counts = self.counts()
+        if counts["FAIL"]:
+            return "FAIL"
+        if counts["WARN"]:
+            return "WARN"
+        return "PASS"
+
+    def _topic(self, channel: Any) -> _TopicState:
+        state = self.topics.get(channel.topic)
+        if state is None:
+            name = channel.topic.lower()
+            kind = 'joint' if 'joint_states' in name else 'camera' if 'image' in name else None
+            state = _TopicState(kind)
+            self.topics[channel.topic] = state
+            if kind == 'camera':
+                self.sync[channel.topic] = _SyncState()
+        return state
+
+    def feed(self, schema: Any, channel: Any, message: Any) -> None:
+        """Update the rolling state with one message."""
+        topic = channel.topic
+        state = self._topic(channel)
+        ts = message.log_time
+        self.messages += 1
+        state.count += 1
+
+        # B1: null timestamp / rollback
+        if not ts:
+            state.b1_failures += 1
+            if state.b1_failures == 1:
+                self.emit("FAIL", "B1: Null timestamp", topic, ts)
+            return
+        last_ts = state.last_ts
+        if last_ts is not None and ts < last_ts:
+            state.b1_failures += 1
+            if state.b1_failures == 1:
+                self.emit("FAIL", "B1: Timestamp rollback", f"{topic} at {ts}", ts)
+            return
+        state.last_ts = ts
+        if ts > self.latest_ts:
+            self.latest_ts = ts
+
+        if state.stalled:
+            state.stalled = False
+            self.emit("PASS", "C1: Topic resumed", topic, ts)
+
+        if state.kind is not None:
+            self._check_rate(topic, state, last_ts, ts)
+
+        if state.kind == 'joint':
+            self._check_joint_values(topic, state, schema, message.data, ts)
+            bisect.insort(self.joint_ts, ts)
+            self._resolve_frames()
+        elif state.kind == 'camera':
+            self.pending_frames.append((ts, topic))
+            self._resolve_frames()
+
+    def _check_rate(self, topic: str, state: _TopicState, last_ts: Optional[int], ts: int) -> None:
+        """C1/C2: gaps and rolling rate of a key topic."""
+        if last_ts is not None:
+            gap_ms = (ts - last_ts) / 1e6
+            if gap_ms > MAX_TIME_GAP_MS:
+                state.gaps += 1
+                self.emit("WARN", "C1: Large time gap detected", f"{topic}: {gap_ms:.1f} ms", ts)
+
+        window = state.window
+        window.append(ts)
+        window_ns = TAIL_RATE_WINDOW_S * _NS
+        while ts - window[0] > window_ns:
+            window.popleft()
+        span = window[-1] - window[0]
+        # Only judge the rate once the window is (almost) full
+        if span < 0.9 * window_ns:
+            return
+        rate = (len(window) - 1) * _NS / span
+        if state.kind == 'joint':
+            check, minimum, unit = "C1: Low joint_states rate", MIN_JOINT_HZ, "Hz"
+        else:
+            check, minimum, unit = "C2: Low camera FPS", MIN_CAMERA_FPS, "FPS"
+        # Hysteresis, so a rate hovering at the minimum does not flap
+        if rate < minimum * (1.0 - TAIL_RATE_TOLERANCE) and not state.low_rate:
+            state.low_rate = True
+            self.emit("WARN", check, f"{topic}: {rate:.1f} {unit} (min {minimum} {unit})", ts)
+        elif rate >= minimum and state.low_rate:
+            state.low_rate = False
+            self.emit("PASS", check.split(":")[0] + ": Rate recovered", f"{topic}: {rate:.1f} {unit}", ts)
+
+    def _check_joint_values(self, topic: str, state: _TopicState, schema: Any, data: bytes, ts: int) -> None:
+        """E1: NaN / Inf in joint positions."""
+        if schema is not None and 'jointstate' not in schema.name.lower():
+            return
+        arrays = decode_joint_state_arrays(data, with_names=False)
+        if arrays is None:
+            state.decode_errors += 1
+            if state.decode_errors == 1:
+                self.emit("WARN", "E1: Cannot decode joint_states", topic, ts)
+            return
+        if not np.isfinite(arrays.position).all():
+            state.nan_count += 1
+            if state.nan_count == 1:
+                label = "NaN" if np.isnan(arrays.position).any() else "Inf"
+                self.emit("FAIL", f"E1: {label} in joint values", f"{topic} at {ts}", ts)
+
+    def _resolve_frames(self) -> None:
+        """
+        D1: match pending camera frames to their nearest joint sample.
+
+        A frame is final once a joint sample at or after it has arrived,
+        or once the stream has moved past it by more than the distance
+        to the previous joint sample (no later sample can be closer).
+        """
+        joint_ts = self.joint_ts
+        if not joint_ts:
+            return
+        while self.pending_frames:
+            frame_ts, topic = self.pending_frames[0]
+            i = bisect.bisect_left(joint_ts, frame_ts)
+            before = frame_ts - joint_ts[i - 1] if i > 0 else None
+            if i < len(joint_ts):
+                after = joint_ts[i] - frame_ts
+                error = after if before is None else min(before, after)
+            elif before is not None and self.latest_ts - frame_ts >= before:
+                error = before
+            else:
+                break
+            self.pending_frames.popleft()
+            self._record_sync(topic, error / 1e6, frame_ts)
+
+        # Keep the last joint sample before the oldest pending frame
+        oldest = self.pending_frames[0][0] if self.pending_frames else joint_ts[-1]
+        keep = max(0, bisect.bisect_left(joint_ts, oldest) - 1)
+        if keep:
+            del joint_ts[:keep]
+
+    def _record_sync(self, topic: str, error_ms: float, frame_ts: int) -> None:
+        sync = self.sync[topic]
+        desync = error_ms > MAX_SYNC_MS
+        sync.frames += 1
+        sync.desync += desync
+        sync.sum_ms += error_ms
+        sync.max_ms = max(sync.max_ms, error_ms)
+        sync.recent.append(desync)
+        if len(sync.recent) < sync.recent.maxlen:
+            return
+        ratio = sum(sync.recent) / len(sync.recent)
+        if ratio > MAX_DESYNC_RATIO and not sync.warned:
+            sync.warned = True
+            self.emit("WARN", "D1: Camera-joint desync",
+                      f"{topic}: {ratio*100:.1f}% of last {len(sync.recent)} frames > {MAX_SYNC_MS} ms",
+                      frame_ts)
+        elif ratio <= MAX_DESYNC_RATIO and sync.warned:
+            sync.warned = False
+            self.emit("PASS", "D1: Sync recovered",
+                      f"{topic}: {ratio*100:.1f}% of last {len(sync.recent)} frames > {MAX_SYNC_MS} ms",
+                      frame_ts)
+
+    def check_stalls(self) -> None:
+        """C1: key topics that fell silent while the others kept advancing."""
+        for topic, state in self.topics.items():
+            if state.kind is None or state.stalled or state.last_ts is None:
+                continue
+            silent_ms = (self.latest_ts - state.last_ts) / 1e6
+            if silent_ms > MAX_TIME_GAP_MS:
+                state.stalled = True
+                self.emit("WARN", "C1: Topic stalled",
+                          f"{topic}: no message for {silent_ms:.1f} ms", self.latest_ts)
+
+    def summary(self) -> Dict[str, Any]:
+        """Running statistics per topic."""
+        topics = {}
+        for topic, state in self.topics.items():
+            entry = {"messages": state.count, "gaps": state.gaps,
+                     "b1_failures": state.b1_failures}
+            if state.kind == 'joint':
+                entry["nan_messages"] = state.nan_count
+                entry["decode_errors"] = state.decode_errors
+            sync = self.sync.get(topic)
+            if sync is not None and sync.frames:
+                entry["sync_mean_ms"] = round(sync.sum_ms / sync.frames, 3)
+                entry["sync_max_ms"] = round(sync.max_ms, 3)
+                entry["desync_ratio"] = round(sync.desync / sync.frames, 4)
+            topics[topic] = entry
+        return {"messages": self.messages, "events": self.counts(), "topics": topics}
+
+
+def _split_files(directory: Path) -> Iterator[Path]:
+    """MCAP files of a directory in name order, including ones created later."""
+    seen = set()
+    while True:
+        new = sorted(p for p in directory.glob("*.mcap") if p not in seen)
+        if not new:
+            yield None
+            continue
+        for path in new:
+            seen.add(path)
+            yield path
+
+
+def follow(target: str, monitor: Optional[LiveMonitor] = None,
+           poll_interval: Optional[float] = None,
+           idle_timeout: Optional[float] = None) -> LiveMonitor:
+    """
+    Follow a growing MCAP file, or a directory of split files.
+
+    A single file is followed until its footer is written. In a directory,
+    files are followed one after another in name order; the next file is
+    opened once the current one is finished.
+
+    Args:
+        target: MCAP file or directory.
+        monitor: LiveMonitor to feed (default: a new one).
+        poll_interval: Seconds between polls (default: config.TAIL_POLL_INTERVAL_S).
+        idle_timeout: Stop after this many seconds without new data
+            (None = only stop at the end of the recording).
+
+    Returns:
+        The LiveMonitor.
+    """
+    monitor = monitor or LiveMonitor()
+    poll_interval = TAIL_POLL_INTERVAL_S if poll_interval is None else poll_interval
+    target_path = Path(target)
+    files = _split_files(target_path) if target_path.is_dir() else iter([target_path])
+
+    reader = None
+    last_data = time.monotonic()
+    idle_warned = False
+    try:
+        while True:
+            if reader is None or reader.finished:
+                path = next(files, False)
+                if path is False:
+                    break
+                reader = GrowingMcapReader(str(path)) if path is not None else None
+
+            messages = reader.poll() if reader is not None else []
+            for channel, message in messages:
+                monitor.feed(reader.schemas.get(channel.schema_id), channel, message)
+
+            if messages:
+                monitor.check_stalls()
+                last_data = time.monotonic()
+                if idle_warned:
+                    idle_warned = False
+                    monitor.emit("PASS", "Recording resumed", str(reader.path))
+            elif reader is None or not reader.finished:
+                idle = time.monotonic() - last_data
+                if idle_timeout is not None and idle >= idle_timeout:
+                    break
+                if idle >= TAIL_IDLE_WARN_S and not idle_warned:
+                    idle_warned = True
+                    monitor.emit("WARN", "Recording idle", f"No new data for {idle:.1f} s")
+                time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    return monitor
+
+
+def main_follow(target: str, events_path: Optional[str] = None,
+                poll_interval: Optional[float] = None,
+                idle_timeout: Optional[float] = None) -> int:
+    """
+    ``checker --follow``: print events as they happen.
+
+    Returns:
+        Exit code (0 PASS, 1 FAIL, 2 WARN).
+    """
+    events_file = open(events_path, "w", encoding="utf-8") if events_path else None
+    icons = {"PASS": "✓", "WARN": "⚠", "FAIL": "✗"}
+
+    def on_event(event: Dict[str, Any]) -> None:
+        stamp = time.strftime("%H:%M:%S", time.localtime(event["time"]))
+        info = f" - {event['info']}" if event["info"] else ""
+        print(f"[{stamp}] {icons[event['level']]} {event['check']}{info}", flush=True)
+        if events_file is not None:
+            events_file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            events_file.flush()
+
+    print(f"Following: {target}")
+    try:
+        monitor = follow(target, LiveMonitor(on_event), poll_interval, idle_timeout)
+    finally:
+        if events_file is not None:
+            events_file.close()
+
+    summary = monitor.summary()
+    counts = summary["events"]
+    print(f"\n{summary['messages']} messages, "
+          f"{counts['FAIL']} FAIL / {counts['WARN']} WARN events")
+    if events_path:
+        print(f"✓ Events saved to: {events_path}")
+
+    if monitor.level == "FAIL":
+        return 1
+    if monitor.level == "WARN":
+        return 2
+    return 0
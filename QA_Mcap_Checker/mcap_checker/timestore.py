@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Columnar per-topic timestamp store.
+
+Timestamps are appended into ``array('q')`` buffers (8 bytes each instead
+of a boxed Python int plus a list slot) and exposed to the timing rules as
+zero-copy NumPy int64 views with cached diffs, so gap, rate and jitter
+statistics are vectorized reductions.
+
+In bounded-memory mode (config.BOUNDED_MEMORY_TIMING) RunningTimestampStore
+replaces it: every topic keeps only its count, first / last timestamps,
+largest gap and the running moments of its intervals, updated batch by
+batch from a log-time ordered stream. The rules read both stores through
+the same column interface.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+
+import numpy as np
+
+
+class TopicTimestamps:
+    """
+    Timestamp column (ns) of one topic.
+
+    Supports ``len()``, indexing and ``np.asarray()`` like the plain
+    lists it replaces. Once ``values`` has been accessed the underlying
+    buffer is exported and no more appends are possible.
+    """
+
+    __slots__ = ('_buf', '_values', '_diffs')
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._buf = array('q', values)
+        self._values: Optional[np.ndarray] = None
+        self._diffs: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> 'TopicTimestamps':
+        """Wrap an existing int64 array without copying."""
+        column = cls()
+        column._values = np.ascontiguousarray(values, dtype=np.int64)
+        return column
+
+    def append(self, ts: int) -> None:
+        """Append one timestamp."""
+        self._buf.append(ts)
+
+    @property
+    def values(self) -> np.ndarray:
+        """int64 view over the timestamps."""
+        if self._values is None:
+            self._values = np.frombuffer(self._buf, dtype=np.int64)
+        return self._values
+
+    @property
+    def diffs(self) -> np.ndarray:
+        """Consecutive differences (ns), computed once."""
+        if self._diffs is None:
+            self._diffs = np.diff(self.values)
+        return self._diffs
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column."""
+        size = self.values.nbytes
+        if self._diffs is not None:
+            size += self._diffs.nbytes
+        return size
+
+    def duration_ns(self) -> int:
+        """Last minus first timestamp (0 for fewer than 2 samples)."""
+        if len(self) < 2:
+            return 0
+        return int(self.values[-1] - self.values[0])
+
+    def rate(self) -> float:
+        """Average message rate in Hz (0.0 if undefined)."""
+        duration_ns = self.duration_ns()
+        if duration_ns <= 0:
+            return 0.0
+        return len(self) / (duration_ns * 1e-9)
+
+    def max_gap_ns(self) -> int:
+        """Largest interval between consecutive messages (ns)."""
+        if len(self) < 2:
+            return 0
+        return int(self.diffs.max())
+
+    def interval_moments(self) -> 'RunningMoments':
+        """Count / mean / M2 of the intervals (ns)."""
+        moments = RunningMoments()
+        moments.add_batch(self.diffs)
+        return moments
+
+    def __len__(self) -> int:
+        if self._values is not None:
+            return len(self._values)
+        return len(self._buf)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.values[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.values)
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype, copy=False)
+
+    def __repr__(self) -> str:
+        return f"TopicTimestamps(n={len(self)})"
+
+
+class RunningMoments:
+    """
+    Count, mean and sum of squared deviations (M2) of a value stream.
+
+    Single values use Welford's update; batches and other RunningMoments
+    are folded in with Chan's pairwise formula, so the population
+    standard deviation of any number of batches needs O(1) memory.
+    """
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Add one value (Welford)."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def add_batch(self, values: np.ndarray) -> None:
+        """Add an array of values."""
+        if len(values) == 0:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        mean = float(values.mean())
+        self._combine(len(values), mean, float(np.square(values - mean).sum()))
+
+    def merge(self, other: 'RunningMoments') -> None:
+        """Fold in the moments of another stream."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def std(self) -> float:
+        """Population standard deviation (0.0 if empty)."""
+        if self.count == 0:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / self.count)
+
+    def __repr__(self) -> str:
+        return f"RunningMoments(n={self.count}, mean={self.mean:g}, std={self.std():g})"
+
+
+class TopicRunningStats:
+    """
+    Bounded-memory counterpart of TopicTimestamps.
+
+    Fed with sorted batches of one topic's timestamps; keeps what the
+    timing rules read from a column: ``len()``, the first / last
+    timestamp (``[0]`` / ``[-1]``), rate, largest gap and interval
+    moments.
+    """
+
+    __slots__ = ('count', 'first', 'last', '_max_gap', '_intervals')
+
+    def __init__(self):
+        self.count = 0
+        self.first: Optional[int] = None
+        self.last: Optional[int] = None
+        self._max_gap = 0
+        self._intervals = RunningMoments()
+
+    def add(self, values: np.ndarray) -> None:
+        """Add a batch of timestamps, sorted and not older than the previous batch."""
+        if len(values) == 0:
+            return
+        if self.count:
+            gap = int(values[0]) - self.last
+            self._intervals.add(gap)
+            self._max_gap = max(self._max_gap, gap)
+        else:
+            self.first = int(values[0])
+        if len(values) > 1:
+            diffs = np.diff(values)
+            self._intervals.add_batch(diffs)
+            self._max_gap = max(self._max_gap, int(diffs.max()))
+        self.count += len(values)
+        self.last = int(values[-1])
+
+    def duration_ns(self) -> int:
+        """Last minus first timestamp (0 for fewer than 2 samples)."""
+        if self.count < 2:
+            return 0
+        return self.last - self.first
+
+    def rate(self) -> float:
+        """Average message rate in Hz (0.0 if undefined)."""
+        duration_ns = self.duration_ns()
+        if duration_ns <= 0:
+            return 0.0
+        return self.count / (duration_ns * 1e-9)
+
+    def max_gap_ns(self) -> int:
+        """Largest interval between consecutive messages (ns)."""
+        return self._max_gap
+
+    def interval_moments(self) -> RunningMoments:
+        """Count / mean / M2 of the intervals (ns)."""
+        return self._intervals
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        if self.count and index == 0:
+            return self.first
+        if self.count and index == -1:
+            return self.last
+        raise IndexError("TopicRunningStats only keeps the first and last timestamp")
+
+    def __repr__(self) -> str:
+        return f"TopicRunningStats(n={self.count})"
+
+
+class TimestampStore(Mapping):
+    """
+    Mapping of topic -> TopicTimestamps.
+
+    Drop-in replacement for the ``topic_ts`` dict of lists returned by
+    B1 and consumed by the B2/C/D/F rules.
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, TopicTimestamps] = {}
+
+    @classmethod
+    def from_dict(cls, topic_ts: Mapping[str, Any]) -> 'TimestampStore':
+        """Build a store from a dict of timestamp lists or arrays."""
+        store = cls()
+        for topic, ts in topic_ts.items():
+            store._columns[topic] = as_column(ts)
+        return store
+
+    def column(self, topic: str) -> TopicTimestamps:
+        """Return the column of a topic, creating it if needed."""
+        column = self._columns.get(topic)
+        if column is None:
+            column = self._columns[topic] = TopicTimestamps()
+        return column
+
+    def append(self, topic: str, ts: int) -> None:
+        """Append one timestamp to a topic."""
+        self.column(topic).append(ts)
+
+    def put_array(self, topic: str, values: np.ndarray) -> None:
+        """Set a topic's column from an int64 array (no copy)."""
+        self._columns[topic] = TopicTimestamps.from_array(values)
+
+    @property
+    def nbytes(self) -> int:
+        """Total memory held by all columns."""
+        return sum(c.nbytes for c in self._columns.values())
+
+    def __getitem__(self, topic: str) -> TopicTimestamps:
+        return self._columns[topic]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        return f"TimestampStore({len(self)} topics)"
+
+
+class RunningTimestampStore(Mapping):
+    """
+    Mapping of topic -> TopicRunningStats (bounded-memory mode).
+
+    Besides the per-topic statistics it carries the results that need
+    several topics at once and are computed on the same time-ordered
+    pass: ``camera_sync`` (D1, per camera, see timing.sync_stats) and
+    ``future_actions`` (D2).
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, TopicRunningStats] = {}
+        self.camera_sync: Dict[str, Dict[str, Any]] = {}
+        self.future_actions = 0
+
+    def column(self, topic: str) -> TopicRunningStats:
+        """Return the statistics of a topic, creating them if needed."""
+        column = self._columns.get(topic)
+        if column is None:
+            column = self._columns[topic] = TopicRunningStats()
+        return column
+
+    def __getitem__(self, topic: str) -> TopicRunningStats:
+        return self._columns[topic]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        return f"RunningTimestampStore({len(self)} topics)"
+
+
+def as_column(ts: Any) -> Any:
+    """Return ``ts`` as a column (lists and arrays are wrapped in a TopicTimestamps)."""
+    if isinstance(ts, (TopicTimestamps, TopicRunningStats)):
+        return ts
+    return TopicTimestamps.from_array(np.asarray(ts, dtype=np.int64))